@@ -0,0 +1,139 @@
+import numpy as np
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional
+from src.financial_research_agent.config import Config
+
+@dataclass
+class AccessStats:
+    """Access statistics of a tier's items, column-wise (row i is ids[i])."""
+    ids: List[str]
+    access_count: np.ndarray # Recall/attach_evidence hits
+    last_access: np.ndarray # Epoch seconds; the item's timestamp until its first hit
+    size: np.ndarray # Tokens in a token-counted tier, else 1
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+class EvictionPolicy(ABC):
+    """
+    Decides which items leave a memory tier and which come back.
+    victims() picks the coldest items covering `amount` (summed sizes);
+    on_hit() is told about every recall/attach_evidence hit on an item in a
+    lower tier and returns True when the item should return to working
+    memory. Subclasses define what "cold" means through order().
+    """
+
+    def __init__(self, promotion_hits: Optional[int] = None):
+        self.promotion_hits = promotion_hits or Config.MEMORY_PROMOTION_HITS
+
+    @abstractmethod
+    def order(self, stats: AccessStats) -> np.ndarray:
+        """Row indexes, coldest first."""
+        pass
+
+    def victims(self, stats: AccessStats, amount: int) -> List[str]:
+        if amount <= 0 or not len(stats):
+            return []
+        order = self.order(stats)
+        count = int(np.searchsorted(np.cumsum(stats.size[order]), amount)) + 1
+        return [stats.ids[row] for row in order[:count].tolist()]
+
+    def on_hit(self, item_id: str, access_count: int) -> bool:
+        return access_count >= self.promotion_hits
+
+class LRUPolicy(EvictionPolicy):
+    """Least recently used first."""
+
+    def order(self, stats: AccessStats) -> np.ndarray:
+        return np.argsort(stats.last_access, kind="stable")
+
+class LFUPolicy(EvictionPolicy):
+    """Least frequently used first; ties go to the least recently used."""
+
+    def order(self, stats: AccessStats) -> np.ndarray:
+        return np.lexsort((stats.last_access, stats.access_count))
+
+class ARCPolicy(EvictionPolicy):
+    """
+    Adaptive Replacement Cache-style hybrid. Items not hit since they
+    entered the tier form the recency list, hit items the frequency list;
+    each is evicted in LRU order. `target` is the size the recency list may
+    keep: a hit on an item recently evicted from the recency list (a ghost)
+    raises it, a ghost hit from the frequency list lowers it. Ghost hits
+    always bring the item back, since it was evicted too early.
+    """
+
+    def __init__(
+        self,
+        promotion_hits: Optional[int] = None,
+        ghost_size: Optional[int] = None,
+        capacity: Optional[int] = None
+    ):
+        super().__init__(promotion_hits)
+        self.ghost_size = ghost_size or Config.MEMORY_ARC_GHOST_SIZE
+        self.capacity = capacity or Config.WORKING_MEMORY_TARGET
+        self.target = 0.0
+        self._recent_ghosts: "OrderedDict[str, int]" = OrderedDict() # id -> size
+        self._frequent_ghosts: "OrderedDict[str, int]" = OrderedDict()
+
+    def order(self, stats: AccessStats) -> np.ndarray:
+        return np.argsort(stats.last_access, kind="stable")
+
+    def victims(self, stats: AccessStats, amount: int) -> List[str]:
+        if amount <= 0 or not len(stats):
+            return []
+        order = self.order(stats)
+        hit = stats.access_count[order] > 0
+        recent, frequent = order[~hit].tolist(), order[hit].tolist()
+        sizes = stats.size.tolist()
+        recent_size = sum(sizes[row] for row in recent)
+
+        selected = []
+        r = f = 0
+        while amount > 0 and (r < len(recent) or f < len(frequent)):
+            if r < len(recent) and (recent_size > self.target or f == len(frequent)):
+                row, ghosts = recent[r], self._recent_ghosts
+                r += 1
+                recent_size -= sizes[row]
+            else:
+                row, ghosts = frequent[f], self._frequent_ghosts
+                f += 1
+            item_id, size = stats.ids[row], sizes[row]
+            ghosts[item_id] = size
+            ghosts.move_to_end(item_id)
+            selected.append(item_id)
+            amount -= size
+        for ghosts in (self._recent_ghosts, self._frequent_ghosts):
+            while len(ghosts) > self.ghost_size:
+                ghosts.popitem(last=False)
+        return selected
+
+    def on_hit(self, item_id: str, access_count: int) -> bool:
+        if item_id in self._recent_ghosts:
+            size = self._recent_ghosts.pop(item_id)
+            ratio = max(1.0, len(self._frequent_ghosts) / max(len(self._recent_ghosts), 1))
+            self.target = min(self.capacity, self.target + ratio * size)
+            return True
+        if item_id in self._frequent_ghosts:
+            size = self._frequent_ghosts.pop(item_id)
+            ratio = max(1.0, len(self._recent_ghosts) / max(len(self._frequent_ghosts), 1))
+            self.target = max(0.0, self.target - ratio * size)
+            return True
+        return super().on_hit(item_id, access_count)
+
+def create_eviction_policy(name: Optional[str] = None, capacity: Optional[int] = None) -> EvictionPolicy:
+    """
+    Policy by name ("lru", "lfu" or "arc"; default Config.MEMORY_EVICTION_POLICY).
+    `capacity` is the size of the tier it manages, used by ARC.
+    """
+    name = name or Config.MEMORY_EVICTION_POLICY
+    if name == "lru":
+        return LRUPolicy()
+    elif name == "lfu":
+        return LFUPolicy()
+    elif name == "arc":
+        return ARCPolicy(capacity=capacity)
+    else:
+        raise ValueError(f"Unknown eviction policy: {name}")
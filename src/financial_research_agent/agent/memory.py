@@ -1,56 +1,585 @@
-from typing import List, Optional
+import re
+import sys
+import math
+import time
+import uuid
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, Future
+from array import array
+from datetime import datetime
+from collections import Counter
+from typing import List, Dict, Any, Container, Iterable, Iterator, Optional, Tuple, Union
+import numpy as np
 from src.financial_research_agent.models import MemoryItem
+from src.financial_research_agent.llm_client import LLMRouter, estimate_tokens
+from src.financial_research_agent.embeddings import EmbeddingService, get_default_embedding_service
+from src.financial_research_agent.vector_index import VectorIndex
+from src.financial_research_agent.agent.eviction import AccessStats, EvictionPolicy, create_eviction_policy
+from src.financial_research_agent.long_term_store import LongTermStore, get_default_long_term_store
 from src.financial_research_agent.config import Config
 
+_TERM_PATTERN = re.compile(r"[a-z0-9]+|[\u4e00-\u9fff]")
+
+
+def _terms(text: str) -> List[str]:
+    return _TERM_PATTERN.findall(text.lower())
+
+class MemoryTier:
+    """
+    One memory tier, stored column-wise: ids and (interned) contents in
+    lists, timestamps, access counts, last access times and token counts
+    in packed arrays, vectors in the tier's float32 index. Items are materialized as
+    lightweight MemoryItem views on access, so mutating a returned item
+    does not change the tier. Rows are kept in insertion order and looked
+    up through an id -> row dict, so lookups and removals are O(1);
+    removed rows are compacted away once they outnumber live ones.
+    Adding an item with an existing id replaces it. The vector index is
+    built on first search and then kept in step with adds and removals.
+    With `count_tokens`, the tier keeps a running token total of its
+    contents. Thread-safe, so a tier can be shared between managers.
+    """
+
+    persistent = False
+
+    def __init__(
+        self,
+        name: str,
+        items: Iterable[MemoryItem] = (),
+        embedder: Optional[EmbeddingService] = None,
+        count_tokens: bool = False
+    ):
+        self.name = name
+        self.embedder = embedder or get_default_embedding_service()
+        self.count_tokens = count_tokens
+        self.tokens = 0
+        self.lock = threading.RLock()
+        self._rows: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = [] # None marks a removed row
+        self._contents: List[Optional[str]] = []
+        self._timestamps = array("d")
+        self._access_counts = array("q")
+        self._last_access = array("d")
+        self._token_counts = array("q")
+        self._index: Optional[VectorIndex] = None
+        self._unindexed: Dict[str, None] = {} # Ids added since the index was last refreshed
+        self._embeddings: Dict[str, np.ndarray] = {} # Caller-supplied vectors not yet indexed
+        self.extend(items)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    def __iter__(self) -> Iterator[MemoryItem]:
+        return iter(self.items())
+
+    def get(self, item_id: str) -> Optional[MemoryItem]:
+        with self.lock:
+            row = self._rows.get(item_id)
+            return None if row is None else self._view(row)
+
+    def tokens_of(self, item_id: str) -> int:
+        row = self._rows.get(item_id)
+        return 0 if row is None else self._token_counts[row]
+
+    def touch(self, item_ids: Iterable[str], now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Records a hit on each given item (unknown ids are ignored): bumps its
+        access count and last access time. Returns the new access counts.
+        """
+        now = time.time() if now is None else now
+        counts = {}
+        with self.lock:
+            for item_id in item_ids:
+                row = self._rows.get(item_id)
+                if row is not None:
+                    self._access_counts[row] += 1
+                    self._last_access[row] = now
+                    counts[item_id] = self._access_counts[row]
+        return counts
+
+    def access_stats(self, exclude: Container[str] = ()) -> AccessStats:
+        """Access statistics of every item not in `exclude`, for an EvictionPolicy."""
+        with self.lock:
+            rows = [row for row, item_id in enumerate(self._ids) if item_id is not None and item_id not in exclude]
+            size = np.frombuffer(self._token_counts, dtype=np.int64)[rows] if self.count_tokens \
+                else np.ones(len(rows), dtype=np.int64)
+            return AccessStats(
+                [self._ids[row] for row in rows],
+                np.frombuffer(self._access_counts, dtype=np.int64)[rows],
+                np.frombuffer(self._last_access, dtype=np.float64)[rows],
+                size
+            )
+
+    def items(self) -> List[MemoryItem]:
+        with self.lock:
+            return [self._view(row) for row, item_id in enumerate(self._ids) if item_id is not None]
+
+    def append(self, item: MemoryItem):
+        with self.lock:
+            if item.id in self._rows:
+                self._remove_row(item.id) # Re-adding moves the item to the end
+                self._maybe_compact()
+            self._rows[item.id] = len(self._ids)
+            self._ids.append(item.id)
+            self._contents.append(sys.intern(item.content)) # Repeated contents share one string
+            timestamp = item.timestamp.timestamp()
+            self._timestamps.append(timestamp)
+            self._access_counts.append(item.access_count)
+            self._last_access.append(item.last_access.timestamp() if item.last_access is not None else timestamp)
+            tokens = estimate_tokens(item.content) if self.count_tokens else 0
+            self._token_counts.append(tokens)
+            self.tokens += tokens
+            if item.embedding is not None and len(item.embedding) == self.embedder.dim:
+                self._embeddings[item.id] = np.asarray(item.embedding, dtype=np.float32)
+            if self._index is not None:
+                self._unindexed[item.id] = None
+
+    def extend(self, items: Iterable[MemoryItem]):
+        with self.lock:
+            for item in items:
+                self.append(item)
+
+    def remove(self, item_ids: Iterable[str]) -> List[MemoryItem]:
+        """Removes the given ids (unknown ids are ignored); returns the removed items."""
+        removed = []
+        with self.lock:
+            for item_id in item_ids:
+                if item_id in self._rows:
+                    removed.append(self._view(self._rows[item_id]))
+                    self._remove_row(item_id)
+            self._maybe_compact()
+        return removed
+
+    def clear(self):
+        with self.lock:
+            self._rows.clear()
+            self._ids.clear()
+            self._contents.clear()
+            self._timestamps = array("d")
+            self._access_counts = array("q")
+            self._last_access = array("d")
+            self._token_counts = array("q")
+            self.tokens = 0
+            self._index = None
+            self._unindexed.clear()
+            self._embeddings.clear()
+
+    def refresh_index(self, chunk_size: int = 10000):
+        """
+        Indexes items added since the last refresh (all items on the first
+        call). Items that carried an embedding of the right size keep it;
+        the rest are embedded from their content.
+        """
+        with self.lock:
+            if self._index is None:
+                self._index = VectorIndex(self.embedder.dim)
+                pending = [item_id for item_id in self._ids if item_id is not None]
+            else:
+                pending = list(self._unindexed)
+            self._unindexed.clear()
+            self._index.reserve(len(self._index) + len(pending))
+            for start in range(0, len(pending), chunk_size):
+                batch = pending[start:start + chunk_size]
+                self._index.add(batch, self._embed(batch))
+
+    def search(self, vector, k: int, text: Optional[str] = None) -> List[Tuple[MemoryItem, float]]:
+        """
+        The k items most similar to `vector`, best first, with cosine scores.
+        `text` is only used by tiers with a full-text index (LongTermStore).
+        """
+        with self.lock:
+            self.refresh_index()
+            return [(self._view(self._rows[key]), score) for key, score in self._index.search(vector, k)]
+
+    def _view(self, row: int) -> MemoryItem:
+        access_count = self._access_counts[row]
+        return MemoryItem(
+            id=self._ids[row],
+            content=self._contents[row],
+            type=self.name,
+            timestamp=datetime.fromtimestamp(self._timestamps[row]),
+            access_count=access_count,
+            last_access=datetime.fromtimestamp(self._last_access[row]) if access_count else None,
+        )
+
+    def _remove_row(self, item_id: str):
+        row = self._rows.pop(item_id)
+        self._ids[row] = None
+        self._contents[row] = None
+        self.tokens -= self._token_counts[row]
+        self._embeddings.pop(item_id, None)
+        self._unindexed.pop(item_id, None)
+        if self._index is not None:
+            self._index.remove([item_id])
+
+    def _maybe_compact(self):
+        if len(self._ids) > 1024 and len(self._ids) > 2 * len(self._rows):
+            self._compact()
+
+    def _compact(self):
+        live = [row for row, item_id in enumerate(self._ids) if item_id is not None]
+        self._ids = [self._ids[row] for row in live]
+        self._contents = [self._contents[row] for row in live]
+        self._timestamps = array("d", (self._timestamps[row] for row in live))
+        self._access_counts = array("q", (self._access_counts[row] for row in live))
+        self._last_access = array("d", (self._last_access[row] for row in live))
+        self._token_counts = array("q", (self._token_counts[row] for row in live))
+        self._rows = {item_id: row for row, item_id in enumerate(self._ids)}
+
+    def _embed(self, item_ids: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(item_ids), self.embedder.dim), dtype=np.float32)
+        missing = []
+        for i, item_id in enumerate(item_ids):
+            supplied = self._embeddings.pop(item_id, None)
+            if supplied is not None:
+                vectors[i] = supplied
+            else:
+                missing.append(i)
+        if missing:
+            vectors[missing] = self.embedder.embed_batch([self._contents[self._rows[item_ids[i]]] for i in missing])
+        return vectors
+
 class MemoryManager:
     """
     Hierarchical Recursive Memory Network (HRMN).
     Section 2.1 & 2.3.
     """
     
-    def __init__(self):
-        self.working_memory: List[MemoryItem] = []
-        self.episodic_memory: List[MemoryItem] = []
-        self.long_term_memory: List[MemoryItem] = []
+    def __init__(
+        self,
+        long_term_memory: Optional[Union[MemoryTier, LongTermStore]] = None,
+        embedder: Optional[EmbeddingService] = None,
+        router: Optional[LLMRouter] = None,
+        eviction_policy: Optional[str] = None
+    ):
+        self.embedder = embedder or get_default_embedding_service()
+        self.router = router
+        # Which working items compression demotes, and which hits bring items back
+        self.policy: EvictionPolicy = create_eviction_policy(eviction_policy, Config.WORKING_MEMORY_TARGET)
+        # Which episodic items are demoted to long-term past Config.EPISODIC_MEMORY_LIMIT
+        self.episodic_policy: EvictionPolicy = create_eviction_policy(eviction_policy, Config.EPISODIC_MEMORY_LIMIT)
+        self.working = MemoryTier("working", embedder=self.embedder, count_tokens=True)
+        self.episodic = MemoryTier("episodic", embedder=self.embedder)
+        # May be shared between managers (e.g. across queries in a batch run), or persistent
+        if long_term_memory is None:
+            long_term_memory = get_default_long_term_store() if Config.LONG_TERM_MEMORY_PERSISTENT \
+                else MemoryTier("long_term", embedder=self.embedder)
+        self.long_term = long_term_memory
+        # Guards multi-tier operations when subtasks are researched concurrently
+        self.lock = threading.RLock()
+        # Background compression: one job at a time, never blocking add_to_working
+        self._compressor: Optional[ThreadPoolExecutor] = None
+        self._compression: Optional[Future] = None
+        self._compression_scheduled = False
+        self._compressing: Dict[str, MemoryItem] = {} # Items being summarized
+
+    @property
+    def tiers(self) -> Dict[str, Union[MemoryTier, LongTermStore]]:
+        return {"working": self.working, "episodic": self.episodic, "long_term": self.long_term}
+
+    # Read-only list views of the tiers; mutate through the MemoryTier objects
+    @property
+    def working_memory(self) -> List[MemoryItem]:
+        return self.working.items()
+
+    @property
+    def episodic_memory(self) -> List[MemoryItem]:
+        return self.episodic.items()
+
+    @property
+    def long_term_memory(self) -> List[MemoryItem]:
+        return self.long_term.items()
 
     def add_to_working(self, item: MemoryItem):
-        self.working_memory.append(item)
-        if len(self.working_memory) > Config.WORKING_MEMORY_LIMIT: # conceptual check
-            self.compress_working_memory()
+        """
+        Adds an item to working memory. Once the tier holds more than
+        Config.WORKING_MEMORY_LIMIT tokens, compression starts in the
+        background; the caller never waits for it.
+        """
+        with self.lock:
+            self.working.append(item)
+            self._check_working_limit()
 
-    def compress_working_memory(self):
+    def compress_working_memory(self) -> int:
         """
-        Moves items from working to episodic memory with summarization.
+        Moves items from working to episodic memory with summarization:
+        the coldest items by the eviction policy, beyond
+        Config.WORKING_MEMORY_TARGET tokens (at most
+        Config.MEMORY_COMPRESSION_BATCH_TOKENS per call), are summarized into
+        one episodic item and demoted to episodic memory themselves, so
+        their ids still resolve. Returns the number of items compressed.
         """
-        # Placeholder: Summarize content using LLM
-        summary_item = MemoryItem(
-            id="summary_x", 
-            content="Summary of previous steps...", 
-            type="episodic"
-        )
-        self.episodic_memory.append(summary_item)
-        self.working_memory = [] # Clear working memory or keep only essential
+        with self.lock:
+            excess = self.working.tokens - sum(self.working.tokens_of(i) for i in self._compressing) \
+                - Config.WORKING_MEMORY_TARGET
+            victims = self.policy.victims(
+                self.working.access_stats(exclude=self._compressing),
+                min(excess, Config.MEMORY_COMPRESSION_BATCH_TOKENS)
+            )
+            batch = [self.working.get(item_id) for item_id in victims]
+            self._compressing.update((m.id, m) for m in batch)
+        if not batch:
+            return 0
+
+        try:
+            # The LLM call runs without the lock, so research keeps adding items meanwhile
+            summary = self._summarize(batch)
+        finally:
+            with self.lock:
+                for m in batch:
+                    self._compressing.pop(m.id, None)
+        with self.lock:
+            self.promote([m.id for m in batch if m.id in self.working], "episodic")
+            self.episodic.append(MemoryItem(id=f"summary_{uuid.uuid4().hex}", content=summary, type="episodic"))
+        return len(batch)
+
+    def wait_for_compression(self):
+        """Blocks until background compression (if any) has finished."""
+        while True:
+            with self.lock:
+                compression = self._compression
+            if compression is None or compression.done():
+                return
+            compression.result()
+
+    def close(self):
+        """Waits for background compression, then shuts its thread down."""
+        try:
+            self.wait_for_compression()
+        finally:
+            with self.lock:
+                compressor, self._compressor = self._compressor, None
+            if compressor is not None:
+                compressor.shutdown()
+
+    def _schedule_compression(self):
+        self._compression_scheduled = True
+        if self._compressor is None:
+            self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-compress")
+        ctx = contextvars.copy_context()
+        self._compression = self._compressor.submit(ctx.run, self._compress_to_target)
+
+    def _check_working_limit(self):
+        if self.working.tokens > Config.WORKING_MEMORY_LIMIT and not self._compression_scheduled:
+            self._schedule_compression()
+
+    def _compress_to_target(self):
+        # Down to the target, not the limit, so compression does not restart on the next add
+        try:
+            while self.working.tokens > Config.WORKING_MEMORY_TARGET and self.compress_working_memory():
+                pass
+            self.demote_episodic_memory()
+        except BaseException:
+            with self.lock:
+                self._compression_scheduled = False
+            raise
+        with self.lock:
+            self._compression_scheduled = False
+            # Adds that crossed the limit while this pass was finishing did not schedule one
+            self._check_working_limit()
 
-    def recall(self, query: str) -> List[MemoryItem]:
+    def demote_episodic_memory(self) -> int:
         """
-        Retrieves relevant info from episodic/long-term memory.
+        Moves the coldest episodic items beyond Config.EPISODIC_MEMORY_LIMIT
+        to long-term memory; returns how many were moved.
         """
-        # Placeholder: Vector search
-        return self.episodic_memory[:2]
+        limit = Config.EPISODIC_MEMORY_LIMIT
+        with self.lock:
+            if limit is None or len(self.episodic) <= limit:
+                return 0
+            victims = self.episodic_policy.victims(self.episodic.access_stats(), len(self.episodic) - limit)
+            self.promote(victims, "long_term")
+            return len(victims)
+
+    def _record_hits(self, tier: Union[MemoryTier, LongTermStore], item_ids: List[str]):
+        """
+        Feeds recall/attach_evidence hits to the tier and the eviction
+        policy. Items the policy finds hot are copied into working memory;
+        the lower-tier copy stays, so recall keeps finding them, and is
+        replaced when compression demotes the working copy again.
+        """
+        with self.lock:
+            counts = tier.touch(item_ids)
+            if tier is self.working:
+                return
+            self.working.touch(item_id for item_id in counts if item_id in self.working)
+            hot = [
+                item_id for item_id, count in counts.items()
+                if item_id not in self.working and self.policy.on_hit(item_id, count)
+            ]
+            if not hot:
+                return
+            self.working.extend(
+                item.model_copy(update={"type": "working"}) for item in map(tier.get, hot) if item is not None
+            )
+            self._check_working_limit()
+
+    def _summarize(self, items: List[MemoryItem]) -> str:
+        evidence = "\n".join(f"[{m.id}] {m.content}" for m in items)
+        if self.router is None:
+            # Placeholder: extractive summary
+            return f"Summary of {len(items)} previous steps:\n{evidence[:Config.MEMORY_SUMMARY_MAX_TOKENS * 4]}"
+        messages = [
+            {
+                "role": "system",
+                "content": "Summarize these research notes for later report writing. Keep figures, "
+                           "names and dates, and cite evidence IDs in square brackets."
+            },
+            {"role": "user", "content": evidence}
+        ]
+        response = self.router.route("summarize", messages, temperature=0.0,
+                                     max_tokens=Config.MEMORY_SUMMARY_MAX_TOKENS)
+        return response.content
+
+    def recall(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        tiers: Iterable[str] = ("episodic", "long_term")
+    ) -> List[MemoryItem]:
+        """
+        Retrieves relevant info from episodic/long-term memory (or the named
+        `tiers`): the k (default Config.MEMORY_RECALL_TOP_K) items most
+        similar to the query.
+        """
+        k = k or Config.MEMORY_RECALL_TOP_K
+        searched = [self.tiers[name] for name in tiers if len(self.tiers[name])]
+        if not searched:
+            return []
+        vector = self.embedder.embed(query)
+        hits = []
+        for tier in searched:
+            hits += [(score, item, tier) for item, score in tier.search(vector, k, text=query) if score > 0]
+        hits.sort(key=lambda hit: -hit[0])
+        hits = hits[:k]
+        for tier in searched:
+            hit_ids = [item.id for _, item, hit_tier in hits if hit_tier is tier]
+            if hit_ids:
+                self._record_hits(tier, hit_ids)
+        return [item for _, item, _ in hits]
+
+    def refresh_index(self):
+        """
+        Brings the episodic/long-term vector indexes up to date (otherwise
+        done by the next recall).
+        """
+        for tier in (self.episodic, self.long_term):
+            tier.refresh_index()
+
+    def select_evidence(
+        self,
+        query: str,
+        token_budget: Optional[int] = None,
+        candidates: Optional[List[MemoryItem]] = None
+    ) -> List[MemoryItem]:
+        """
+        Relevance-ranked evidence for one section from working and episodic
+        memory (or the given candidates), filled greedily up to
+        `token_budget` (default Config.EVIDENCE_TOKEN_BUDGET). Items
+        repeating an id or content already selected are skipped, so prompt
+        size follows the section, not the size of the run.
+        """
+        budget = Config.EVIDENCE_TOKEN_BUDGET if token_budget is None else token_budget
+        if candidates is None:
+            with self.lock:
+                candidates = self.working.items() + self.episodic.items()
+
+        # BM25-style term saturation weighted by IDF over the candidates
+        query_terms = set(_terms(query))
+        doc_terms = [Counter(_terms(m.content)) for m in candidates]
+        df = Counter(t for terms in doc_terms for t in query_terms & terms.keys())
+        idf = {t: math.log(1 + len(candidates) / (1 + df[t])) for t in query_terms}
+        scores = [
+            sum(idf[t] * terms[t] / (terms[t] + 1.2) for t in query_terms if t in terms)
+            for terms in doc_terms
+        ]
+        # Highest score first; ties go to the most recent item
+        ranked = sorted(range(len(candidates)), key=lambda i: (-scores[i], -i))
+
+        selected = []
+        seen_ids, seen_content = set(), set()
+        used = 0
+        for i in ranked:
+            item = candidates[i]
+            content_key = " ".join(item.content.split()).lower()
+            if item.id in seen_ids or content_key in seen_content:
+                continue
+            cost = estimate_tokens(item.content) + Config.EVIDENCE_ITEM_OVERHEAD_TOKENS
+            if used + cost > budget:
+                continue
+            selected.append(item)
+            seen_ids.add(item.id)
+            seen_content.add(content_key)
+            used += cost
+        return selected
 
     def page_out(self, item_ids: List[str]):
         """
         Explicitly removes items from working memory.
         """
-        self.working_memory = [i for i in self.working_memory if i.id not in item_ids]
+        self.working.remove(item_ids)
+
+    def promote(self, item_ids: Iterable[str], tier: str):
+        """
+        Moves items, wherever they are, into `tier` ("working", "episodic"
+        or "long_term"). Unknown ids are ignored.
+        """
+        target = self.tiers[tier]
+        sources = [t for t in self.tiers.values() if t is not target]
+        with self.lock:
+            by_source = {id(source): [] for source in sources}
+            for item_id in item_ids:
+                for source in sources:
+                    if item_id in source:
+                        by_source[id(source)].append(item_id)
+                        break
+            for source in sources:
+                if by_source[id(source)]:
+                    target.extend(
+                        item.model_copy(update={"type": tier}) for item in source.remove(by_source[id(source)])
+                    )
 
     def attach_evidence(self, evidence_id: str) -> Optional[MemoryItem]:
         """
-        Loads raw evidence for writing/checking.
+        Loads raw evidence for writing/checking, counting it as a hit.
         """
-        # Search in all memories
-        all_mem = self.working_memory + self.episodic_memory + self.long_term_memory
-        for m in all_mem:
-            if m.id == evidence_id:
-                return m
+        for tier in (self.working, self.episodic, self.long_term):
+            item = tier.get(evidence_id)
+            if item is not None:
+                self._record_hits(tier, [evidence_id])
+                return item
         return None
+
+    def consolidate(self):
+        """
+        Copies working and episodic items into long-term memory, where later
+        runs (or other workers sharing the tier) can recall them.
+        """
+        with self.lock:
+            items = self.working.items() + self.episodic.items()
+        self.long_term.extend(item.model_copy(update={"type": "long_term"}) for item in items)
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        JSON-serializable copy of the in-process tiers (for checkpoints);
+        a persistent long-term store is not copied.
+        """
+        with self.lock:
+            return {
+                name: [m.model_dump(mode="json") for m in tier]
+                for name, tier in self.tiers.items() if not tier.persistent
+            }
+
+    def restore(self, snapshot: Dict[str, List[Dict[str, Any]]]):
+        """
+        Replaces the in-process tiers with the contents of a snapshot().
+        """
+        with self.lock:
+            # Refill in place: the long-term tier may be shared
+            for name, tier in self.tiers.items():
+                if not tier.persistent:
+                    tier.clear()
+                    tier.extend(MemoryItem.model_validate(m) for m in snapshot.get(name, []))
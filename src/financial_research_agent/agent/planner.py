@@ -1,18 +1,216 @@
-from typing import List
-from pydantic import BaseModel
+import re
+import json
+import threading
+from functools import lru_cache
+from typing import List, Dict, Set, Iterable, Iterator, Optional
+from pydantic import BaseModel, Field
+from src.financial_research_agent.models import ResearchStep
+from src.financial_research_agent.llm_client import LLMRouter
+from src.financial_research_agent.config import Config
 
 class SubTask(BaseModel):
     id: str
     description: str
     perspective: str # Section 2.2.1 (Technical, Financial, etc.)
-    status: str = "pending"
+    status: str = "pending" # pending, in_progress, researched, completed, dropped, merged
+    depends_on: List[str] = Field(default_factory=list) # IDs of subtasks whose research this one builds on
+    expected_gain: float = 1.0 # Expected information gain of researching this subtask
+    cost: float = Field(default_factory=lambda: Config.SUBTASK_DEFAULT_COST) # Research budget units
+    parent_id: Optional[str] = None # Subtask whose findings prompted this follow-up
+
+@lru_cache(maxsize=4096)
+def _terms(text: str) -> frozenset:
+    return frozenset(re.findall(r"[a-z0-9]+|[\u4e00-\u9fff]", text.lower()))
+
+def _overlap(a: str, b: str) -> float:
+    """Jaccard similarity of two descriptions' terms."""
+    terms_a, terms_b = _terms(a), _terms(b)
+    if not terms_a or not terms_b:
+        return 0.0
+    return len(terms_a & terms_b) / len(terms_a | terms_b)
+
+class ResearchPlan:
+    """
+    Subtasks prioritized by expected information gain per unit cost,
+    under a research budget. The executor asks for priority_of() each time
+    it picks among ready subtasks, so reprioritizing takes effect
+    immediately. Iterating yields tasks in outline (insertion) order,
+    which is the report order. Once an executor has registered a
+    subtask's dependencies it freezes the subtask, and later merges and
+    drops leave its dependencies as they are.
+    """
+
+    def __init__(self, tasks: Iterable[SubTask] = (), budget: Optional[float] = None):
+        self.budget = budget
+        self.spent = 0.0
+        self._tasks: Dict[str, SubTask] = {}
+        self._frozen: Set[str] = set()
+        self._lock = threading.RLock()
+        for task in tasks:
+            if task.status == "in_progress":
+                task.status = "pending" # Interrupted before its research finished
+            self.add(task)
+            if task.status in ("researched", "completed"):
+                self.spent += task.cost
+
+    @staticmethod
+    def priority(task: SubTask) -> float:
+        return task.expected_gain / max(task.cost, 1e-9)
+
+    def add(self, task: SubTask):
+        """Inserts (or replaces) a subtask; allowed at any point in a run."""
+        with self._lock:
+            self._tasks[task.id] = task
+
+    def freeze(self, task_id: str):
+        """Fixes the subtask's dependencies from now on."""
+        with self._lock:
+            self._frozen.add(task_id)
+
+    def get(self, task_id: str) -> Optional[SubTask]:
+        return self._tasks.get(task_id)
+
+    def priority_of(self, task_id: str) -> float:
+        with self._lock:
+            return self.priority(self._tasks[task_id])
+
+    def reprioritize(self, task_id: str, expected_gain: Optional[float] = None, cost: Optional[float] = None):
+        with self._lock:
+            task = self._tasks[task_id]
+            if expected_gain is not None:
+                task.expected_gain = expected_gain
+            if cost is not None:
+                task.cost = cost
+
+    def pending(self) -> List[SubTask]:
+        """Pending subtasks, highest priority first."""
+        with self._lock:
+            return sorted(
+                (t for t in self._tasks.values() if t.status == "pending"),
+                key=lambda t: -self.priority(t)
+            )
+
+    @property
+    def active(self) -> List[SubTask]:
+        """Subtasks that will appear in the report (not dropped or merged)."""
+        return [t for t in self if t.status not in ("dropped", "merged")]
+
+    def remaining_budget(self) -> Optional[float]:
+        return None if self.budget is None else self.budget - self.spent
+
+    def reserve(self, task_id: str) -> bool:
+        """
+        Charges the subtask's cost against the budget as its research starts
+        and marks it in progress. Returns False, dropping the subtask, once
+        it no longer fits.
+        """
+        with self._lock:
+            task = self._tasks[task_id]
+            if task.status != "pending":
+                return False
+            if self.budget is not None and self.spent + task.cost > self.budget + 1e-9:
+                self.drop(task_id)
+                return False
+            self.spent += task.cost
+            task.status = "in_progress"
+            return True
+
+    def drop(self, task_id: str):
+        with self._lock:
+            self._tasks[task_id].status = "dropped"
+            self._redirect_dependencies(task_id, None)
+
+    def can_merge(self, source_id: str, target_id: str) -> bool:
+        """
+        True if folding the source into the target neither creates a
+        dependency cycle nor changes the dependencies of a frozen subtask.
+        """
+        with self._lock:
+            if source_id == target_id or self._reaches(source_id, target_id) or self._reaches(target_id, source_id):
+                return False
+            source, target = self._tasks[source_id], self._tasks[target_id]
+            if target_id in self._frozen and not set(source.depends_on) <= set(target.depends_on):
+                return False
+            return not any(source_id in self._tasks[t].depends_on for t in self._frozen)
+
+    def merge(self, source_id: str, target_id: str):
+        """
+        Folds a pending subtask into another pending one: the target covers
+        both descriptions for the larger of the two costs, assuming their
+        research overlaps. Raises ValueError unless can_merge() allows it.
+        """
+        with self._lock:
+            if not self.can_merge(source_id, target_id):
+                raise ValueError(f"Cannot merge subtask {source_id} into {target_id}")
+            source, target = self._tasks[source_id], self._tasks[target_id]
+            target.description = f"{target.description}; {source.description}"
+            target.expected_gain = max(target.expected_gain, source.expected_gain) \
+                + 0.5 * min(target.expected_gain, source.expected_gain)
+            target.cost = max(target.cost, source.cost)
+            target.depends_on = [d for d in dict.fromkeys(target.depends_on + source.depends_on) if d != target_id]
+            source.status = "merged"
+            self._redirect_dependencies(source_id, target_id)
+
+    def fit_budget(self) -> List[str]:
+        """
+        While committed cost exceeds the budget, merges the lowest-value
+        pending subtask into a pending one with the same perspective, or
+        drops it if there is none. Returns the affected subtask IDs.
+        """
+        affected = []
+        with self._lock:
+            if self.budget is None:
+                return affected
+            while True:
+                pending = self.pending()
+                if not pending or self.spent + sum(t.cost for t in pending) <= self.budget + 1e-9:
+                    return affected
+                lowest = pending[-1]
+                target = next(
+                    (t for t in pending[:-1] if t.perspective == lowest.perspective and self.can_merge(lowest.id, t.id)),
+                    None
+                )
+                if target is not None:
+                    self.merge(lowest.id, target.id)
+                else:
+                    self.drop(lowest.id)
+                affected.append(lowest.id)
+
+    def __iter__(self) -> Iterator[SubTask]:
+        with self._lock:
+            return iter(list(self._tasks.values()))
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def _reaches(self, from_id: str, to_id: str) -> bool:
+        """True if from_id depends on to_id, directly or transitively."""
+        stack, visited = [from_id], set()
+        while stack:
+            task_id = stack.pop()
+            for dep in self._tasks[task_id].depends_on:
+                if dep == to_id:
+                    return True
+                if dep not in visited and dep in self._tasks:
+                    visited.add(dep)
+                    stack.append(dep)
+        return False
+
+    def _redirect_dependencies(self, old_id: str, new_id: Optional[str]):
+        for task in self._tasks.values():
+            if old_id in task.depends_on and task.id not in self._frozen:
+                deps = [new_id if d == old_id else d for d in task.depends_on]
+                task.depends_on = [d for d in dict.fromkeys(deps) if d is not None and d != task.id]
 
 class PlannerAgent:
     """
     Control Layer: Decomposes query into subtasks/outline.
     Section 2.1.
     """
-    
+
+    def __init__(self, router: Optional[LLMRouter] = None):
+        self.router = router
+
     def create_plan(self, user_query: str) -> List[SubTask]:
         """
         Decomposes the user query into a list of subtasks with specific perspectives.
@@ -22,10 +220,102 @@ class PlannerAgent:
             SubTask(id="1", description="Analyze Market Size", perspective="Industry"),
             SubTask(id="2", description="Evaluate Key Competitors", perspective="Competition"),
             SubTask(id="3", description="Assess Supply Chain Risks", perspective="Risk"),
-            SubTask(id="4", description="Conclude Investment Value", perspective="Financial")
+            SubTask(id="4", description="Conclude Investment Value", perspective="Financial", depends_on=["1", "2", "3"])
         ]
 
-    def update_plan(self, current_plan: List[SubTask], completed_task_id: str) -> List[SubTask]:
+    def build_plan(self, user_query: str, budget: Optional[float] = None) -> ResearchPlan:
+        """
+        Creates the prioritized plan under a research budget
+        (default Config.RESEARCH_BUDGET); subtasks that do not fit are
+        merged or dropped, lowest value first.
+        """
+        tasks = self.create_plan(user_query)
+        for task in tasks:
+            task.expected_gain = self.estimate_gain(task, tasks)
+        plan = ResearchPlan(tasks, Config.RESEARCH_BUDGET if budget is None else budget)
+        plan.fit_budget()
+        return plan
+
+    def estimate_gain(self, task: SubTask, context: Iterable[SubTask]) -> float:
+        """
+        Heuristic information gain: perspective weight, discounted by overlap
+        with other subtasks, plus a bonus per subtask that builds on it.
+        """
+        # Placeholder: LLM/value model estimate
+        overlap = 0.0
+        dependents = 0
+        for other in context:
+            if other.id == task.id:
+                continue
+            overlap = max(overlap, _overlap(task.description, other.description))
+            dependents += task.id in other.depends_on
+        weight = Config.PERSPECTIVE_WEIGHTS.get(task.perspective, 1.0)
+        return weight * (1.0 - 0.5 * overlap) + 0.25 * dependents
+
+    def replan(self, plan: ResearchPlan, task: SubTask, steps: List[ResearchStep]) -> List[SubTask]:
+        """
+        Called after a subtask's research: discounts pending subtasks that
+        overlap what it covered and returns follow-up subtasks to insert
+        into the plan. Follow-ups are proposed by the LLM from the findings
+        in `steps` (none without a router), at most
+        Config.REPLAN_MAX_FOLLOW_UPS per subtask and only while the budget
+        left after the pending subtasks covers them. Follow-ups are not expanded further.
+        """
+        for pending in plan.pending():
+            overlap = _overlap(pending.description, task.description)
+            if overlap > 0:
+                plan.reprioritize(pending.id, expected_gain=pending.expected_gain * (1.0 - 0.5 * overlap))
+
+        if self.router is None or task.parent_id is not None or not steps:
+            return []
+        follow_ups = []
+        remaining = plan.remaining_budget()
+        if remaining is not None:
+            # Planned subtasks come first; follow-ups only use the slack
+            remaining -= sum(t.cost for t in plan.pending())
+        for i, proposal in enumerate(self.propose_follow_ups(task, steps)):
+            follow_up = SubTask(
+                id=f"{task.id}.{i + 1}",
+                description=proposal["description"],
+                perspective=proposal.get("perspective") or task.perspective,
+                depends_on=[task.id],
+                parent_id=task.id
+            )
+            if plan.get(follow_up.id) is not None or any(
+                _overlap(follow_up.description, other.description) >= Config.REPLAN_MAX_OVERLAP for other in plan
+            ):
+                continue
+            if remaining is not None:
+                if follow_up.cost > remaining + 1e-9:
+                    break
+                remaining -= follow_up.cost
+            follow_up.expected_gain = self.estimate_gain(follow_up, list(plan) + follow_ups)
+            follow_ups.append(follow_up)
+        return follow_ups
+
+    def propose_follow_ups(self, task: SubTask, steps: List[ResearchStep]) -> List[Dict[str, str]]:
+        """LLM-proposed follow-up subtasks ({"description", "perspective"}) for gaps in the findings."""
+        findings = "\n".join(str(step.observation.content) for step in steps)
+        messages = [
+            {
+                "role": "system",
+                "content": "You plan financial research. Given a subtask and its findings, propose follow-up "
+                           "subtasks only for important open questions the findings leave unanswered. Reply in "
+                           "JSON: {\"follow_ups\": [{\"description\": str, \"perspective\": str}, ...]}, "
+                           "with an empty list when the findings are sufficient."
+            },
+            {"role": "user", "content": f"Subtask ({task.perspective}): {task.description}\n\nFindings:\n{findings}"}
+        ]
+        response = self.router.route("planning", messages, temperature=0.0, json_mode=True)
+        try:
+            proposals = json.loads(response.content).get("follow_ups", [])
+        except (ValueError, AttributeError):
+            return []
+        return [
+            p for p in proposals if isinstance(p, dict) and isinstance(p.get("description"), str)
+        ][:Config.REPLAN_MAX_FOLLOW_UPS]
+
+    def update_plan(self, current_plan: Iterable[SubTask], completed_task_id: str) -> Iterable[SubTask]:
         for task in current_plan:
             if task.id == completed_task_id:
                 task.status = "completed"
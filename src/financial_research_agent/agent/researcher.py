@@ -1,8 +1,10 @@
-from typing import List
+from typing import List, Optional, Tuple
 from src.financial_research_agent.agent.memory import MemoryManager
 from src.financial_research_agent.agent.stopping import StoppingPolicy
 from src.financial_research_agent.data_pipeline.retrieval import RetrievalSystem
-from src.financial_research_agent.models import MemoryItem, ResearchStep, ResearchAction, ResearchObservation
+from src.financial_research_agent.models import (
+    AtomicInsightUnit, MemoryItem, ResearchStep, ResearchAction, ResearchObservation
+)
 import uuid
 
 class ResearcherAgent:
@@ -11,13 +13,25 @@ class ResearcherAgent:
     Section 2.1 & 2.2.
     """
     
-    def __init__(self, memory: MemoryManager):
+    def __init__(self, memory: MemoryManager, retrieval: Optional[RetrievalSystem] = None):
         self.memory = memory
-        self.retrieval = RetrievalSystem()
-        self.stopping = StoppingPolicy()
+        self.retrieval = retrieval or RetrievalSystem()
 
     def execute_task(self, subtask_description: str) -> List[ResearchStep]:
+        steps, _ = self.execute_task_with_evidence(subtask_description)
+        return steps
+
+    def execute_task_with_evidence(self, subtask_description: str) -> Tuple[List[ResearchStep], List[MemoryItem]]:
+        """
+        Runs the research loop; also returns the memory items it added,
+        so callers can scope evidence to this subtask or cache it.
+        """
         steps = []
+        evidence = []
+        seen_urls = set() # Documents already read for this subtask
+        aiu = AtomicInsightUnit(id=str(uuid.uuid4()), content=subtask_description)
+        # Saturation is judged per subtask; tasks may run concurrently
+        stopping = StoppingPolicy()
         
         # Initial search
         step = ResearchStep(
@@ -28,19 +42,25 @@ class ResearcherAgent:
         )
         
         # Loop until stopping condition
-        while not self.stopping.should_stop(step.observation.content):
+        while not stopping.should_stop(step.observation.content):
              # 1. Search
-            results = self.retrieval.search(subtask_description) # Simply using description as query for now
+            # Broad-to-narrow hops over the description; results come back ranked against it
+            results = self.retrieval.multi_hop_search(aiu, seen=seen_urls)
+            if not results:
+                # Every match has already been read; another pass would only repeat this one
+                break
             
             # 2. Read & Process (Mock)
             observation_content = f"Processed {len(results)} results."
             
             # 3. Update Memory
-            self.memory.add_to_working(MemoryItem(
+            item = MemoryItem(
                 id=str(uuid.uuid4()),
                 content=observation_content,
                 type="working"
-            ))
+            )
+            self.memory.add_to_working(item)
+            evidence.append(item)
             
             step = ResearchStep(
                 step_number=len(steps)+1,
@@ -54,4 +74,4 @@ class ResearcherAgent:
             if len(steps) > 3:
                 break
                 
-        return steps
+        return steps, evidence
@@ -1,29 +1,62 @@
 from src.financial_research_agent.models import ReportSection, MemoryItem
 from src.financial_research_agent.agent.memory import MemoryManager
-from typing import List
+from src.financial_research_agent.llm_client import LLMRouter
+from typing import List, Optional, Callable, Iterator
 
 class WriterAgent:
     """
     Execution Layer: Writes chapters based on outline and memory.
     """
-    
-    def __init__(self, memory: MemoryManager):
+
+    def __init__(self, memory: MemoryManager, router: Optional[LLMRouter] = None):
         self.memory = memory
+        self.router = router
 
-    def write_section(self, section_title: str, relevant_memories: List[MemoryItem]) -> ReportSection:
+    def write_section(
+        self,
+        section_title: str,
+        relevant_memories: List[MemoryItem],
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> ReportSection:
         """
         Generates a report section.
+        Each text delta is passed to `on_delta` as soon as it is produced,
+        so callers can display or post-process the section while it streams.
         """
-        # Placeholder: LLM generation based on memories
-        content = f"This is the content for section {section_title}.\n"
-        content += "Based on the following evidence:\n"
-        for mem in relevant_memories:
-            content += f"- {mem.content}\n"
-            
+        parts = []
+        for delta in self.stream_section(section_title, relevant_memories):
+            parts.append(delta)
+            if on_delta:
+                on_delta(delta)
+
         return ReportSection(
             title=section_title,
-            content=content,
+            content="".join(parts),
             subsections=[],
             citations=[m.id for m in relevant_memories]
         )
 
+    def stream_section(self, section_title: str, relevant_memories: List[MemoryItem]) -> Iterator[str]:
+        """
+        Yields the section text incrementally.
+        """
+        if self.router is None:
+            # Placeholder: LLM generation based on memories
+            yield f"This is the content for section {section_title}.\n"
+            yield "Based on the following evidence:\n"
+            for mem in relevant_memories:
+                yield f"- {mem.content}\n"
+            return
+
+        evidence = "\n".join(f"[{m.id}] {m.content}" for m in relevant_memories)
+        messages = [
+            {
+                "role": "system",
+                "content": "You are a financial research analyst. Write the requested report section "
+                           "using only the evidence provided, citing evidence IDs in square brackets."
+            },
+            {"role": "user", "content": f"Section: {section_title}\n\nEvidence:\n{evidence}"}
+        ]
+        for chunk in self.router.chat_stream("writing", messages):
+            if chunk.delta:
+                yield chunk.delta
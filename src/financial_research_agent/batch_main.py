@@ -0,0 +1,187 @@
+"""
+Batch entry point: generates reports for a file of queries on a worker pool.
+All workers share one LLM router (with its response cache and connection
+pool), one retrieval system and the long-term memory tier, so later
+queries start warm instead of paying a cold start each: cached
+deterministic LLM responses and searches are reused, and each section
+can draw on the findings earlier queries consolidated into the
+long-term tier. Routing feedback stays per query
+(LLMRouter.feedback_scope).
+
+    python -m src.financial_research_agent.batch_main queries.txt --workers 8
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Union
+from src.financial_research_agent.main import run_report
+from src.financial_research_agent.agent.memory import MemoryManager, MemoryTier
+from src.financial_research_agent.long_term_store import LongTermStore, get_default_long_term_store
+from src.financial_research_agent.data_pipeline.retrieval import RetrievalSystem
+from src.financial_research_agent.llm_client import LLMRouter, get_llm_router
+from src.financial_research_agent.tracing import Tracer
+from src.financial_research_agent.config import Config
+
+
+def load_queries(path: str) -> List[str]:
+    """
+    Reads queries from a text file (one per line, '#' comments allowed)
+    or a JSONL file whose records carry a "query" field.
+    """
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            queries.append(json.loads(line)["query"] if path.endswith(".jsonl") else line)
+    return queries
+
+
+def _slug(text: str, max_length: int = 60) -> str:
+    return re.sub(r"[^\w]+", "-", text).strip("-")[:max_length].lower() or "query"
+
+
+def _percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+class BatchReportRunner:
+    """
+    Runs run_report for many queries with shared, long-lived components.
+    Each query gets its own MemoryManager and Tracer; its memory is promoted
+    into the shared long-term tier once the report is done.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        output_dir: Optional[str] = None,
+        router: Optional[LLMRouter] = None,
+        retrieval: Optional[RetrievalSystem] = None,
+        long_term_memory: Optional[Union[MemoryTier, LongTermStore]] = None
+    ):
+        self.workers = workers or Config.BATCH_REPORT_WORKERS
+        self.output_dir = output_dir or Config.BATCH_REPORT_OUTPUT_DIR
+        self.router = router
+        self.retrieval = retrieval or RetrievalSystem()
+        self.long_term_memory = long_term_memory if long_term_memory is not None else MemoryTier("long_term")
+
+    def run(self, queries: List[str]) -> Dict[str, Any]:
+        """Processes all queries; returns (and writes) the batch summary."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        start = time.perf_counter()
+        results = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch") as pool:
+            futures = [pool.submit(self.run_query, i, q) for i, q in enumerate(queries)]
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                results.append(result)
+                status = "ok" if result["error"] is None else f"FAILED ({result['error']})"
+                print(f"[batch {done}/{len(queries)}] {status} {result['wall_time']:.2f}s {result['query']}",
+                      file=sys.stderr, flush=True)
+
+        summary = self._summarize(sorted(results, key=lambda r: r["index"]), time.perf_counter() - start)
+        with open(os.path.join(self.output_dir, "batch_summary.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return summary
+
+    def run_query(self, index: int, query: str) -> Dict[str, Any]:
+        """One query; failures are recorded rather than aborting the batch."""
+        tracer = Tracer()
+        memory = MemoryManager(long_term_memory=self.long_term_memory, router=self.router)
+        output_path = os.path.join(self.output_dir, f"{index:04d}-{_slug(query)}.json")
+        start = time.perf_counter()
+        error = None
+        try:
+            report = run_report(query, tracer, retrieval=self.retrieval, router=self.router,
+                                memory=memory, verbose=False)
+            # Makes this query's findings available to later queries
+            memory.consolidate()
+        except Exception as exc:
+            report = None
+            error = repr(exc)
+        finally:
+            memory.close()
+        wall_time = time.perf_counter() - start
+        trace = tracer.summary()
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "query": query,
+                "report": report.model_dump() if report else None,
+                "error": error,
+                "wall_time": wall_time,
+                "trace": {k: trace[k] for k in ("llm", "search", "by_name")},
+            }, f, ensure_ascii=False, indent=2, default=str)
+        return {
+            "index": index,
+            "query": query,
+            "output": output_path,
+            "error": error,
+            "wall_time": wall_time,
+            "llm": trace["llm"],
+            "searches": trace["search"]["calls"],
+            "searches_cached": trace["search"]["cached"],
+        }
+
+    def _summarize(self, results: List[Dict[str, Any]], wall_time: float) -> Dict[str, Any]:
+        latencies = [r["wall_time"] for r in results if r["error"] is None]
+        return {
+            "queries": len(results),
+            "succeeded": len(latencies),
+            "failed": len(results) - len(latencies),
+            "workers": self.workers,
+            "wall_time": wall_time,
+            "queries_per_minute": len(results) / wall_time * 60 if wall_time > 0 else 0.0,
+            "latency": {
+                "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+                "p50": _percentile(latencies, 50),
+                "p95": _percentile(latencies, 95),
+            },
+            "llm_calls": sum(r["llm"]["calls"] for r in results),
+            "llm_cached": sum(r["llm"]["cached"] for r in results),
+            "prompt_tokens": sum(r["llm"]["prompt_tokens"] for r in results),
+            "completion_tokens": sum(r["llm"]["completion_tokens"] for r in results),
+            "searches": sum(r["searches"] for r in results),
+            "searches_cached": sum(r["searches_cached"] for r in results),
+            "long_term_items": len(self.long_term_memory),
+            "results": [{k: r[k] for k in ("index", "query", "output", "error", "wall_time")} for r in results],
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate reports for a file of queries")
+    parser.add_argument("queries", help="Text file (one query per line) or JSONL with a 'query' field")
+    parser.add_argument("--workers", type=int, default=Config.BATCH_REPORT_WORKERS)
+    parser.add_argument("--output-dir", default=Config.BATCH_REPORT_OUTPUT_DIR)
+    parser.add_argument("--persistent-memory", action="store_true", default=Config.LONG_TERM_MEMORY_PERSISTENT,
+                        help=f"Share long-term memory with other runs via {Config.LONG_TERM_MEMORY_DIR}")
+    args = parser.parse_args(argv)
+
+    queries = load_queries(args.queries)
+    # One router for all workers: shared response cache, connection pool and routing stats
+    router = get_llm_router(cached=True) if Config.OPENAI_API_KEY else None
+    long_term_memory = get_default_long_term_store() if args.persistent_memory else None
+    summary = BatchReportRunner(args.workers, args.output_dir, router=router,
+                                long_term_memory=long_term_memory).run(queries)
+
+    print(f"=== Batch Complete ===")
+    print(f"{summary['succeeded']}/{summary['queries']} succeeded in {summary['wall_time']:.1f}s "
+          f"({summary['queries_per_minute']:.1f} queries/min, {summary['workers']} workers)")
+    print(f"Latency p50 {summary['latency']['p50']:.2f}s, p95 {summary['latency']['p95']:.2f}s; "
+          f"LLM calls {summary['llm_calls']} ({summary['llm_cached']} cached), "
+          f"searches {summary['searches']} ({summary['searches_cached']} cached)")
+    print(f"Results written to {args.output_dir}")
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
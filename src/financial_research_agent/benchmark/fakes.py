@@ -0,0 +1,224 @@
+"""
+Offline stand-ins for the LLM provider, the search provider and the planner.
+Latency and output size are drawn from seeded distributions so benchmark
+runs are repeatable without network access or API keys.
+"""
+
+import json
+import math
+import time
+import random
+import hashlib
+import threading
+from typing import List, Dict, Optional, Iterator
+from src.financial_research_agent.llm_client import (
+    BaseLLMClient,
+    LLMResponse,
+    StreamChunk,
+    estimate_tokens,
+)
+from src.financial_research_agent.data_pipeline.retrieval import RetrievalSystem
+from src.financial_research_agent.search_cache import SearchCache
+from src.financial_research_agent.agent.planner import PlannerAgent, SubTask
+from src.financial_research_agent.config import Config
+
+_VOCABULARY = (
+    "revenue margin growth capacity demand supply valuation risk policy subsidy "
+    "competitor share pricing inventory backlog guidance earnings cost actuator "
+    "sensor battery software platform customer contract order forecast segment"
+).split()
+
+_PERSPECTIVES = ["Industry", "Competition", "Risk", "Financial", "Technical", "Policy"]
+
+
+class LatencyModel:
+    """
+    Log-normal latency in seconds, parameterised by its median and sigma
+    (sigma=0 makes it constant). Heavy tails come from larger sigma.
+    """
+
+    def __init__(self, median: float, sigma: float = 0.5, seed: int = 0):
+        self.median = median
+        self.sigma = sigma
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        if self.median <= 0:
+            return 0.0
+        with self._lock:
+            return self.median * math.exp(self._rng.gauss(0.0, self.sigma))
+
+    def sleep(self) -> float:
+        delay = self.sample()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class SizeModel:
+    """Integer size drawn uniformly from [low, high], seeded."""
+
+    def __init__(self, low: int, high: int, seed: int = 0):
+        self.low = low
+        self.high = high
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> int:
+        with self._lock:
+            return self._rng.randint(self.low, self.high)
+
+
+def _seeded_rng(*parts: str) -> random.Random:
+    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _fake_text(rng: random.Random, tokens: int) -> str:
+    return " ".join(rng.choice(_VOCABULARY) for _ in range(tokens))
+
+
+class FakeLLMClient(BaseLLMClient):
+    """
+    Deterministic offline LLM. The same messages always produce the same
+    text; latency (time to first token) and completion length follow the
+    configured models. Streaming spreads `token_interval` between chunks.
+    """
+
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        completion_tokens: Optional[SizeModel] = None,
+        token_interval: float = 0.0,
+        chunk_tokens: int = 16,
+        seed: int = 0
+    ):
+        self.latency = latency or LatencyModel(0.02, 0.5, seed)
+        self.completion_tokens = completion_tokens or SizeModel(100, 400, seed)
+        self.token_interval = token_interval
+        self.chunk_tokens = chunk_tokens
+        self.seed = seed
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> LLMResponse:
+        content, usage = self._generate(messages, max_tokens, json_mode)
+        self.latency.sleep()
+        time.sleep(self.token_interval * usage["completion_tokens"])
+        return LLMResponse(content=content, model=model or "fake", usage=usage)
+
+    def complete(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None
+    ) -> LLMResponse:
+        return self.chat([{"role": "user", "content": prompt}], model, temperature, max_tokens)
+
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> Iterator[StreamChunk]:
+        content, usage = self._generate(messages, max_tokens, json_mode)
+        self.latency.sleep()
+        words = content.split(" ")
+        for i in range(0, len(words), self.chunk_tokens):
+            if i:
+                time.sleep(self.token_interval * self.chunk_tokens)
+            delta = " ".join(words[i:i + self.chunk_tokens])
+            yield StreamChunk(delta=delta if i == 0 else " " + delta, model=model or "fake")
+        yield StreamChunk(delta="", model=model or "fake", usage=usage, finish_reason="stop")
+
+    def _generate(self, messages: List[Dict[str, str]], max_tokens: Optional[int], json_mode: bool):
+        with self._lock:
+            self.calls += 1
+        prompt = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        rng = _seeded_rng(str(self.seed), prompt)
+        tokens = self.completion_tokens.sample()
+        if max_tokens:
+            tokens = min(tokens, max_tokens)
+        text = _fake_text(rng, tokens)
+        if json_mode:
+            text = json.dumps({"text": text})
+        usage = {
+            "prompt_tokens": estimate_tokens(prompt),
+            "completion_tokens": tokens,
+            "total_tokens": estimate_tokens(prompt) + tokens,
+        }
+        return text, usage
+
+
+class FakeRetrievalSystem(RetrievalSystem):
+    """
+    RetrievalSystem whose provider calls are served offline. Results are drawn from
+    a shared finite document pool, so repeated and related searches return
+    overlapping URLs, as real providers do.
+    """
+
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        result_count: Optional[SizeModel] = None,
+        content_tokens: Optional[SizeModel] = None,
+        url_pool: int = 50,
+        seed: int = 0
+    ):
+        super().__init__(cache=SearchCache()) # Own cache: scenarios do not warm each other
+        self.provider = "fake"
+        self.latency = latency or LatencyModel(0.01, 0.5, seed)
+        self.result_count = result_count or SizeModel(1, Config.MAX_SEARCH_RESULTS, seed)
+        self.content_tokens = content_tokens or SizeModel(50, 300, seed)
+        self.url_pool = url_pool
+        self.seed = seed
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _fetch(self, query: str) -> List[Dict]:
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        self.latency.sleep()
+        rng = _seeded_rng(str(self.seed), query, str(call))
+        results = []
+        for _ in range(self.result_count.sample()):
+            doc = rng.randrange(self.url_pool)
+            doc_rng = _seeded_rng(str(self.seed), str(doc))
+            results.append({
+                "title": f"Fake Document {doc}",
+                "content": _fake_text(
+                    doc_rng, doc_rng.randint(self.content_tokens.low, self.content_tokens.high)
+                ),
+                "url": f"https://example.com/docs/{doc}",
+            })
+        return results
+
+
+class FakePlannerAgent(PlannerAgent):
+    """Planner that returns a fixed number of subtasks (for scale tests)."""
+
+    def __init__(self, n_subtasks: int = 4):
+        super().__init__()
+        self.n_subtasks = n_subtasks
+
+    def create_plan(self, user_query: str) -> List[SubTask]:
+        return [
+            SubTask(
+                id=str(i + 1),
+                description=f"Subtask {i + 1} of {user_query}",
+                perspective=_PERSPECTIVES[i % len(_PERSPECTIVES)]
+            )
+            for i in range(self.n_subtasks)
+        ]
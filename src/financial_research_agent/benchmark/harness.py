@@ -0,0 +1,354 @@
+"""
+End-to-end benchmark suite on the offline fakes.
+Each scenario runs in its own subprocess so peak RSS is attributable to it;
+results are compared with a stored baseline and regressions fail the run.
+
+    python -m src.financial_research_agent.benchmark.harness
+    python -m src.financial_research_agent.benchmark.harness --suite full
+    python -m src.financial_research_agent.benchmark.harness --update-baseline
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import random
+import resource
+import argparse
+import tempfile
+import subprocess
+import contextlib
+from typing import List, Dict, Any, Callable, Optional
+from src.financial_research_agent.main import run_report
+from src.financial_research_agent.agent.memory import MemoryManager
+from src.financial_research_agent.models import MemoryItem, FinalReport, ReportSection, AtomicInsightUnit
+from src.financial_research_agent.evaluation.rewards import RewardSystem
+from src.financial_research_agent.data_pipeline.trajectory_generator import TrajectoryGenerator
+from src.financial_research_agent.data_pipeline.quality_filter import QualityFilter
+from src.financial_research_agent.data_pipeline.batch_jobs import BatchJobRunner, LocalBatchBackend
+from src.financial_research_agent.llm_client import LLMRouter
+from src.financial_research_agent.tracing import Tracer
+from src.financial_research_agent.benchmark.fakes import (
+    FakeLLMClient,
+    FakeRetrievalSystem,
+    FakePlannerAgent,
+    LatencyModel,
+)
+
+QUERY = "Analyze the investment opportunities in the humanoid robot industry in 2025"
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TOLERANCE = 0.25 # Relative slowdown tolerated before flagging a regression
+
+# Differences below these floors are treated as noise
+TIME_NOISE_FLOOR = 0.005 # Seconds
+RSS_NOISE_FLOOR = 5.0 # MB
+
+
+class _Stopwatch:
+    """Accumulates named stage timings."""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+
+def bench_report(n_subtasks: int) -> Dict[str, Any]:
+    """main.run_report with n subtasks on the fake LLM and search backends."""
+    llm = FakeLLMClient()
+    retrieval = FakeRetrievalSystem()
+    tracer = Tracer(enabled=True)
+    start = time.perf_counter()
+    run_report(
+        QUERY,
+        tracer,
+        planner=FakePlannerAgent(n_subtasks),
+        retrieval=retrieval,
+        router=LLMRouter(llm),
+        verbose=False
+    )
+    wall_time = time.perf_counter() - start
+    summary = tracer.summary()
+    return {
+        "wall_time": wall_time,
+        "throughput": n_subtasks / wall_time,
+        "unit": "subtasks/s",
+        "stages": {
+            name: summary["by_name"][name]["total_time"]
+            for name in ("plan", "execute", "research.subtask", "write.section", "review")
+            if name in summary["by_name"]
+        },
+        "counters": {
+            "llm_calls": llm.calls,
+            "search_calls": retrieval.calls,
+            "prompt_tokens": summary["llm"]["prompt_tokens"],
+            "completion_tokens": summary["llm"]["completion_tokens"],
+        },
+    }
+
+
+def bench_trajectory(n_queries: int) -> Dict[str, Any]:
+    """Forward synthesis, batch synthesis on a local backend, filtering and export."""
+    generator = TrajectoryGenerator()
+    quality_filter = QualityFilter()
+    queries = [f"{QUERY} #{i}" for i in range(n_queries)]
+    watch = _Stopwatch()
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as work_dir:
+        with watch.stage("forward"):
+            trajectories = [generator.generate_forward_trajectory(q) for q in queries]
+        with watch.stage("batch"):
+            runner = BatchJobRunner(
+                LocalBatchBackend(FakeLLMClient(latency=LatencyModel(0.001)), os.path.join(work_dir, "local")),
+                work_dir=work_dir,
+                poll_interval=0
+            )
+            generator.generate_forward_trajectories_batch(queries, runner)
+        with watch.stage("filter"):
+            kept = [t for t in trajectories if quality_filter.filter_trajectory(t)]
+        with watch.stage("export"):
+            for i, trajectory in enumerate(kept):
+                generator.export_trajectory_jsonl(trajectory, os.path.join(work_dir, f"{i}.jsonl"))
+    wall_time = time.perf_counter() - start
+    return {
+        "wall_time": wall_time,
+        "throughput": n_queries / wall_time,
+        "unit": "trajectories/s",
+        "stages": watch.stages,
+        "counters": {"kept": len(kept)},
+    }
+
+
+def bench_reward(n_sections: int, n_reports: int = 1000) -> Dict[str, Any]:
+    """RewardSystem over synthetic reports with n sections of cited content."""
+    rng = random.Random(0)
+    reports = []
+    for r in range(n_reports):
+        sections = []
+        for s in range(n_sections):
+            citations = [f"ev{r}_{s}_{c}" for c in range(rng.randint(1, 8))]
+            sections.append(ReportSection(
+                title=f"Section {s}",
+                content="lorem ipsum " * rng.randint(50, 200),
+                subsections=[ReportSection(title="Detail", content="", citations=citations[:2])],
+                citations=citations
+            ))
+        reports.append(FinalReport(
+            title=f"Investment Analysis: {QUERY}",
+            sections=sections,
+            executive_summary="",
+            references={c: c for c in citations}
+        ))
+    rewards = RewardSystem()
+    watch = _Stopwatch()
+    start = time.perf_counter()
+    with watch.stage("total_reward"):
+        for report in reports:
+            rewards.calculate_total_reward(report, QUERY)
+    with watch.stage("normalized_reward"):
+        for report in reports:
+            rewards.calculate_normalized_reward(report, QUERY)
+    wall_time = time.perf_counter() - start
+    return {
+        "wall_time": wall_time,
+        "throughput": n_reports / wall_time,
+        "unit": "reports/s",
+        "stages": watch.stages,
+        "counters": {},
+    }
+
+
+def bench_memory(n_items: int, n_lookups: int = 200) -> Dict[str, Any]:
+    """MemoryManager add/index/recall/attach_evidence/page_out with n resident items."""
+    rng = random.Random(0)
+    watch = _Stopwatch()
+    start = time.perf_counter()
+    def item(i: int) -> MemoryItem:
+        return MemoryItem(id=f"m{i}", content=f"Evidence item {i} about revenue and margins", type="episodic")
+
+    memory = MemoryManager()
+    # Resident evidence lives in the episodic tier; items are not kept elsewhere,
+    # so peak RSS reflects the tier's own footprint
+    with watch.stage("build"):
+        memory.episodic.extend(item(i) for i in range(n_items))
+    with watch.stage("add_to_working"):
+        for i in range(min(n_items, 10000)):
+            memory.add_to_working(item(i))
+        memory.wait_for_compression()
+    with watch.stage("index"):
+        memory.refresh_index()
+    with watch.stage("recall"):
+        for i in range(n_lookups):
+            memory.recall(f"revenue {i}")
+    with watch.stage("attach_evidence"):
+        for _ in range(n_lookups):
+            memory.attach_evidence(f"m{rng.randrange(n_items)}")
+    with watch.stage("page_out"):
+        for _ in range(n_lookups):
+            memory.page_out([f"m{rng.randrange(n_items)}" for _ in range(10)])
+    wall_time = time.perf_counter() - start
+    memory.close()
+    return {
+        "wall_time": wall_time,
+        "throughput": n_items / wall_time,
+        "unit": "items/s",
+        "stages": watch.stages,
+        "counters": {},
+    }
+
+
+def bench_retrieval(n_aius: int) -> Dict[str, Any]:
+    """Multi-hop evidence retrieval per AIU, against one plain search per AIU."""
+    aius = [AtomicInsightUnit(id=f"a{i}", content=f"Claim {i} about humanoid robot revenue") for i in range(n_aius)]
+    watch = _Stopwatch()
+    single = FakeRetrievalSystem()
+    with watch.stage("single_search"):
+        for aiu in aius:
+            single.rank(aiu.content, single.search(single.expand_query(aiu)[0]))
+    retrieval = FakeRetrievalSystem()
+    documents = 0
+    start = time.perf_counter()
+    with watch.stage("multi_hop"):
+        for aiu in aius:
+            documents += len(retrieval.multi_hop_search(aiu))
+    wall_time = time.perf_counter() - start
+    return {
+        "wall_time": wall_time,
+        "throughput": n_aius / wall_time,
+        "unit": "aius/s",
+        "stages": watch.stages,
+        "counters": {"search_calls": retrieval.calls, "documents": documents},
+    }
+
+
+SCENARIOS: Dict[str, Callable[[], Dict[str, Any]]] = {
+    **{f"report-{n}": (lambda n=n: bench_report(n)) for n in (4, 16, 64)},
+    **{f"trajectory-{n}": (lambda n=n: bench_trajectory(n)) for n in (100, 1000)},
+    **{f"reward-{n}": (lambda n=n: bench_reward(n)) for n in (4, 64)},
+    **{f"retrieval-{n}": (lambda n=n: bench_retrieval(n)) for n in (16,)},
+    **{f"memory-{label}": (lambda n=n: bench_memory(n))
+       for label, n in (("1k", 1000), ("10k", 10000), ("100k", 100000), ("1m", 1000000))},
+}
+
+SUITES = {
+    "quick": ["report-4", "report-16", "trajectory-100", "reward-4", "reward-64", "retrieval-16", "memory-1k", "memory-10k", "memory-100k"],
+    "full": list(SCENARIOS),
+}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_scenario(name: str) -> Dict[str, Any]:
+    """Run one scenario in this process, discarding the agents' console output."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = SCENARIOS[name]()
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def run_isolated(name: str) -> Dict[str, Any]:
+    """Run one scenario in a fresh interpreter so its peak RSS is its own."""
+    proc = subprocess.run(
+        [sys.executable, "-m", __spec__.name, "--child", name],
+        capture_output=True,
+        text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Scenario {name} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Regressions beyond `tolerance` (relative) and the noise floors."""
+    regressions = []
+
+    def worse(label: str, current: float, base: float, floor: float):
+        if current > base * (1 + tolerance) and current - base > floor:
+            regressions.append(f"{label}: {base:.4g} -> {current:.4g} (+{(current / base - 1) * 100:.0f}%)")
+
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        worse(f"{name} wall_time", result["wall_time"], base["wall_time"], TIME_NOISE_FLOOR)
+        worse(f"{name} peak_rss_mb", result["peak_rss_mb"], base["peak_rss_mb"], RSS_NOISE_FLOOR)
+        for stage, seconds in result["stages"].items():
+            if stage in base["stages"]:
+                worse(f"{name} {stage}", seconds, base["stages"][stage], TIME_NOISE_FLOOR)
+        if result["throughput"] < base["throughput"] / (1 + tolerance) \
+                and result["wall_time"] - base["wall_time"] > TIME_NOISE_FLOOR:
+            regressions.append(
+                f"{name} throughput: {base['throughput']:.4g} -> {result['throughput']:.4g} {result['unit']}"
+            )
+    return regressions
+
+
+def format_result(name: str, result: Dict[str, Any], base: Optional[Dict[str, Any]]) -> str:
+    line = (f"{name:<16} {result['wall_time']:>8.3f}s {result['throughput']:>12.1f} {result['unit']:<15}"
+            f" {result['peak_rss_mb']:>8.1f} MB")
+    if base:
+        line += f"  (baseline {base['wall_time']:.3f}s, {base['peak_rss_mb']:.1f} MB)"
+    stages = ", ".join(f"{k} {v * 1000:.1f}ms" for k, v in result["stages"].items())
+    return f"{line}\n{'':<18}{stages}"
+
+
+def load_baseline(path: str) -> Dict[str, Dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Run only these scenarios (repeatable)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Merge these results into the baseline instead of comparing")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_scenario(args.child)))
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    results = {}
+    for name in args.scenario or SUITES[args.suite]:
+        results[name] = run_isolated(name)
+        print(format_result(name, results[name], baseline.get(name)), flush=True)
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nNo regressions." if baseline else "\nNo baseline to compare against (use --update-baseline).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
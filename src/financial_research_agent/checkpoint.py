@@ -0,0 +1,59 @@
+"""
+Checkpoint - Persists the state of a report run so it can be resumed.
+A checkpoint holds the plan with subtask statuses, the memory tiers, the
+research steps and written sections per subtask, and the final report
+once reviewed. Each save atomically replaces the previous one.
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Dict, Any, Optional
+from src.financial_research_agent.config import Config
+
+CHECKPOINT_VERSION = 1
+
+
+class CheckpointStore:
+    """Latest checkpoint of one run, stored as <directory>/<run_id>.json."""
+
+    def __init__(self, run_id: str, directory: Optional[str] = None):
+        self.run_id = run_id
+        self.directory = directory or Config.CHECKPOINT_DIR
+        self.path = os.path.join(self.directory, f"{run_id}.json")
+        self._lock = threading.Lock()
+
+    def save(self, phase: str, state: Dict[str, Any]):
+        """Write `state` as the run's latest checkpoint (crash-safe)."""
+        record = dict(state, version=CHECKPOINT_VERSION, run_id=self.run_id, phase=phase, saved_at=time.time())
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self.path)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {state.get('version')} in {self.path}")
+        return state
+
+    @classmethod
+    def latest(cls, directory: Optional[str] = None) -> Optional["CheckpointStore"]:
+        """Store of the most recently saved run in `directory`, if any."""
+        directory = directory or Config.CHECKPOINT_DIR
+        if not os.path.isdir(directory):
+            return None
+        paths = [
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.endswith(".json")
+        ]
+        if not paths:
+            return None
+        latest = max(paths, key=os.path.getmtime)
+        return cls(os.path.basename(latest)[:-len(".json")], directory)
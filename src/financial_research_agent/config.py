@@ -13,13 +13,115 @@ class Config:
     RESEARCHER_MODEL = "gpt-5"
     WRITER_MODEL = "gpt-5"
     REVIEWER_MODEL = "gpt-5"
+
+    # LLM Concurrency
+    LLM_MAX_CONCURRENCY = 16 # Max in-flight async requests
+
+    # LLM HTTP Connection Pool (shared by all agents)
+    LLM_MAX_CONNECTIONS = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS = 20
+    LLM_KEEPALIVE_EXPIRY = 60.0 # Seconds an idle connection is kept open
+    LLM_HTTP_TIMEOUT = 120.0 # Seconds
+    LLM_CONNECT_TIMEOUT = 10.0 # Seconds
+    LLM_MAX_RETRIES = 2
+
+    # LLM Request Scheduling (per-model budgets, see scheduler.py)
+    LLM_SCHEDULER_ENABLED = False
+    MODEL_RATE_LIMITS = {
+        "gpt-4o": {"rpm": 500, "tpm": 30000},
+        "gpt-4o-mini": {"rpm": 500, "tpm": 200000},
+        "default": {"rpm": 500, "tpm": 30000},
+    }
+    LLM_DEFAULT_COMPLETION_TOKENS = 512 # Assumed when max_tokens is unset
+    LLM_RETRY_ATTEMPTS = 5 # On 429/5xx
+    LLM_RETRY_BASE_DELAY = 1.0 # Seconds
+    LLM_RETRY_MAX_DELAY = 60.0 # Seconds
+    LLM_SCHEDULER_POLL_INTERVAL = 0.05 # Seconds between admission checks of async waiters
+
+    # Adaptive Routing (see llm_stats.py)
+    MODEL_PRICING = { # USD per 1M tokens
+        "gpt-4o": {"prompt": 2.50, "completion": 10.00},
+        "gpt-4o-mini": {"prompt": 0.15, "completion": 0.60},
+        "gpt-4-turbo": {"prompt": 10.00, "completion": 30.00},
+        "gpt-4": {"prompt": 30.00, "completion": 60.00},
+        "gpt-3.5-turbo": {"prompt": 0.50, "completion": 1.50},
+        "default": {"prompt": 2.50, "completion": 10.00},
+    }
+    ROUTING_TARGETS = { # Per task type; quality is a normalized reward in [0, 1]
+        "planning": {"max_latency": 30.0, "latency_percentile": 95, "min_quality": 0.6},
+        "review": {"max_latency": 30.0, "latency_percentile": 95, "min_quality": 0.6},
+        "default": {"max_latency": 15.0, "latency_percentile": 95, "min_quality": 0.5},
+    }
+    ROUTER_MIN_SAMPLES = 5 # Observations before stats override the heuristic
+    ROUTER_LATENCY_WINDOW = 500 # Latency samples kept per model
+    ROUTER_QUALITY_EMA = 0.2
+    ROUTER_HIGH_COMPLEXITY_MIN_CHARS = 500
+
+    # Hedged Requests (tail-latency control in LLMRouter)
+    ROUTER_HEDGE_ENABLED = False
+    ROUTER_HEDGE_PERCENTILE = 95 # Hedge once a call exceeds this latency percentile
+    ROUTER_HEDGE_DEFAULT_DELAY = 20.0 # Seconds, used until enough latency samples exist
+    ROUTER_HEDGE_MIN_DELAY = 0.5 # Seconds
+    ROUTER_HEDGE_FALLBACKS = {} # Model -> hedge model; defaults to the same model
+    ROUTER_HEDGE_MAX_WORKERS = 32
     
     # Search Configuration
     MAX_SEARCH_RESULTS = 5
     SEARCH_PROVIDER = "tavily"
+    SEARCH_CACHE_TTL = 6 * 3600 # Seconds a result set is reused for the same normalized query; 0 disables caching
+    SEARCH_CACHE_MEMORY_SIZE = 1024 # Result sets kept in the in-process LRU
+    SEARCH_TRACKING_PARAMS = ( # URL query parameters ignored when deduplicating results (besides utm_*)
+        "gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src", "igshid", "spm",
+    )
+    RETRIEVAL_MAX_CONCURRENCY = 32 # Searches in flight across all multi-hop retrievals (one shared pool)
+    MULTI_HOP_FOLLOW_UPS = 2 # Queries built from a hop's top results and added to the next hop
+    RRF_K = 60 # Reciprocal rank fusion constant; larger values weigh lower ranks more evenly
+
+    # Report Execution
+    MAX_PARALLEL_SUBTASKS = 4 # Subtasks researched/written concurrently
+    RESEARCH_BUDGET = None # Research cost units per report; None = unlimited
+    SUBTASK_DEFAULT_COST = 1.0 # Research cost units per subtask
+    REPLAN_MAX_FOLLOW_UPS = 2 # Follow-up subtasks the planner may insert after each subtask's research
+    REPLAN_MAX_OVERLAP = 0.6 # Follow-ups this similar to an existing subtask are skipped
+    PERSPECTIVE_WEIGHTS = { # Relative value of each perspective when prioritizing subtasks
+        "Industry": 1.0,
+        "Competition": 1.0,
+        "Risk": 1.0,
+        "Financial": 1.5,
+    }
+    BATCH_REPORT_WORKERS = 4 # Queries processed concurrently by batch_main
 
     # Memory Configuration
-    WORKING_MEMORY_LIMIT = 4000 # Tokens
+    WORKING_MEMORY_LIMIT = 4000 # Tokens; exceeding it starts background compression
+    WORKING_MEMORY_TARGET = 2500 # Tokens left after compression (hysteresis below the limit)
+    MEMORY_COMPRESSION_BATCH_TOKENS = 2000 # Working-memory tokens summarized per LLM call
+    MEMORY_SUMMARY_MAX_TOKENS = 300 # Per episodic summary of compressed working items
+    EVIDENCE_TOKEN_BUDGET = 2000 # Per-section evidence passed to WriterAgent
+    EVIDENCE_ITEM_OVERHEAD_TOKENS = 8 # Citation tag and separators per evidence item
+    MEMORY_RECALL_TOP_K = 5 # Items returned by MemoryManager.recall
+    MEMORY_EVICTION_POLICY = "arc" # Which working items compression demotes first: "lru", "lfu" or "arc"
+    MEMORY_PROMOTION_HITS = 2 # Recall/attach_evidence hits that bring an episodic or long-term item back to working memory
+    MEMORY_ARC_GHOST_SIZE = 1024 # Recently evicted ids ARC remembers to detect premature evictions
+    EPISODIC_MEMORY_LIMIT = None # Items; past it the coldest are demoted to long-term memory (None = unbounded)
+
+    # Persistent Long-Term Memory (see long_term_store.py)
+    LONG_TERM_MEMORY_PERSISTENT = False # On-disk store shared across runs instead of an in-process tier
+    LONG_TERM_MEMORY_DIR = "data/long_term"
+    LONG_TERM_SEARCH_CANDIDATES = 50 # Taken from each of the vector and full-text indexes
+    LONG_TERM_TEXT_WEIGHT = 0.3 # Share of the normalized BM25 score in hybrid ranking
+    LONG_TERM_TEXT_MAX_DF = 0.05 # Query terms in a larger share of documents are left out of full-text search
+    LONG_TERM_COMPACT_MIN_ROWS = 10000 # Dead embedding rows tolerated before compaction (also needs more dead than live)
+
+    # Embeddings & Vector Index (see embeddings.py, vector_index.py)
+    EMBEDDING_PROVIDER = "local" # "local" (offline, deterministic feature hashing) or "openai"
+    EMBEDDING_MODEL = "text-embedding-3-small" # Provider model for EMBEDDING_PROVIDER = "openai"
+    EMBEDDING_DIM = 128
+    EMBEDDING_BATCH_SIZE = 256 # Texts per embedding model call
+    EMBEDDING_CACHE_MEMORY_SIZE = 4096 # Vectors kept in the in-process LRU
+    VECTOR_INDEX_EXACT_LIMIT = 50000 # Larger indexes switch from exact scan to IVF
+    VECTOR_INDEX_MAX_LISTS = 1024 # IVF clusters (sqrt of the index size, capped)
+    VECTOR_INDEX_NPROBE = 8 # IVF clusters scanned per query
+    VECTOR_INDEX_KMEANS_ITERATIONS = 8
     
     # Stopping Criteria
     ISSP_THRESHOLD = 0.05 # Information Gain Threshold
@@ -28,3 +130,43 @@ class Config:
     # Paths
     DATA_DIR = "data"
     OUTPUT_DIR = "output"
+
+    # LLM Response Cache
+    LLM_CACHE_ENABLED = False
+    LLM_CACHE_PATH = os.path.join(DATA_DIR, "llm_cache.sqlite")
+    LLM_CACHE_MEMORY_SIZE = 1024 # Entries kept in the in-process LRU
+    LLM_CACHE_MAX_ENTRIES = 100000 # Rows kept on disk
+    LLM_CACHE_MAX_AGE = 7 * 24 * 3600 # Seconds
+    LLM_CACHE_SAMPLED = False # Also cache temperature > 0 calls (replays one sample instead of drawing anew)
+
+    # Embedding Cache (vectors by content hash, shared across runs)
+    EMBEDDING_CACHE_ENABLED = False
+    EMBEDDING_CACHE_PATH = os.path.join(DATA_DIR, "embedding_cache.sqlite")
+
+    # Search Result Cache (on disk, shared across runs)
+    SEARCH_CACHE_PERSISTENT = False
+    SEARCH_CACHE_PATH = os.path.join(DATA_DIR, "search_cache.sqlite")
+
+    # Adaptive Routing Stats (persisted between runs)
+    ROUTER_STATS_PATH = os.path.join(DATA_DIR, "router_stats.json")
+
+    # Batch Report Runs (see batch_main.py)
+    BATCH_REPORT_OUTPUT_DIR = os.path.join(OUTPUT_DIR, "batch")
+
+    # Incremental Report Cache (subtask research, sections, review)
+    REPORT_CACHE_ENABLED = False
+    REPORT_CACHE_PATH = os.path.join(DATA_DIR, "report_cache.sqlite")
+
+    # Run Checkpoints (resume with main.py --resume)
+    CHECKPOINT_DIR = os.path.join(OUTPUT_DIR, "checkpoints")
+
+    # Tracing
+    TRACING_ENABLED = True
+    TRACE_DIR = os.path.join(OUTPUT_DIR, "traces")
+
+    # Batch Jobs (offline trajectory / AIU generation)
+    BATCH_MODEL = "gpt-4o-mini"
+    BATCH_WORK_DIR = os.path.join(DATA_DIR, "batch_jobs")
+    BATCH_POLL_INTERVAL = 30.0 # Seconds
+    BATCH_COMPLETION_WINDOW = "24h"
+    BATCH_REQUEST_RETRIES = 1 # Follow-up jobs for requests that failed inside a completed job
@@ -0,0 +1,154 @@
+"""
+DAG Executor - Runs dependent units of work on a bounded thread pool.
+A node starts as soon as all of its dependencies have finished, so the
+total latency approaches the longest dependency chain rather than the sum.
+"""
+
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Callable, Hashable, Iterable, Optional, Union
+from src.financial_research_agent.config import Config
+
+
+@dataclass
+class DAGNode:
+    key: Hashable
+    fn: Callable[[], Any]
+    depends_on: List[Hashable] = field(default_factory=list)
+    order: int = 0
+    priority: Union[float, Callable[[], float]] = 0.0 # Callables are evaluated when the node is ready
+
+
+class DAGExecutor:
+    """
+    Dependency-aware executor with a concurrency cap.
+    Ready nodes start highest priority first (a priority may be a callable,
+    re-evaluated while the node waits), then in insertion order. Nodes may
+    add further nodes while the graph is running. Nodes run in a copy of the submitting
+    context, keeping trace spans and request priority attached.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or Config.MAX_PARALLEL_SUBTASKS
+        self.nodes: Dict[Hashable, DAGNode] = {}
+        self._lock = threading.Lock()
+        self._running = False
+        self._dependents: Dict[Hashable, List[Hashable]] = {}
+        self._remaining: Dict[Hashable, int] = {}
+        self._ready: List[Hashable] = []
+        self._results: Dict[Hashable, Any] = {}
+
+    def add(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        depends_on: Iterable[Hashable] = (),
+        priority: Union[float, Callable[[], float]] = 0.0
+    ):
+        """
+        Registers a node. While the graph is running, dependencies must
+        already be registered (which also rules out cycles).
+        """
+        with self._lock:
+            if key in self.nodes:
+                raise ValueError(f"Duplicate DAG node: {key!r}")
+            node = DAGNode(key, fn, list(depends_on), len(self.nodes), priority)
+            if self._running:
+                for dep in node.depends_on:
+                    if dep not in self.nodes:
+                        raise ValueError(f"DAG node {key!r} depends on unknown node {dep!r}")
+                self.nodes[key] = node
+                self._dependents[key] = []
+                self._remaining[key] = 0
+                for dep in node.depends_on:
+                    if dep not in self._results:
+                        self._dependents[dep].append(key)
+                        self._remaining[key] += 1
+                if self._remaining[key] == 0:
+                    self._push_ready(key)
+            else:
+                self.nodes[key] = node
+
+    def run(self) -> Dict[Hashable, Any]:
+        """
+        Executes every node; returns results keyed by node key.
+        The first failure stops new nodes from starting and is re-raised
+        once the running ones have finished.
+        """
+        with self._lock:
+            self._dependents = {key: [] for key in self.nodes}
+            self._remaining = {}
+            for node in self.nodes.values():
+                for dep in node.depends_on:
+                    if dep not in self.nodes:
+                        raise ValueError(f"DAG node {node.key!r} depends on unknown node {dep!r}")
+                    self._dependents[dep].append(node.key)
+                self._remaining[node.key] = len(node.depends_on)
+            self._check_acyclic(self._dependents, self._remaining)
+            self._ready = []
+            self._results = {}
+            for node in self.nodes.values():
+                if not node.depends_on:
+                    self._push_ready(node.key)
+            self._running = True
+
+        running: Dict[Future, Hashable] = {}
+        error: Optional[BaseException] = None
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dag") as pool:
+                while True:
+                    with self._lock:
+                        while self._ready and error is None and len(running) < self.max_workers:
+                            key = self._pop_ready()
+                            ctx = contextvars.copy_context()
+                            running[pool.submit(ctx.run, self.nodes[key].fn)] = key
+                    if not running:
+                        break
+                    done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                    with self._lock:
+                        for future in done:
+                            key = running.pop(future)
+                            if future.exception() is not None:
+                                error = error or future.exception()
+                                continue
+                            self._results[key] = future.result()
+                            for dependent in self._dependents[key]:
+                                self._remaining[dependent] -= 1
+                                if self._remaining[dependent] == 0:
+                                    self._push_ready(dependent)
+        finally:
+            with self._lock:
+                self._running = False
+
+        if error is not None:
+            raise error
+        return dict(self._results)
+
+    def _push_ready(self, key: Hashable):
+        self._ready.append(key)
+
+    def _pop_ready(self) -> Hashable:
+        # Linear scan: priorities may change while nodes wait, and ready sets are small
+        def rank(i: int):
+            node = self.nodes[self._ready[i]]
+            priority = node.priority() if callable(node.priority) else node.priority
+            return priority, -node.order
+        return self._ready.pop(max(range(len(self._ready)), key=rank))
+
+    @staticmethod
+    def _check_acyclic(dependents: Dict[Hashable, List[Hashable]], remaining: Dict[Hashable, int]):
+        indegree = dict(remaining)
+        queue = [key for key, n in indegree.items() if n == 0]
+        visited = 0
+        while queue:
+            key = queue.pop()
+            visited += 1
+            for dependent in dependents[key]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    queue.append(dependent)
+        if visited != len(indegree):
+            cyclic = [key for key, n in indegree.items() if n > 0]
+            raise ValueError(f"DAG contains a cycle through: {cyclic}")
@@ -1,6 +1,8 @@
 import uuid
-from typing import List
+import json
+from typing import List, Dict
 from src.financial_research_agent.models import AtomicInsightUnit
+from src.financial_research_agent.data_pipeline.batch_jobs import BatchJobRunner, BatchRequest
 
 class AIUExtractor:
     """
@@ -30,3 +32,47 @@ class AIUExtractor:
             )
         ]
         return mock_aius
+
+    def build_extraction_messages(self, text: str) -> List[Dict[str, str]]:
+        return [
+            {
+                "role": "system",
+                "content": "Split the text into atomic claims, each needing its own evidence. "
+                           "Reply in JSON: {\"aius\": [{\"content\": str, \"is_fact\": bool, \"confidence\": float}]}. "
+                           "is_fact is false for conclusions or forecasts."
+            },
+            {"role": "user", "content": text}
+        ]
+
+    def parse_extraction_response(self, content: str) -> List[AtomicInsightUnit]:
+        data = json.loads(content)
+        return [
+            AtomicInsightUnit(
+                id=str(uuid.uuid4()),
+                content=item["content"],
+                is_fact=item.get("is_fact", True),
+                confidence=item.get("confidence", 0.0)
+            )
+            for item in data.get("aius", [])
+            if item.get("content")
+        ]
+
+    def extract_aius_batch(self, texts: List[str], runner: BatchJobRunner) -> List[List[AtomicInsightUnit]]:
+        """
+        Extracts AIUs from many texts in a single provider batch job.
+        Texts whose request failed or returned malformed JSON yield an empty list.
+        """
+        requests = [
+            BatchRequest(custom_id=f"t{i}", messages=self.build_extraction_messages(text), json_mode=True)
+            for i, text in enumerate(texts)
+        ]
+        results = runner.run(requests, job_name="aiu-extraction")
+        extracted = []
+        for i in range(len(texts)):
+            response = results.get(f"t{i}")
+            try:
+                extracted.append(self.parse_extraction_response(response.content) if response else [])
+            except (ValueError, KeyError, AttributeError, TypeError):
+                # Malformed JSON, or JSON of the wrong shape (e.g. a list)
+                extracted.append([])
+        return extracted
@@ -0,0 +1,291 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+from src.financial_research_agent.config import Config
+from src.financial_research_agent.llm_client import (
+    LLMResponse,
+    BaseLLMClient,
+    get_llm_client,
+    build_chat_kwargs,
+)
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+@dataclass
+class BatchRequest:
+    """One chat completion inside a batch job."""
+    custom_id: str
+    messages: List[Dict[str, str]]
+    model: str = Config.BATCH_MODEL
+    temperature: float = 0.7
+    max_tokens: Optional[int] = None
+    json_mode: bool = False
+
+    def to_line(self) -> Dict[str, Any]:
+        """Request line in the provider batch JSONL format."""
+        return {
+            "custom_id": self.custom_id,
+            "method": "POST",
+            "url": CHAT_COMPLETIONS_ENDPOINT,
+            "body": build_chat_kwargs(
+                self.messages, self.model, self.temperature, self.max_tokens, self.json_mode
+            ),
+        }
+
+
+class BatchBackend(ABC):
+    """Provider batch endpoint: upload a JSONL file, poll, fetch results."""
+
+    @abstractmethod
+    def submit(self, input_path: str) -> str:
+        """Submit a request file; returns the job id."""
+        pass
+
+    @abstractmethod
+    def status(self, job_id: str) -> str:
+        """Provider job status, e.g. 'in_progress' or 'completed'."""
+        pass
+
+    @abstractmethod
+    def download(self, job_id: str, output_path: str):
+        """Write the job's result JSONL to output_path."""
+        pass
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI Batch API (24h completion window, discounted pricing)."""
+
+    def __init__(self, client: Optional[BaseLLMClient] = None):
+        self.client = (client or get_llm_client()).client
+
+    def submit(self, input_path: str) -> str:
+        with open(input_path, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=CHAT_COMPLETIONS_ENDPOINT,
+            completion_window=Config.BATCH_COMPLETION_WINDOW
+        )
+        return batch.id
+
+    def status(self, job_id: str) -> str:
+        return self.client.batches.retrieve(job_id).status
+
+    def download(self, job_id: str, output_path: str):
+        batch = self.client.batches.retrieve(job_id)
+        lines = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                lines.append(self.client.files.content(file_id).text.rstrip("\n"))
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(l for l in lines if l) + "\n")
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    Local stand-in for the batch endpoint: executes the request file
+    synchronously against a BaseLLMClient and writes provider-format results.
+    """
+
+    def __init__(self, client: BaseLLMClient, work_dir: Optional[str] = None):
+        self.client = client
+        self.work_dir = work_dir or os.path.join(Config.BATCH_WORK_DIR, "local")
+        os.makedirs(self.work_dir, exist_ok=True)
+
+    def submit(self, input_path: str) -> str:
+        job_id = f"local_batch_{uuid.uuid4().hex[:12]}"
+        results = []
+        with open(input_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                body = request["body"]
+                try:
+                    response = self.client.chat(
+                        body["messages"],
+                        body.get("model"),
+                        body.get("temperature", 0.7),
+                        body.get("max_tokens"),
+                        "response_format" in body
+                    )
+                    results.append({
+                        "id": f"{job_id}_{len(results)}",
+                        "custom_id": request["custom_id"],
+                        "response": {"status_code": 200, "body": {
+                            "model": response.model,
+                            "choices": [{"message": {"role": "assistant", "content": response.content}}],
+                            "usage": response.usage,
+                        }},
+                        "error": None,
+                    })
+                except Exception as exc:
+                    results.append({
+                        "id": f"{job_id}_{len(results)}",
+                        "custom_id": request["custom_id"],
+                        "response": None,
+                        "error": {"message": str(exc)},
+                    })
+        with open(self._output_path(job_id), "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        return job_id
+
+    def status(self, job_id: str) -> str:
+        return "completed" if os.path.exists(self._output_path(job_id)) else "failed"
+
+    def download(self, job_id: str, output_path: str):
+        with open(self._output_path(job_id), "r", encoding="utf-8") as src, \
+                open(output_path, "w", encoding="utf-8") as dst:
+            dst.write(src.read())
+
+    def _output_path(self, job_id: str) -> str:
+        return os.path.join(self.work_dir, f"{job_id}.output.jsonl")
+
+
+class BatchJobRunner:
+    """
+    Submits BatchRequests as a batch job and collates the results.
+    Each job lives in a directory keyed by a hash of its request file, so
+    re-running the same work reuses finished results or resumes polling
+    an already-submitted job instead of paying for it twice. A job that
+    failed, expired or was cancelled is recorded in its state (error,
+    failures) and resubmitted by the next run. Requests that failed inside
+    a completed job are recorded in its state (failed_requests: custom_id
+    -> error) and resubmitted on their own as a follow-up job, up to
+    Config.BATCH_REQUEST_RETRIES times.
+    """
+
+    def __init__(
+        self,
+        backend: BatchBackend,
+        work_dir: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+        timeout: Optional[float] = None
+    ):
+        self.backend = backend
+        self.work_dir = work_dir or Config.BATCH_WORK_DIR
+        self.poll_interval = poll_interval if poll_interval is not None else Config.BATCH_POLL_INTERVAL
+        self.timeout = timeout
+
+    def run(self, requests: List[BatchRequest], job_name: str = "batch") -> Dict[str, LLMResponse]:
+        """
+        Run (or resume) the job; returns responses keyed by custom_id.
+        Requests that still fail after their retries are left out; their
+        errors are in the failed_requests of the last job's state.json.
+        """
+        responses, failures = self._run_job(requests, job_name)
+        for attempt in range(1, Config.BATCH_REQUEST_RETRIES + 1):
+            if not failures:
+                break
+            retried, failures = self._run_job(
+                [r for r in requests if r.custom_id in failures], f"{job_name}-retry{attempt}"
+            )
+            responses.update(retried)
+        return responses
+
+    def _run_job(self, requests: List[BatchRequest], job_name: str) -> Tuple[Dict[str, LLMResponse], Dict[str, str]]:
+        """One job over `requests`; returns its responses and its failed custom_ids with their errors."""
+        if not requests:
+            return {}, {}
+        lines = [json.dumps(r.to_line(), ensure_ascii=False, sort_keys=True) for r in requests]
+        digest = hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()[:16]
+        job_dir = os.path.join(self.work_dir, f"{job_name}-{digest}")
+        os.makedirs(job_dir, exist_ok=True)
+        input_path = os.path.join(job_dir, "input.jsonl")
+        output_path = os.path.join(job_dir, "output.jsonl")
+        state_path = os.path.join(job_dir, "state.json")
+
+        state = self._load_state(state_path)
+        if os.path.exists(output_path):
+            return self._collate(output_path, requests, state_path, state)
+
+        if not state.get("job_id"):
+            with open(input_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            state.update(job_id=self.backend.submit(input_path), status="submitted",
+                         submitted_at=time.time(), request_count=len(requests))
+            self._save_state(state_path, state)
+
+        status = self._wait(state["job_id"])
+        state["status"] = status
+        if status != "completed":
+            # Forget the dead job so the next run resubmits instead of polling it again
+            error = f"Batch job {state['job_id']} ended with status {status}"
+            state.update(job_id=None, error=error, failures=state.get("failures", 0) + 1)
+            self._save_state(state_path, state)
+            raise RuntimeError(error)
+        self._save_state(state_path, state)
+
+        # Download to a temp file first so a crash never leaves a partial output
+        tmp_path = output_path + ".tmp"
+        self.backend.download(state["job_id"], tmp_path)
+        os.replace(tmp_path, output_path)
+        return self._collate(output_path, requests, state_path, state)
+
+    def _wait(self, job_id: str) -> str:
+        deadline = time.time() + self.timeout if self.timeout else None
+        while True:
+            status = self.backend.status(job_id)
+            if status in TERMINAL_STATUSES:
+                return status
+            if deadline and time.time() > deadline:
+                raise TimeoutError(f"Batch job {job_id} still {status}; rerun to resume polling")
+            time.sleep(self.poll_interval)
+
+    def _collate(
+        self,
+        output_path: str,
+        requests: List[BatchRequest],
+        state_path: str,
+        state: Dict[str, Any]
+    ) -> Tuple[Dict[str, LLMResponse], Dict[str, str]]:
+        results = {}
+        failures = {}
+        with open(output_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                error = record.get("error")
+                if error or response.get("status_code") != 200:
+                    if isinstance(error, dict):
+                        error = error.get("message") or json.dumps(error)
+                    failures[record["custom_id"]] = str(error or f"HTTP {response.get('status_code')}")
+                    continue
+                body = response["body"]
+                results[record["custom_id"]] = LLMResponse(
+                    content=body["choices"][0]["message"]["content"],
+                    model=body.get("model"),
+                    usage=body.get("usage") or {},
+                    raw_response=record
+                )
+        for request in requests:
+            if request.custom_id not in results and request.custom_id not in failures:
+                failures[request.custom_id] = "No result in the job output"
+        if state.get("failed_requests") != failures:
+            state["failed_requests"] = failures
+            self._save_state(state_path, state)
+        return results, failures
+
+    @staticmethod
+    def _load_state(state_path: str) -> Dict[str, Any]:
+        if not os.path.exists(state_path):
+            return {}
+        with open(state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _save_state(state_path: str, state: Dict[str, Any]):
+        tmp_path = state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
@@ -1,8 +1,52 @@
-from typing import List, Dict
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Dict, Optional, Set
+import numpy as np
 from src.financial_research_agent.models import AtomicInsightUnit
 from src.financial_research_agent.config import Config
+from src.financial_research_agent.tracing import get_tracer
+from src.financial_research_agent.embeddings import EmbeddingService, get_default_embedding_service
+from src.financial_research_agent.search_cache import SearchCache, dedupe_results, get_default_search_cache
+
+_retrieval_executor: Optional[ThreadPoolExecutor] = None
+_retrieval_executor_lock = threading.Lock()
+
+def _get_retrieval_executor() -> ThreadPoolExecutor:
+    global _retrieval_executor
+    with _retrieval_executor_lock:
+        if _retrieval_executor is None:
+            _retrieval_executor = ThreadPoolExecutor(
+                max_workers=Config.RETRIEVAL_MAX_CONCURRENCY, thread_name_prefix="retrieval"
+            )
+        return _retrieval_executor
+
+def _document_key(doc: Dict) -> str:
+    return doc.get("canonical_url") or doc.get("url") or doc.get("title", "")
+
+def reciprocal_rank_fusion(rankings: List[List[Dict]], k: Optional[int] = None) -> List[Dict]:
+    """
+    Merges ranked result lists: a document scores sum(1 / (k + rank)) over
+    the lists it appears in (rank from 1), recorded as "rrf_score". The
+    first copy of each document (by canonical URL) is kept; best first.
+    """
+    k = k if k is not None else Config.RRF_K
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Dict] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = _document_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            documents.setdefault(key, doc)
+    order = sorted(scores, key=scores.get, reverse=True)
+    return [{**documents[key], "rrf_score": scores[key]} for key in order]
 
 class RetrievalSystem:
+    def __init__(self, embedder: Optional[EmbeddingService] = None, cache: Optional[SearchCache] = None):
+        self.embedder = embedder or get_default_embedding_service()
+        self.cache = cache or get_default_search_cache()
+        self.provider = Config.SEARCH_PROVIDER
+
     def hierarchical_summary(self, documents: List[Dict], max_depth: int = 3, max_children: int = 5) -> Dict:
         """
         树状摘要检索：分层聚类生成摘要节点，支持多层递归。
@@ -39,10 +83,93 @@ class RetrievalSystem:
             f"Data level: {base_query}"
         ]
 
-    def search(self, query: str) -> List[Dict]:
+    def refine_queries(self, query: str, results: List[Dict]) -> List[str]:
+        """
+        Follow-up queries for the next hop, narrowing `query` with the
+        titles of the best results found so far.
+        """
+        # Placeholder: an LLM would extract entities and figures from the results
+        titles = [r["title"] for r in results if r.get("title")]
+        return [f"{query} {title}" for title in titles[:Config.MULTI_HOP_FOLLOW_UPS]]
+
+    def multi_hop_search(
+        self, aiu: AtomicInsightUnit, top_k: Optional[int] = None, seen: Optional[Set[str]] = None
+    ) -> List[Dict]:
+        """
+        Runs the expand_query chain as hops. A hop is its chain query plus
+        follow-ups refined from the previous hop's results. Chain queries do
+        not depend on each other, so all of them start at once, and each
+        hop's follow-ups start as soon as the previous chain query returns:
+        the whole chain takes about two search latencies, not one per hop.
+        Hops are then consumed in order and the first one that adds no new
+        document ends the search; its pending searches are cancelled.
+        Results are fused with reciprocal rank fusion over every query's
+        ranking plus the embedding ranking against the AIU. Searches run on
+        a pool shared by all retrievals (Config.RETRIEVAL_MAX_CONCURRENCY).
+        `seen` filters the fused results as in search.
+        """
+        chain = self.expand_query(aiu)
+        with get_tracer().span("multi_hop_search", kind="retrieval", aiu_id=aiu.id, chain=len(chain)) as span:
+            pool = _get_retrieval_executor()
+            submitted: List[Future] = []
+
+            def submit(query: str) -> Future:
+                future = pool.submit(contextvars.copy_context().run, self.search, query)
+                submitted.append(future)
+                return future
+
+            rankings: List[List[Dict]] = []
+            found: Set[str] = set()
+            queries = hops = 0
+            try:
+                heads = [submit(query) for query in chain]
+                follow_ups: List[List[Future]] = [[] for _ in chain]
+                for hop, head in enumerate(heads):
+                    results = [head.result()]
+                    if hop + 1 < len(chain):
+                        follow_ups[hop + 1] = [submit(q) for q in self.refine_queries(chain[hop + 1], results[0])]
+                    results += [future.result() for future in follow_ups[hop]]
+                    hops += 1
+                    queries += len(results)
+                    rankings.extend(results)
+                    new = {_document_key(doc) for ranking in results for doc in ranking} - found
+                    if not new:
+                        break
+                    found |= new
+            finally:
+                for future in submitted:
+                    future.cancel() # Searches of hops that were not consumed; no-op once started
+
+            candidates = reciprocal_rank_fusion(rankings)
+            rankings.append(self.rank(aiu.content, candidates))
+            fused = reciprocal_rank_fusion(rankings)
+            if seen is not None:
+                fused = [doc for doc in fused if doc["canonical_url"] not in seen]
+                seen.update(doc["canonical_url"] for doc in fused if doc["canonical_url"] is not None)
+            fused = fused[:top_k]
+            span.set(hops=hops, queries=queries, result_count=len(fused))
+            return fused
+
+    def search(self, query: str, seen: Optional[Set[str]] = None) -> List[Dict]:
         """
         Executes search using the configured provider (e.g., Tavily, Google).
+        Result sets are cached per normalized query (Config.SEARCH_CACHE_TTL)
+        and deduplicated by canonical URL; identical concurrent searches
+        share one provider call. With `seen`, results whose canonical URL
+        is already in it are dropped and the rest are added to it, so a
+        caller only gets documents it has not processed yet.
         """
+        with get_tracer().span("search", kind="search", query=query, provider=self.provider) as span:
+            key = SearchCache.make_key(self.provider, query, Config.MAX_SEARCH_RESULTS)
+            results, status = self.cache.get_or_fetch(key, lambda: dedupe_results(self._fetch(query)))
+            if seen is not None:
+                results = [r for r in results if r["canonical_url"] not in seen]
+                seen.update(r["canonical_url"] for r in results if r["canonical_url"] is not None)
+            span.set(result_count=len(results), cache=status, cached=status != "miss")
+            return results
+
+    def _fetch(self, query: str) -> List[Dict]:
+        """One provider call."""
         print(f"[Retrieval] Searching for: {query}")
         # Placeholder for search tool invocation
         return [
@@ -50,6 +177,20 @@ class RetrievalSystem:
             {"title": "Mock Result 2", "content": "...content...", "url": "http://example.com/2"}
         ]
 
+    def rank(self, query: str, documents: List[Dict], top_k: Optional[int] = None) -> List[Dict]:
+        """
+        Orders documents by embedding similarity to the query, best first.
+        Documents are only embedded here, in one batch; repeated documents
+        are served from the embedding cache.
+        """
+        if not documents:
+            return []
+        texts = [query] + [f"{doc.get('title', '')}\n{doc.get('content', '')}" for doc in documents]
+        vectors = self.embedder.embed_batch(texts)
+        scores = vectors[1:] @ vectors[0]
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [documents[i] for i in order]
+
     def get_hard_negatives(self, aiu: AtomicInsightUnit) -> List[Dict]:
         """
         Retrieves outdated or conflicting documents.
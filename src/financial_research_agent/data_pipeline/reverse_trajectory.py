@@ -1,7 +1,9 @@
 import uuid
+import json
 from typing import List
 from src.financial_research_agent.models import Trajectory, ResearchStep
 from src.financial_research_agent.config import Config
+from src.financial_research_agent.data_pipeline.batch_jobs import BatchJobRunner, BatchRequest
 
 class ReverseTrajectoryGenerator:
     """
@@ -43,3 +45,33 @@ class ReverseTrajectoryGenerator:
             steps=steps,
             final_report_content=report_text
         )
+
+    def reverse_generate_queries_batch(self, report_texts: List[str], runner: BatchJobRunner) -> List[List[str]]:
+        """
+        Step 1 for many reports at once, submitted as one provider batch job.
+        """
+        requests = [
+            BatchRequest(
+                custom_id=f"r{i}",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "Infer the user research questions that this report answers. "
+                                   "Reply in JSON: {\"queries\": [str, ...]}."
+                    },
+                    {"role": "user", "content": text}
+                ],
+                json_mode=True
+            )
+            for i, text in enumerate(report_texts)
+        ]
+        results = runner.run(requests, job_name="reverse-query")
+        queries = []
+        for i in range(len(report_texts)):
+            response = results.get(f"r{i}")
+            try:
+                queries.append(list(json.loads(response.content).get("queries", [])) if response else [])
+            except (ValueError, AttributeError, TypeError):
+                # Malformed JSON, or JSON of the wrong shape (e.g. a list)
+                queries.append([])
+        return queries
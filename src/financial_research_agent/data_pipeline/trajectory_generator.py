@@ -1,7 +1,10 @@
 import uuid
-from typing import List
+import json
+from typing import List, Dict
 from src.financial_research_agent.models import Trajectory, ResearchStep, ResearchAction, ResearchObservation
 from src.financial_research_agent.config import Config
+from src.financial_research_agent.scheduler import request_priority, PRIORITY_BULK
+from src.financial_research_agent.data_pipeline.batch_jobs import BatchJobRunner, BatchRequest
 
 class TrajectoryGenerator:
     def export_trajectory_jsonl(self, trajectory: Trajectory, file_path: str):
@@ -22,7 +25,7 @@ class TrajectoryGenerator:
                     "observation": step["observation"],
                     "aius_generated": step.get("aius_generated", []),
                 }
-                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+                f.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
             # 最终报告单独一行
             final_event = {
                 "id": traj_dict["id"],
@@ -71,11 +74,13 @@ class TrajectoryGenerator:
         Generates a complete trajectory for a given query.
         """
         steps = []
-        for i in range(3): # Simulate 3 steps
-            step = self.generate_step(query, steps)
-            steps.append(step)
-            if step.action.type == "stop":
-                break
+        # Bulk synthesis yields LLM budget to interactive report generation
+        with request_priority(PRIORITY_BULK):
+            for i in range(3): # Simulate 3 steps
+                step = self.generate_step(query, steps)
+                steps.append(step)
+                if step.action.type == "stop":
+                    break
                 
         return Trajectory(
             id=str(uuid.uuid4()),
@@ -83,3 +88,89 @@ class TrajectoryGenerator:
             steps=steps,
             final_report_content="Generated report content based on trajectory..."
         )
+
+    def build_step_messages(self, query: str, previous_steps: List[ResearchStep]) -> List[Dict[str, str]]:
+        """
+        Teacher prompt for the next step of a trajectory.
+        """
+        history = "\n".join(
+            f"Step {s.step_number}: {s.thought} -> {s.action.type} "
+            f"{json.dumps(s.action.parameters, ensure_ascii=False)}"
+            for s in previous_steps
+        )
+        return [
+            {
+                "role": "system",
+                "content": "You are a senior financial analyst demonstrating a research process. "
+                           "Reply in JSON with keys: thought, action {type, parameters, rationale}, observation. "
+                           "action.type is one of search, read, write, stop, plan, summarize."
+            },
+            {
+                "role": "user",
+                "content": f"Query: {query}\nPrevious steps:\n{history or '(none)'}\n"
+                           f"Produce step {len(previous_steps) + 1}."
+            }
+        ]
+
+    def parse_step_response(self, content: str, step_num: int) -> ResearchStep:
+        """
+        Parses the teacher's JSON reply into a ResearchStep.
+        """
+        data = json.loads(content)
+        action = data.get("action") or {}
+        return ResearchStep(
+            step_number=step_num,
+            thought=data.get("thought", ""),
+            action=ResearchAction(
+                type=action.get("type", "search"),
+                parameters=action.get("parameters") or {},
+                rationale=action.get("rationale", "")
+            ),
+            observation=ResearchObservation(content=data.get("observation", ""), source_ids=[])
+        )
+
+    def generate_forward_trajectories_batch(
+        self,
+        queries: List[str],
+        runner: BatchJobRunner,
+        max_steps: int = 3
+    ) -> List[Trajectory]:
+        """
+        Generates trajectories for many queries via provider batch jobs.
+        Step n of every unfinished trajectory goes into one job, so a run
+        costs max_steps jobs regardless of the number of queries; finished
+        jobs are reused when the run is repeated.
+        """
+        steps: Dict[int, List[ResearchStep]] = {i: [] for i in range(len(queries))}
+        active = list(range(len(queries)))
+        for step_num in range(1, max_steps + 1):
+            if not active:
+                break
+            requests = [
+                BatchRequest(
+                    custom_id=f"q{i}-s{step_num}",
+                    messages=self.build_step_messages(queries[i], steps[i]),
+                    json_mode=True
+                )
+                for i in active
+            ]
+            results = runner.run(requests, job_name=f"forward-step{step_num}")
+            still_active = []
+            for i in active:
+                response = results.get(f"q{i}-s{step_num}")
+                if response is None:
+                    continue # Request failed in the batch: trajectory ends here
+                try:
+                    step = self.parse_step_response(response.content, step_num)
+                except (ValueError, KeyError, AttributeError, TypeError):
+                    # Malformed JSON, or JSON of the wrong shape (e.g. a list)
+                    continue
+                steps[i].append(step)
+                if step.action.type != "stop":
+                    still_active.append(i)
+            active = still_active
+
+        return [
+            Trajectory(id=str(uuid.uuid4()), user_query=query, steps=steps[i])
+            for i, query in enumerate(queries)
+        ]
@@ -0,0 +1,256 @@
+"""
+Embeddings - Text to fixed-size float32 vectors for similarity search.
+HashingEmbedder is a deterministic, dependency-free model (feature hashing
+of terms) for offline runs; OpenAIEmbedder calls the provider. Both are
+used through EmbeddingService, which batches calls and caches vectors by
+content hash.
+"""
+
+import os
+import re
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from typing import List, Dict, Any, Optional
+from src.financial_research_agent.config import Config
+from src.financial_research_agent.llm_client import BaseLLMClient, get_llm_client
+
+_TERM_PATTERN = re.compile(r"[a-z0-9]+|[\u4e00-\u9fff]")
+
+
+class HashingEmbedder:
+    """
+    Signed feature hashing of unigrams and bigrams, L2-normalized.
+    Stable across processes (crc32, not the salted built-in hash), so
+    vectors can be persisted and compared between runs.
+    """
+
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim or Config.EMBEDDING_DIM
+        self.name = f"hashing-{self.dim}"
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        rows, cols, signs = [], [], []
+        for row, text in enumerate(texts):
+            terms = _TERM_PATTERN.findall(text.lower())
+            features = terms + [f"{a} {b}" for a, b in zip(terms, terms[1:])]
+            for feature in features:
+                h = zlib.crc32(feature.encode("utf-8"))
+                rows.append(row)
+                cols.append(h % self.dim)
+                signs.append(1.0 if h & 0x80000000 else -1.0)
+
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if rows:
+            np.add.at(vectors, (np.array(rows), np.array(cols)), np.array(signs, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class OpenAIEmbedder:
+    """Provider embeddings, truncated to `dim` dimensions by the API."""
+
+    def __init__(self, model: Optional[str] = None, dim: Optional[int] = None, client: Optional[BaseLLMClient] = None):
+        self.model = model or Config.EMBEDDING_MODEL
+        self.dim = dim or Config.EMBEDDING_DIM
+        self.name = f"{self.model}-{self.dim}"
+        self._client = client
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        rows = [i for i, text in enumerate(texts) if text.strip()] # The API rejects empty input
+        if not rows:
+            return vectors
+        client = self._client or get_llm_client("openai")
+        response = client.client.embeddings.create(
+            model=self.model, input=[texts[i] for i in rows], dimensions=self.dim
+        )
+        for data in response.data:
+            vectors[rows[data.index]] = data.embedding
+        return vectors
+
+
+class EmbeddingService:
+    """
+    Embeds texts through `model` in calls of at most `batch_size` texts.
+    Vectors are cached under a hash of the model name and text: an
+    in-process LRU, backed by SQLite when a path is given. Duplicate texts
+    within a call are embedded once. Callers embed lazily, when a search
+    first needs the vectors, and pass whole batches. Thread-safe; model
+    calls run outside the lock.
+    """
+
+    def __init__(
+        self,
+        model: Optional[Any] = None,
+        batch_size: Optional[int] = None,
+        path: Optional[str] = None,
+        memory_size: Optional[int] = None
+    ):
+        self.model = model or HashingEmbedder()
+        self.dim = self.model.dim
+        self.name = self.model.name
+        self.batch_size = batch_size or Config.EMBEDDING_BATCH_SIZE
+        self.path = path
+        self.memory_size = memory_size if memory_size is not None else Config.EMBEDDING_CACHE_MEMORY_SIZE
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.model_calls = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache ("
+                "key TEXT PRIMARY KEY, vector BLOB, created_at REAL)"
+            )
+            self._conn.commit()
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.name}\0{text}".encode("utf-8")).hexdigest()
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        unique: Dict[str, int] = {}
+        inverse = [unique.setdefault(text, len(unique)) for text in texts]
+        keys = [self.key(text) for text in unique]
+        vectors = np.zeros((len(unique), self.dim), dtype=np.float32)
+
+        with self._lock:
+            missing = []
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is None:
+                    missing.append(i)
+                    continue
+                self._memory.move_to_end(key)
+                vectors[i] = vector
+            self.hits += len(keys) - len(missing)
+            if missing and self._conn is not None:
+                found = self._load([keys[i] for i in missing])
+                if found:
+                    self.hits += len(found)
+                    self.disk_hits += len(found)
+                    remaining = []
+                    for i in missing:
+                        vector = found.get(keys[i])
+                        if vector is None:
+                            remaining.append(i)
+                        else:
+                            vectors[i] = vector
+                            self._remember([keys[i]], vector[None])
+                    missing = remaining
+            self.misses += len(missing)
+
+        texts_by_row = list(unique)
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            computed = np.asarray(self.model.embed_batch([texts_by_row[i] for i in batch]), dtype=np.float32)
+            vectors[batch] = computed
+            with self._lock:
+                self.model_calls += 1
+                if self._conn is not None:
+                    now = time.time()
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embedding_cache (key, vector, created_at) VALUES (?, ?, ?)",
+                        [(keys[i], vector.tobytes(), now) for i, vector in zip(batch, computed)]
+                    )
+                    self._conn.commit()
+        if missing and self.memory_size > 0:
+            recent = missing[-self.memory_size:] # Older misses would be evicted right away
+            with self._lock:
+                self._remember([keys[i] for i in recent], vectors[recent])
+        return vectors if len(unique) == len(texts) else vectors[inverse]
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embedding_cache")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "model_calls": self.model_calls,
+                "memory_entries": len(self._memory),
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _load(self, keys: List[str], chunk: int = 500) -> Dict[str, np.ndarray]:
+        found = {}
+        for start in range(0, len(keys), chunk):
+            batch = keys[start:start + chunk]
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embedding_cache WHERE key IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+            for key, blob in rows:
+                vector = np.frombuffer(blob, dtype=np.float32)
+                if len(vector) == self.dim:
+                    found[key] = vector
+        return found
+
+    def _remember(self, keys: List[str], vectors: np.ndarray):
+        if self.memory_size <= 0:
+            return
+        for key, vector in zip(keys, vectors):
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+        for _ in range(len(self._memory) - self.memory_size):
+            self._memory.popitem(last=False)
+
+
+def _create_embedding_model(provider: str) -> Any:
+    if provider == "local":
+        return HashingEmbedder()
+    elif provider == "openai":
+        return OpenAIEmbedder()
+    else:
+        raise ValueError(f"Unknown embedding provider: {provider}")
+
+
+_default_service: Optional[EmbeddingService] = None
+_default_service_lock = threading.Lock()
+
+
+def get_default_embedding_service() -> EmbeddingService:
+    """Process-wide service configured from Config."""
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            _default_service = EmbeddingService(
+                _create_embedding_model(Config.EMBEDDING_PROVIDER),
+                path=Config.EMBEDDING_CACHE_PATH if Config.EMBEDDING_CACHE_ENABLED else None
+            )
+        return _default_service
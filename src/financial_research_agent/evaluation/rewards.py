@@ -78,3 +78,12 @@ class RewardSystem:
             w3 * self.calculate_info_density(report) +
             w4 * self.calculate_structure_score(report)
         )
+
+    def calculate_normalized_reward(self, report: FinalReport, query: str) -> float:
+        """
+        总奖励归一化到[0, 1]，可作为模型路由的质量信号。
+        各分项取值范围：fact [-0.1, 0.2], coverage [0, 1], info {-1, 1}, struct {-0.5, 1}。
+        """
+        low, high = -1.6, 3.2
+        total = self.calculate_total_reward(report, query)
+        return min(1.0, max(0.0, (total - low) / (high - low)))
@@ -0,0 +1,376 @@
+"""
+LLM Cache - Content-addressed response cache for LLM calls.
+Two tiers: an in-process LRU and an optional on-disk SQLite store.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Iterator, AsyncIterator
+from src.financial_research_agent.config import Config
+from src.financial_research_agent.llm_client import (
+    LLMResponse,
+    StreamChunk,
+    BaseLLMClient,
+    AsyncBaseLLMClient,
+)
+
+
+class LLMCache:
+    """
+    Response cache keyed by a hash of the request parameters.
+    Lookups hit the in-memory LRU first, then SQLite; disk hits are
+    promoted into memory. The disk tier is pruned by age and entry count.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_size: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        prune_interval: int = 100
+    ):
+        self.path = path
+        self.memory_size = memory_size if memory_size is not None else Config.LLM_CACHE_MEMORY_SIZE
+        self.max_entries = max_entries if max_entries is not None else Config.LLM_CACHE_MAX_ENTRIES
+        self.max_age_seconds = max_age_seconds if max_age_seconds is not None else Config.LLM_CACHE_MAX_AGE
+        self.prune_interval = prune_interval
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, model TEXT, content TEXT, usage TEXT, "
+                "created_at REAL, last_access REAL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        model: Optional[str],
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: Optional[int],
+        json_mode: bool
+    ) -> str:
+        """Stable hash of everything that determines the completion."""
+        payload = json.dumps(
+            {
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "json_mode": json_mode,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[3], now):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return self._to_response(entry)
+            if entry is not None:
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT model, content, usage, created_at FROM llm_cache WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                if row is not None and not self._expired(row[3], now):
+                    entry = (row[0], row[1], json.loads(row[2]), row[3])
+                    self._conn.execute(
+                        "UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key)
+                    )
+                    self._conn.commit()
+                    self._remember(key, entry)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return self._to_response(entry)
+                if row is not None:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: LLMResponse):
+        now = time.time()
+        entry = (response.model, response.content, dict(response.usage or {}), now)
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, model, content, usage, created_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, entry[0], entry[1], json.dumps(entry[2]), now, now)
+            )
+            self._conn.commit()
+            self._puts_since_prune += 1
+            if self._puts_since_prune >= self.prune_interval:
+                self._prune_locked(now)
+
+    def prune(self):
+        """Apply age- and size-based eviction to the disk tier."""
+        with self._lock:
+            self._prune_locked(time.time())
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for measuring savings."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return bool(self.max_age_seconds) and now - created_at > self.max_age_seconds
+
+    def _remember(self, key: str, entry: tuple):
+        if self.memory_size <= 0:
+            return
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _prune_locked(self, now: float):
+        self._puts_since_prune = 0
+        if self._conn is None:
+            return
+        if self.max_age_seconds:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (now - self.max_age_seconds,)
+            )
+        if self.max_entries:
+            # Drop least recently used rows beyond the size limit
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+        self._conn.commit()
+
+    @staticmethod
+    def _to_response(entry: tuple) -> LLMResponse:
+        return LLMResponse(
+            content=entry[1],
+            model=entry[0],
+            usage=dict(entry[2]),
+            cached=True
+        )
+
+
+class CachedLLMClient(BaseLLMClient):
+    """
+    Wraps a BaseLLMClient with an LLMCache. Drop-in for LLMRouter,
+    so both direct chat calls and routed calls are cached. Only
+    deterministic (temperature 0) calls are cached unless
+    deterministic_only is False (default: not Config.LLM_CACHE_SAMPLED).
+    """
+
+    def __init__(
+        self,
+        client: BaseLLMClient,
+        cache: Optional[LLMCache] = None,
+        deterministic_only: Optional[bool] = None
+    ):
+        self.client = client
+        self.cache = cache or get_default_cache()
+        self.deterministic_only = not Config.LLM_CACHE_SAMPLED if deterministic_only is None else deterministic_only
+        self.default_model = getattr(client, "default_model", None)
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> LLMResponse:
+        """Send chat completion request, serving from cache when possible."""
+        model = model or self.default_model
+        if self.deterministic_only and temperature > 0:
+            return self.client.chat(messages, model, temperature, max_tokens, json_mode)
+
+        key = LLMCache.make_key(model, messages, temperature, max_tokens, json_mode)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = self.client.chat(messages, model, temperature, max_tokens, json_mode)
+        self.cache.put(key, response)
+        return response
+
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> Iterator[StreamChunk]:
+        """Stream from the provider on a miss; replay a hit as one chunk."""
+        model = model or self.default_model
+        if self.deterministic_only and temperature > 0:
+            yield from self.client.chat_stream(messages, model, temperature, max_tokens, json_mode)
+            return
+
+        key = LLMCache.make_key(model, messages, temperature, max_tokens, json_mode)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield StreamChunk(
+                delta=cached.content, model=cached.model, usage=cached.usage, finish_reason="stop"
+            )
+            return
+
+        parts = []
+        for chunk in self.client.chat_stream(messages, model, temperature, max_tokens, json_mode):
+            parts.append(chunk.delta)
+            if chunk.usage is not None:
+                # Only complete streams are cached
+                self.cache.put(key, LLMResponse(
+                    content="".join(parts), model=chunk.model or model, usage=chunk.usage
+                ))
+            yield chunk
+
+    def complete(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None
+    ) -> LLMResponse:
+        """Send completion request (wraps as chat)."""
+        messages = [{"role": "user", "content": prompt}]
+        return self.chat(messages, model, temperature, max_tokens)
+
+
+class AsyncCachedLLMClient(AsyncBaseLLMClient):
+    """Async counterpart of CachedLLMClient."""
+
+    def __init__(
+        self,
+        client: AsyncBaseLLMClient,
+        cache: Optional[LLMCache] = None,
+        deterministic_only: Optional[bool] = None
+    ):
+        self.client = client
+        self.cache = cache or get_default_cache()
+        self.deterministic_only = not Config.LLM_CACHE_SAMPLED if deterministic_only is None else deterministic_only
+        self.default_model = getattr(client, "default_model", None)
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> LLMResponse:
+        """Send chat completion request, serving from cache when possible."""
+        model = model or self.default_model
+        if self.deterministic_only and temperature > 0:
+            return await self.client.chat(messages, model, temperature, max_tokens, json_mode)
+
+        key = LLMCache.make_key(model, messages, temperature, max_tokens, json_mode)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = await self.client.chat(messages, model, temperature, max_tokens, json_mode)
+        self.cache.put(key, response)
+        return response
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> AsyncIterator[StreamChunk]:
+        """Stream from the provider on a miss; replay a hit as one chunk."""
+        model = model or self.default_model
+        if self.deterministic_only and temperature > 0:
+            async for chunk in self.client.chat_stream(messages, model, temperature, max_tokens, json_mode):
+                yield chunk
+            return
+
+        key = LLMCache.make_key(model, messages, temperature, max_tokens, json_mode)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield StreamChunk(
+                delta=cached.content, model=cached.model, usage=cached.usage, finish_reason="stop"
+            )
+            return
+
+        parts = []
+        async for chunk in self.client.chat_stream(messages, model, temperature, max_tokens, json_mode):
+            parts.append(chunk.delta)
+            if chunk.usage is not None:
+                # Only complete streams are cached
+                self.cache.put(key, LLMResponse(
+                    content="".join(parts), model=chunk.model or model, usage=chunk.usage
+                ))
+            yield chunk
+
+
+_default_cache: Optional[LLMCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> LLMCache:
+    """Process-wide cache configured from Config."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache(path=Config.LLM_CACHE_PATH)
+        return _default_cache
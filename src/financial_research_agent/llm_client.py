@@ -4,12 +4,31 @@ Supports OpenAI, Azure OpenAI, and other providers.
 """
 
 import os
+import copy
 import json
-from typing import List, Dict, Any, Optional, Union
+import asyncio
+import time
+import threading
+import contextvars
+import httpx
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import (
+    List, Dict, Any, Optional, Union, Awaitable, Iterable, Iterator, AsyncIterable, AsyncIterator, Tuple
+)
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from openai import OpenAI, AzureOpenAI
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from openai import (
+    OpenAI,
+    AzureOpenAI,
+    AsyncOpenAI,
+    AsyncAzureOpenAI,
+    DefaultHttpxClient,
+    DefaultAsyncHttpxClient,
+)
 from src.financial_research_agent.config import Config
+from src.financial_research_agent.llm_stats import ModelStatsStore, get_default_stats_store
+from src.financial_research_agent.tracing import Span, get_tracer
 
 
 @dataclass
@@ -19,6 +38,176 @@ class LLMResponse:
     model: str
     usage: Dict[str, int]
     raw_response: Any = None
+    cached: bool = False
+
+
+@dataclass
+class StreamChunk:
+    """
+    Incremental piece of a streamed completion.
+    The last chunk of a stream carries `usage`; earlier chunks leave it None.
+    """
+    delta: str
+    model: Optional[str] = None
+    usage: Optional[Dict[str, int]] = None
+    finish_reason: Optional[str] = None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate without a tokenizer: ~4 characters per token for
+    Latin text, ~1 token per CJK character.
+    """
+    if not text:
+        return 0
+    if text.isascii():
+        return (len(text) + 3) // 4
+    cjk = sum(1 for ch in text if "\u4e00" <= ch <= "\u9fff")
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def estimate_message_tokens(
+    messages: List[Dict[str, str]],
+    max_tokens: Optional[int] = None
+) -> int:
+    """Estimated prompt tokens plus the completion allowance for a request."""
+    prompt = sum(estimate_tokens(m.get("content") or "") + 4 for m in messages)
+    return prompt + (Config.LLM_DEFAULT_COMPLETION_TOKENS if max_tokens is None else max_tokens)
+
+
+def build_chat_kwargs(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: Optional[int],
+    json_mode: bool
+) -> Dict[str, Any]:
+    """Build keyword arguments for chat.completions.create."""
+    kwargs = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+    }
+    
+    if max_tokens:
+        kwargs["max_tokens"] = max_tokens
+        
+    if json_mode:
+        kwargs["response_format"] = {"type": "json_object"}
+    
+    return kwargs
+
+
+def _http_pool_options() -> Dict[str, Any]:
+    """Connection pool and timeout settings shared by all provider clients."""
+    return {
+        "limits": httpx.Limits(
+            max_connections=Config.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=Config.LLM_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(Config.LLM_HTTP_TIMEOUT, connect=Config.LLM_CONNECT_TIMEOUT),
+    }
+
+
+def build_http_client() -> httpx.Client:
+    """HTTP client with the configured keep-alive pool."""
+    return DefaultHttpxClient(**_http_pool_options())
+
+
+def build_async_http_client() -> httpx.AsyncClient:
+    """Async HTTP client with the configured keep-alive pool."""
+    return DefaultAsyncHttpxClient(**_http_pool_options())
+
+
+def _with_sdk_options(client: Any, **options) -> Any:
+    """Shallow copy of a provider client whose SDK client uses `options`; the HTTP pool is shared."""
+    clone = copy.copy(client)
+    clone.client = client.client.with_options(**options)
+    return clone
+
+
+def _to_llm_response(response: Any) -> LLMResponse:
+    """Convert an OpenAI chat completion into an LLMResponse."""
+    return LLMResponse(
+        content=response.choices[0].message.content,
+        model=response.model,
+        usage={
+            "prompt_tokens": response.usage.prompt_tokens,
+            "completion_tokens": response.usage.completion_tokens,
+            "total_tokens": response.usage.total_tokens
+        },
+        raw_response=response
+    )
+
+
+class _StreamConverter:
+    """
+    Converts OpenAI chat completion stream chunks into StreamChunks.
+    Endpoints that do not report streaming usage get an estimate instead.
+    """
+
+    def __init__(self, messages: List[Dict[str, str]], model: str):
+        self.messages = messages
+        self.model = model
+        self.completion_chars: List[str] = []
+        self.usage: Optional[Dict[str, int]] = None
+
+    def feed(self, chunk: Any) -> Optional[StreamChunk]:
+        self.model = chunk.model or self.model
+        if getattr(chunk, "usage", None):
+            self.usage = {
+                "prompt_tokens": chunk.usage.prompt_tokens,
+                "completion_tokens": chunk.usage.completion_tokens,
+                "total_tokens": chunk.usage.total_tokens
+            }
+        if chunk.choices:
+            choice = chunk.choices[0]
+            delta = (choice.delta.content or "") if choice.delta else ""
+            if delta:
+                self.completion_chars.append(delta)
+                return StreamChunk(delta=delta, model=self.model)
+        return None
+
+    def finish(self) -> StreamChunk:
+        usage = self.usage
+        if usage is None:
+            prompt_tokens = estimate_message_tokens(self.messages, 0)
+            completion_tokens = estimate_tokens("".join(self.completion_chars))
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        return StreamChunk(delta="", model=self.model, usage=usage, finish_reason="stop")
+
+
+def _iter_stream_chunks(
+    stream: Iterable[Any],
+    messages: List[Dict[str, str]],
+    model: str
+) -> Iterator[StreamChunk]:
+    """Convert an OpenAI chat completion stream into StreamChunks."""
+    converter = _StreamConverter(messages, model)
+    for chunk in stream:
+        converted = converter.feed(chunk)
+        if converted is not None:
+            yield converted
+    yield converter.finish()
+
+
+async def _aiter_stream_chunks(
+    stream: AsyncIterable[Any],
+    messages: List[Dict[str, str]],
+    model: str
+) -> AsyncIterator[StreamChunk]:
+    """Async counterpart of _iter_stream_chunks."""
+    converter = _StreamConverter(messages, model)
+    async for chunk in stream:
+        converted = converter.feed(chunk)
+        if converted is not None:
+            yield converted
+    yield converter.finish()
 
 
 class BaseLLMClient(ABC):
@@ -47,24 +236,64 @@ class BaseLLMClient(ABC):
         """Send completion request (wraps as chat)."""
         pass
 
+    def with_max_retries(self, max_retries: int) -> "BaseLLMClient":
+        """
+        Client whose provider SDK retries failed calls at most `max_retries`
+        times (used when a wrapper owns retries). Clients without SDK
+        retries return themselves.
+        """
+        return self
+
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> Iterator[StreamChunk]:
+        """
+        Stream chat completion as token deltas, ending with a usage chunk.
+        Clients without native streaming yield the whole answer at once.
+        """
+        response = self.chat(messages, model, temperature, max_tokens, json_mode)
+        yield StreamChunk(
+            delta=response.content or "",
+            model=response.model,
+            usage=response.usage,
+            finish_reason="stop"
+        )
+
 
 class OpenAIClient(BaseLLMClient):
     """OpenAI API client."""
     
-    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.Client] = None
+    ):
         self.api_key = api_key or Config.OPENAI_API_KEY
         self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
         
         if not self.api_key:
             raise ValueError("OpenAI API key not provided. Set OPENAI_API_KEY env var or pass api_key.")
         
-        client_kwargs = {"api_key": self.api_key}
+        client_kwargs = {
+            "api_key": self.api_key,
+            "http_client": http_client or build_http_client(),
+            "max_retries": Config.LLM_MAX_RETRIES,
+        }
         if self.base_url:
             client_kwargs["base_url"] = self.base_url
-            
+        
         self.client = OpenAI(**client_kwargs)
         self.default_model = "gpt-4o"
     
+    def with_max_retries(self, max_retries: int) -> "OpenAIClient":
+        return _with_sdk_options(self, max_retries=max_retries)
+
     def chat(
         self, 
         messages: List[Dict[str, str]], 
@@ -74,31 +303,28 @@ class OpenAIClient(BaseLLMClient):
         json_mode: bool = False
     ) -> LLMResponse:
         """Send chat completion request."""
-        kwargs = {
-            "model": model or self.default_model,
-            "messages": messages,
-            "temperature": temperature,
-        }
-        
-        if max_tokens:
-            kwargs["max_tokens"] = max_tokens
-            
-        if json_mode:
-            kwargs["response_format"] = {"type": "json_object"}
-        
-        response = self.client.chat.completions.create(**kwargs)
-        
-        return LLMResponse(
-            content=response.choices[0].message.content,
-            model=response.model,
-            usage={
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens
-            },
-            raw_response=response
+        kwargs = build_chat_kwargs(
+            messages, model or self.default_model, temperature, max_tokens, json_mode
         )
-    
+        response = self.client.chat.completions.create(**kwargs)
+        return _to_llm_response(response)
+
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> Iterator[StreamChunk]:
+        """Stream chat completion as token deltas, ending with a usage chunk."""
+        model = model or self.default_model
+        kwargs = build_chat_kwargs(messages, model, temperature, max_tokens, json_mode)
+        kwargs["stream"] = True
+        kwargs["stream_options"] = {"include_usage": True}
+        stream = self.client.chat.completions.create(**kwargs)
+        yield from _iter_stream_chunks(stream, messages, model)
+
     def complete(
         self, 
         prompt: str, 
@@ -118,7 +344,8 @@ class AzureOpenAIClient(BaseLLMClient):
         self, 
         api_key: Optional[str] = None,
         endpoint: Optional[str] = None,
-        api_version: str = "2024-02-15-preview"
+        api_version: str = "2024-02-15-preview",
+        http_client: Optional[httpx.Client] = None
     ):
         self.api_key = api_key or os.getenv("AZURE_OPENAI_API_KEY")
         self.endpoint = endpoint or os.getenv("AZURE_OPENAI_ENDPOINT")
@@ -130,10 +357,15 @@ class AzureOpenAIClient(BaseLLMClient):
         self.client = AzureOpenAI(
             api_key=self.api_key,
             api_version=self.api_version,
-            azure_endpoint=self.endpoint
+            azure_endpoint=self.endpoint,
+            http_client=http_client or build_http_client(),
+            max_retries=Config.LLM_MAX_RETRIES
         )
         self.default_model = "gpt-4o"
     
+    def with_max_retries(self, max_retries: int) -> "AzureOpenAIClient":
+        return _with_sdk_options(self, max_retries=max_retries)
+
     def chat(
         self, 
         messages: List[Dict[str, str]], 
@@ -143,34 +375,293 @@ class AzureOpenAIClient(BaseLLMClient):
         json_mode: bool = False
     ) -> LLMResponse:
         """Send chat completion request."""
-        kwargs = {
-            "model": model or self.default_model,
-            "messages": messages,
-            "temperature": temperature,
+        kwargs = build_chat_kwargs(
+            messages, model or self.default_model, temperature, max_tokens, json_mode
+        )
+        response = self.client.chat.completions.create(**kwargs)
+        return _to_llm_response(response)
+
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> Iterator[StreamChunk]:
+        """Stream chat completion as token deltas, ending with a usage chunk."""
+        model = model or self.default_model
+        kwargs = build_chat_kwargs(messages, model, temperature, max_tokens, json_mode)
+        kwargs["stream"] = True
+        stream = self.client.chat.completions.create(**kwargs)
+        yield from _iter_stream_chunks(stream, messages, model)
+
+    def complete(
+        self, 
+        prompt: str, 
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None
+    ) -> LLMResponse:
+        """Send completion request (wraps as chat)."""
+        messages = [{"role": "user", "content": prompt}]
+        return self.chat(messages, model, temperature, max_tokens)
+
+
+class AsyncBaseLLMClient(ABC):
+    """Abstract base class for asyncio LLM clients."""
+    
+    @abstractmethod
+    async def chat(
+        self, 
+        messages: List[Dict[str, str]], 
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> LLMResponse:
+        """Send chat completion request."""
+        pass
+    
+    async def complete(
+        self, 
+        prompt: str, 
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None
+    ) -> LLMResponse:
+        """Send completion request (wraps as chat)."""
+        messages = [{"role": "user", "content": prompt}]
+        return await self.chat(messages, model, temperature, max_tokens)
+
+    def with_max_retries(self, max_retries: int) -> "AsyncBaseLLMClient":
+        """See BaseLLMClient.with_max_retries."""
+        return self
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Stream chat completion as token deltas, ending with a usage chunk.
+        Clients without native streaming yield the whole answer at once.
+        """
+        response = await self.chat(messages, model, temperature, max_tokens, json_mode)
+        yield StreamChunk(
+            delta=response.content or "",
+            model=response.model,
+            usage=response.usage,
+            finish_reason="stop"
+        )
+
+
+class AsyncOpenAIClient(AsyncBaseLLMClient):
+    """Async OpenAI API client."""
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
+        self.api_key = api_key or Config.OPENAI_API_KEY
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        
+        if not self.api_key:
+            raise ValueError("OpenAI API key not provided. Set OPENAI_API_KEY env var or pass api_key.")
+        
+        client_kwargs = {
+            "api_key": self.api_key,
+            "http_client": http_client or build_async_http_client(),
+            "max_retries": Config.LLM_MAX_RETRIES,
         }
+        if self.base_url:
+            client_kwargs["base_url"] = self.base_url
         
-        if max_tokens:
-            kwargs["max_tokens"] = max_tokens
-            
-        if json_mode:
-            kwargs["response_format"] = {"type": "json_object"}
+        self.client = AsyncOpenAI(**client_kwargs)
+        self.default_model = "gpt-4o"
+    
+    def with_max_retries(self, max_retries: int) -> "AsyncOpenAIClient":
+        return _with_sdk_options(self, max_retries=max_retries)
+
+    async def chat(
+        self, 
+        messages: List[Dict[str, str]], 
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> LLMResponse:
+        """Send chat completion request."""
+        kwargs = build_chat_kwargs(
+            messages, model or self.default_model, temperature, max_tokens, json_mode
+        )
+        response = await self.client.chat.completions.create(**kwargs)
+        return _to_llm_response(response)
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> AsyncIterator[StreamChunk]:
+        """Stream chat completion as token deltas, ending with a usage chunk."""
+        model = model or self.default_model
+        kwargs = build_chat_kwargs(messages, model, temperature, max_tokens, json_mode)
+        kwargs["stream"] = True
+        kwargs["stream_options"] = {"include_usage": True}
+        stream = await self.client.chat.completions.create(**kwargs)
+        async for chunk in _aiter_stream_chunks(stream, messages, model):
+            yield chunk
+
+
+class AsyncAzureOpenAIClient(AsyncBaseLLMClient):
+    """Async Azure OpenAI API client."""
+    
+    def __init__(
+        self, 
+        api_key: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        api_version: str = "2024-02-15-preview",
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
+        self.api_key = api_key or os.getenv("AZURE_OPENAI_API_KEY")
+        self.endpoint = endpoint or os.getenv("AZURE_OPENAI_ENDPOINT")
+        self.api_version = api_version
         
-        response = self.client.chat.completions.create(**kwargs)
+        if not self.api_key or not self.endpoint:
+            raise ValueError("Azure OpenAI credentials not provided.")
         
-        return LLMResponse(
-            content=response.choices[0].message.content,
-            model=response.model,
-            usage={
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens
-            },
-            raw_response=response
+        self.client = AsyncAzureOpenAI(
+            api_key=self.api_key,
+            api_version=self.api_version,
+            azure_endpoint=self.endpoint,
+            http_client=http_client or build_async_http_client(),
+            max_retries=Config.LLM_MAX_RETRIES
         )
+        self.default_model = "gpt-4o"
     
-    def complete(
+    def with_max_retries(self, max_retries: int) -> "AsyncAzureOpenAIClient":
+        return _with_sdk_options(self, max_retries=max_retries)
+
+    async def chat(
         self, 
-        prompt: str, 
+        messages: List[Dict[str, str]], 
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> LLMResponse:
+        """Send chat completion request."""
+        kwargs = build_chat_kwargs(
+            messages, model or self.default_model, temperature, max_tokens, json_mode
+        )
+        response = await self.client.chat.completions.create(**kwargs)
+        return _to_llm_response(response)
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> AsyncIterator[StreamChunk]:
+        """Stream chat completion as token deltas, ending with a usage chunk."""
+        model = model or self.default_model
+        kwargs = build_chat_kwargs(messages, model, temperature, max_tokens, json_mode)
+        kwargs["stream"] = True
+        # Like AzureOpenAIClient: the default api_version rejects stream_options, usage is estimated
+        stream = await self.client.chat.completions.create(**kwargs)
+        async for chunk in _aiter_stream_chunks(stream, messages, model):
+            yield chunk
+
+
+class ThreadedAsyncClient(AsyncBaseLLMClient):
+    """
+    Adapts a blocking BaseLLMClient to the async interface by running
+    each call in the default executor.
+    """
+    
+    def __init__(self, client: BaseLLMClient):
+        self.client = client
+
+    def with_max_retries(self, max_retries: int) -> "ThreadedAsyncClient":
+        return ThreadedAsyncClient(self.client.with_max_retries(max_retries))
+    
+    async def chat(
+        self, 
+        messages: List[Dict[str, str]], 
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> LLMResponse:
+        """Send chat completion request."""
+        return await asyncio.to_thread(
+            self.client.chat, messages, model, temperature, max_tokens, json_mode
+        )
+
+
+def _traced_stream(span: Span, stream: Iterable[StreamChunk]) -> Iterator[StreamChunk]:
+    """Pass a stream through, recording time to first token and usage on `span`."""
+    for chunk in stream:
+        if chunk.usage is not None:
+            span.record_usage(chunk.usage, chunk.model)
+        if chunk.delta and "time_to_first_token" not in span.attributes:
+            span.set(time_to_first_token=time.time() - span.start)
+        yield chunk
+
+
+class TracedLLMClient(BaseLLMClient):
+    """Wraps a BaseLLMClient so direct (non-router) calls are traced."""
+
+    def __init__(self, client: BaseLLMClient, name: str = "llm.chat"):
+        self.client = client
+        self.name = name
+        self.default_model = getattr(client, "default_model", None)
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> LLMResponse:
+        """Send chat completion request inside an llm span."""
+        with get_tracer().span(self.name, kind="llm", model=model or self.default_model) as span:
+            response = self.client.chat(messages, model, temperature, max_tokens, json_mode)
+            span.record_usage(response.usage, response.model, response.cached)
+            return response
+
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> Iterator[StreamChunk]:
+        """Stream chat completion inside an llm span."""
+        tracer = get_tracer()
+        span = tracer.open_span(self.name, kind="llm", model=model or self.default_model, stream=True)
+        try:
+            yield from _traced_stream(
+                span, self.client.chat_stream(messages, model, temperature, max_tokens, json_mode)
+            )
+        finally:
+            tracer.close_span(span)
+
+    def complete(
+        self,
+        prompt: str,
         model: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: Optional[int] = None
@@ -180,15 +671,47 @@ class AzureOpenAIClient(BaseLLMClient):
         return self.chat(messages, model, temperature, max_tokens)
 
 
+@dataclass
+class FeedbackScope:
+    """(task_type, model) pairs used by one run, awaiting its quality score."""
+    router: "LLMRouter"
+    pending: List[Tuple[str, str]] = field(default_factory=list)
+
+
+_feedback_scope: contextvars.ContextVar = contextvars.ContextVar("llm_feedback_scope", default=None)
+
+
 class LLMRouter:
     """
     RouteLLM - Adaptive model routing for cost/quality optimization.
     Routes requests to appropriate models based on task complexity.
+    When a ModelStatsStore is attached, every call's latency and token
+    usage is recorded and auto_route picks the cheapest model whose
+    observed latency/quality meets the task's target.
+    With hedging enabled, a call still pending after the model's historical
+    latency percentile is duplicated (to `hedge_client` or a fallback model)
+    and the first answer wins.
+    Calls made inside feedback_scope() are credited only by that scope's
+    record_feedback, so concurrent runs can share one router.
     Section 2.6.
     """
-    
-    def __init__(self, client: BaseLLMClient):
+
+    def __init__(
+        self,
+        client: BaseLLMClient,
+        stats: Optional[ModelStatsStore] = None,
+        hedge: Optional[bool] = None,
+        hedge_client: Optional[BaseLLMClient] = None
+    ):
         self.client = client
+        self.stats = stats
+        self.hedge = Config.ROUTER_HEDGE_ENABLED if hedge is None else hedge
+        self.hedge_client = hedge_client
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        # (task_type, model) pairs of calls outside any feedback scope
+        self._pending_feedback: List[Tuple[str, str]] = []
+        self._feedback_lock = threading.Lock()
         
         # Model tiers
         self.strong_models = ["gpt-4o", "gpt-4-turbo", "gpt-4"]
@@ -214,8 +737,34 @@ class LLMRouter:
         json_mode: bool = False
     ) -> LLMResponse:
         """Route request to appropriate model based on task type."""
-        model = self.task_model_map.get(task_type, self.task_model_map["default"])
-        return self.client.chat(messages, model, temperature, max_tokens, json_mode)
+        model = self.select_model(task_type)
+        return self._dispatch(task_type, model, messages, temperature, max_tokens, json_mode)
+
+    def chat_stream(
+        self,
+        task_type: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> Iterator[StreamChunk]:
+        """Route a streaming request to the model for the task type."""
+        model = self.select_model(task_type)
+        tracer = get_tracer()
+        span = tracer.open_span(f"llm.{task_type}", kind="llm", task_type=task_type, model=model, stream=True)
+        start = time.perf_counter()
+        try:
+            stream = self.client.chat_stream(messages, model, temperature, max_tokens, json_mode)
+            for chunk in _traced_stream(span, stream):
+                if chunk.usage is not None:
+                    self._record(task_type, model, time.perf_counter() - start, chunk.usage)
+                yield chunk
+        finally:
+            tracer.close_span(span)
+
+    def select_model(self, task_type: str) -> str:
+        """Return the model configured for a task type."""
+        return self.task_model_map.get(task_type, self.task_model_map["default"])
     
     def estimate_complexity(self, prompt: str) -> str:
         """
@@ -230,9 +779,12 @@ class LLMRouter:
         
         prompt_lower = prompt.lower()
         
-        # Check for high complexity keywords
+        # High complexity keywords only justify the strong tier for
+        # substantial prompts; a one-line "analyze X" is medium
         if any(kw in prompt_lower for kw in high_complexity_keywords):
-            return "high"
+            if len(prompt) >= Config.ROUTER_HIGH_COMPLEXITY_MIN_CHARS:
+                return "high"
+            return "medium"
         
         # Length-based heuristic
         if len(prompt) > 2000:
@@ -245,28 +797,351 @@ class LLMRouter:
         messages: List[Dict[str, str]],
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
-        json_mode: bool = False
+        json_mode: bool = False,
+        task_type: str = "default"
     ) -> LLMResponse:
-        """Automatically route based on prompt complexity."""
+        """Automatically route based on prompt complexity and observed model stats."""
+        model = self.select_auto_model(messages, task_type)
+        return self._dispatch(task_type, model, messages, temperature, max_tokens, json_mode)
+
+    def select_auto_model(self, messages: List[Dict[str, str]], task_type: str = "default") -> str:
+        """
+        Pick the cheapest model that meets the task's latency/quality target.
+        Falls back to the complexity tier while stats are insufficient.
+        """
         # Get the user message for complexity estimation
         user_messages = [m for m in messages if m["role"] == "user"]
         if user_messages:
             complexity = self.estimate_complexity(user_messages[-1]["content"])
         else:
             complexity = "low"
-        
+
         if complexity == "high":
-            model = self.strong_models[0]
+            fallback = self.strong_models[0]
         elif complexity == "medium":
-            model = self.weak_models[0]  # gpt-4o-mini
+            fallback = self.weak_models[0]  # gpt-4o-mini
         else:
-            model = self.weak_models[0]
-        
-        return self.client.chat(messages, model, temperature, max_tokens, json_mode)
+            fallback = self.weak_models[0]
+
+        if self.stats is None:
+            return fallback
+
+        target = Config.ROUTING_TARGETS.get(task_type, Config.ROUTING_TARGETS["default"])
+        prompt_tokens = estimate_message_tokens(messages, 0)
+        candidates = sorted(
+            dict.fromkeys(self.weak_models + self.strong_models),
+            key=lambda m: self.stats.expected_cost(m, prompt_tokens)
+        )
+        for model in candidates:
+            if self.stats.meets_target(model, task_type, target):
+                return model
+        return fallback
 
+    @contextmanager
+    def feedback_scope(self) -> Iterator[FeedbackScope]:
+        """
+        Collects the models used by calls in the enclosed context, including
+        work handed to other threads in a copied context (DAG nodes, hedges,
+        background compression), for record_feedback in the same context.
+        """
+        scope = FeedbackScope(self)
+        token = _feedback_scope.set(scope)
+        try:
+            yield scope
+        finally:
+            _feedback_scope.reset(token)
+
+    def record_feedback(self, quality: float, scope: Optional[FeedbackScope] = None):
+        """
+        Attribute a downstream quality score in [0, 1] (e.g. a normalized
+        RewardSystem score) to every model used since the last feedback in
+        `scope` (default: the current feedback scope, else calls made
+        outside any scope).
+        """
+        pending_list = self._pending_list(scope or _feedback_scope.get())
+        with self._feedback_lock:
+            pending = list(dict.fromkeys(pending_list))
+            pending_list.clear()
+        if self.stats is None:
+            return
+        for task_type, model in pending:
+            self.stats.record_quality(model, quality, task_type)
+        self.stats.save()
+
+    def _pending_list(self, scope: Optional[FeedbackScope]) -> List[Tuple[str, str]]:
+        # Scopes opened on another router do not collect this router's calls
+        return scope.pending if scope is not None and scope.router is self else self._pending_feedback
 
-def get_llm_client(provider: str = "openai") -> BaseLLMClient:
-    """Factory function to get LLM client."""
+    def hedge_delay(self, model: str) -> float:
+        """Seconds to wait before hedging: the model's configured latency percentile."""
+        if self.stats is None:
+            return Config.ROUTER_HEDGE_DEFAULT_DELAY
+        latency = self.stats.percentile(model, Config.ROUTER_HEDGE_PERCENTILE, min_samples=Config.ROUTER_MIN_SAMPLES)
+        if latency is None:
+            return Config.ROUTER_HEDGE_DEFAULT_DELAY
+        return max(latency, Config.ROUTER_HEDGE_MIN_DELAY)
+
+    def _hedge_target(self, model: str) -> Tuple[Any, str]:
+        """Client and model that receive the duplicate request."""
+        return (
+            self.hedge_client or self.client,
+            Config.ROUTER_HEDGE_FALLBACKS.get(model, model)
+        )
+
+    def _dispatch(
+        self,
+        task_type: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: Optional[int],
+        json_mode: bool
+    ) -> LLMResponse:
+        with get_tracer().span(f"llm.{task_type}", kind="llm", task_type=task_type, model=model) as span:
+            response = self._send(task_type, model, messages, temperature, max_tokens, json_mode)
+            span.record_usage(response.usage, response.model, response.cached)
+            return response
+
+    def _send(
+        self,
+        task_type: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: Optional[int],
+        json_mode: bool
+    ) -> LLMResponse:
+        if not self.hedge:
+            start = time.perf_counter()
+            response = self.client.chat(messages, model, temperature, max_tokens, json_mode)
+            self._record(task_type, model, time.perf_counter() - start, response.usage, response.cached)
+            return response
+
+        started: Dict[Future, Tuple[str, float]] = {}
+
+        def submit(client: BaseLLMClient, target_model: str) -> Future:
+            # Carry context (e.g. request priority) into the worker thread
+            ctx = contextvars.copy_context()
+            future = _get_hedge_executor().submit(
+                ctx.run, client.chat, messages, target_model, temperature, max_tokens, json_mode
+            )
+            started[future] = (target_model, time.perf_counter())
+            return future
+
+        primary = submit(self.client, model)
+        done, pending = wait([primary], timeout=self.hedge_delay(model))
+        if not done:
+            hedge_client, hedge_model = self._hedge_target(model)
+            self.hedges_sent += 1
+            pending = {primary, submit(hedge_client, hedge_model)}
+
+        error: Optional[BaseException] = None
+        while True:
+            for future in done:
+                if future.exception() is None:
+                    # Threads cannot be interrupted: a loser that already
+                    # started runs to completion and its result is dropped
+                    for other in pending:
+                        other.cancel()
+                    winner_model, start = started[future]
+                    if future is not primary:
+                        self.hedges_won += 1
+                    response = future.result()
+                    self._record(
+                        task_type, winner_model, time.perf_counter() - start,
+                        response.usage, response.cached
+                    )
+                    return response
+                error = future.exception()
+            if not pending:
+                raise error
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+    def _record(
+        self,
+        task_type: str,
+        model: str,
+        latency: float,
+        usage: Optional[Dict[str, int]],
+        cached: bool = False
+    ):
+        with self._feedback_lock:
+            self._pending_list(_feedback_scope.get()).append((task_type, model))
+        # Cache hits say nothing about the provider's latency or cost
+        if self.stats is not None and not cached:
+            self.stats.record_call(model, latency, usage)
+
+
+class AsyncLLMRouter(LLMRouter):
+    """Async counterpart of LLMRouter sharing the same routing tables."""
+    
+    def __init__(
+        self,
+        client: AsyncBaseLLMClient,
+        stats: Optional[ModelStatsStore] = None,
+        hedge: Optional[bool] = None,
+        hedge_client: Optional[AsyncBaseLLMClient] = None
+    ):
+        super().__init__(client, stats, hedge, hedge_client)
+    
+    async def route(
+        self, 
+        task_type: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> LLMResponse:
+        """Route request to appropriate model based on task type."""
+        model = self.select_model(task_type)
+        return await self._dispatch(task_type, model, messages, temperature, max_tokens, json_mode)
+
+    async def chat_stream(
+        self,
+        task_type: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> AsyncIterator[StreamChunk]:
+        """Route a streaming request to the model for the task type."""
+        model = self.select_model(task_type)
+        tracer = get_tracer()
+        span = tracer.open_span(f"llm.{task_type}", kind="llm", task_type=task_type, model=model, stream=True)
+        start = time.perf_counter()
+        try:
+            async for chunk in self.client.chat_stream(messages, model, temperature, max_tokens, json_mode):
+                if chunk.usage is not None:
+                    span.record_usage(chunk.usage, chunk.model)
+                    self._record(task_type, model, time.perf_counter() - start, chunk.usage)
+                if chunk.delta and "time_to_first_token" not in span.attributes:
+                    span.set(time_to_first_token=time.time() - span.start)
+                yield chunk
+        finally:
+            tracer.close_span(span)
+
+    async def auto_route(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False,
+        task_type: str = "default"
+    ) -> LLMResponse:
+        """Automatically route based on prompt complexity and observed model stats."""
+        model = self.select_auto_model(messages, task_type)
+        return await self._dispatch(task_type, model, messages, temperature, max_tokens, json_mode)
+
+    async def _dispatch(
+        self,
+        task_type: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: Optional[int],
+        json_mode: bool
+    ) -> LLMResponse:
+        with get_tracer().span(f"llm.{task_type}", kind="llm", task_type=task_type, model=model) as span:
+            response = await self._send(task_type, model, messages, temperature, max_tokens, json_mode)
+            span.record_usage(response.usage, response.model, response.cached)
+            return response
+
+    async def _send(
+        self,
+        task_type: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: Optional[int],
+        json_mode: bool
+    ) -> LLMResponse:
+        if not self.hedge:
+            start = time.perf_counter()
+            response = await self.client.chat(messages, model, temperature, max_tokens, json_mode)
+            self._record(task_type, model, time.perf_counter() - start, response.usage, response.cached)
+            return response
+
+        started: Dict[asyncio.Task, Tuple[str, float]] = {}
+
+        def submit(client: AsyncBaseLLMClient, target_model: str) -> asyncio.Task:
+            task = asyncio.ensure_future(
+                client.chat(messages, target_model, temperature, max_tokens, json_mode)
+            )
+            started[task] = (target_model, time.perf_counter())
+            return task
+
+        primary = submit(self.client, model)
+        done, pending = await asyncio.wait({primary}, timeout=self.hedge_delay(model))
+        if not done:
+            hedge_client, hedge_model = self._hedge_target(model)
+            self.hedges_sent += 1
+            pending = {primary, submit(hedge_client, hedge_model)}
+
+        error: Optional[BaseException] = None
+        try:
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        winner_model, start = started[task]
+                        if task is not primary:
+                            self.hedges_won += 1
+                        response = task.result()
+                        self._record(
+                            task_type, winner_model, time.perf_counter() - start,
+                            response.usage, response.cached
+                        )
+                        return response
+                    error = task.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # The losing request is cancelled, closing its connection
+            for task in pending:
+                task.cancel()
+
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=Config.ROUTER_HEDGE_MAX_WORKERS, thread_name_prefix="llm-hedge"
+            )
+        return _hedge_executor
+
+
+async def gather_with_concurrency(
+    awaitables: Iterable[Awaitable[Any]],
+    limit: Optional[int] = None,
+    return_exceptions: bool = False
+) -> List[Any]:
+    """
+    Await all awaitables with at most `limit` in flight at once.
+    Results are returned in input order, like asyncio.gather.
+    """
+    limit = limit or Config.LLM_MAX_CONCURRENCY
+    semaphore = asyncio.Semaphore(limit)
+    
+    async def run(aw: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await aw
+    
+    return await asyncio.gather(
+        *(run(aw) for aw in awaitables), return_exceptions=return_exceptions
+    )
+
+
+# Process-wide client registry: one client (and HTTP pool) per provider
+_client_registry: Dict[Any, Any] = {}
+_registry_lock = threading.Lock()
+
+
+def _create_llm_client(provider: str) -> BaseLLMClient:
     if provider == "openai":
         return OpenAIClient()
     elif provider == "azure":
@@ -275,10 +1150,112 @@ def get_llm_client(provider: str = "openai") -> BaseLLMClient:
         raise ValueError(f"Unknown provider: {provider}")
 
 
-def get_llm_router(provider: str = "openai") -> LLMRouter:
-    """Factory function to get LLM router."""
+def _create_async_llm_client(provider: str) -> AsyncBaseLLMClient:
+    if provider == "openai":
+        return AsyncOpenAIClient()
+    elif provider == "azure":
+        return AsyncAzureOpenAIClient()
+    else:
+        raise ValueError(f"Unknown provider: {provider}")
+
+
+def get_llm_client(provider: str = "openai", shared: bool = True) -> BaseLLMClient:
+    """
+    Factory function to get LLM client.
+    By default returns the process-wide client for the provider so that
+    all agents and pipeline stages reuse one connection pool.
+    """
+    if not shared:
+        return _create_llm_client(provider)
+    key = ("sync", provider)
+    with _registry_lock:
+        client = _client_registry.get(key)
+        if client is None:
+            client = _create_llm_client(provider)
+            _client_registry[key] = client
+        return client
+
+
+def get_llm_router(
+    provider: str = "openai",
+    cached: Optional[bool] = None,
+    scheduled: Optional[bool] = None
+) -> LLMRouter:
+    """
+    Factory function to get LLM router.
+    Layering is router -> cache -> scheduler -> provider, so cache hits
+    never consume rate-limit budget.
+    """
     client = get_llm_client(provider)
-    return LLMRouter(client)
+    if Config.LLM_SCHEDULER_ENABLED if scheduled is None else scheduled:
+        from src.financial_research_agent.scheduler import ScheduledLLMClient
+        client = ScheduledLLMClient(client)
+    if Config.LLM_CACHE_ENABLED if cached is None else cached:
+        from src.financial_research_agent.llm_cache import CachedLLMClient
+        client = CachedLLMClient(client)
+    return LLMRouter(client, stats=get_default_stats_store())
+
+
+def get_async_llm_client(provider: str = "openai", shared: bool = True) -> AsyncBaseLLMClient:
+    """
+    Factory function to get async LLM client.
+    Async connection pools are bound to an event loop, so shared clients
+    are registered per running loop; outside a loop a new client is built.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if not shared or loop is None:
+        return _create_async_llm_client(provider)
+    key = ("async", provider)
+    with _registry_lock:
+        entry = _client_registry.get(key)
+        if entry is None or entry[0] is not loop:
+            entry = (loop, _create_async_llm_client(provider))
+            _client_registry[key] = entry
+        return entry[1]
+
+
+def close_llm_clients():
+    """
+    Close and forget all shared sync clients (e.g. at process shutdown).
+    Shared async clients are left registered; see aclose_llm_clients.
+    """
+    with _registry_lock:
+        keys = [key for key in _client_registry if key[0] == "sync"]
+        clients = [_client_registry.pop(key) for key in keys]
+    for client in clients:
+        client.client.close()
+
+
+async def aclose_llm_clients():
+    """
+    Close and forget the shared async clients of the running event loop;
+    their connection pools can only be closed on that loop.
+    """
+    loop = asyncio.get_running_loop()
+    with _registry_lock:
+        keys = [key for key, value in _client_registry.items() if key[0] == "async" and value[0] is loop]
+        clients = [_client_registry.pop(key)[1] for key in keys]
+    for client in clients:
+        await client.client.close()
+
+
+def get_async_llm_router(
+    provider: str = "openai",
+    cached: Optional[bool] = None,
+    scheduled: Optional[bool] = None
+) -> AsyncLLMRouter:
+    """Factory function to get async LLM router."""
+    client = get_async_llm_client(provider)
+    if Config.LLM_SCHEDULER_ENABLED if scheduled is None else scheduled:
+        from src.financial_research_agent.scheduler import AsyncScheduledLLMClient
+        client = AsyncScheduledLLMClient(client)
+    if Config.LLM_CACHE_ENABLED if cached is None else cached:
+        from src.financial_research_agent.llm_cache import AsyncCachedLLMClient
+        client = AsyncCachedLLMClient(client)
+    return AsyncLLMRouter(client, stats=get_default_stats_store())
 
 
 # Convenience functions
@@ -290,13 +1267,13 @@ def chat_completion(
     json_mode: bool = False
 ) -> str:
     """Simple chat completion function."""
-    client = get_llm_client()
+    client = TracedLLMClient(get_llm_client())
     response = client.chat(messages, model, temperature, max_tokens, json_mode)
     return response.content
 
 
 def simple_completion(prompt: str, model: Optional[str] = None) -> str:
     """Simple completion function."""
-    client = get_llm_client()
+    client = TracedLLMClient(get_llm_client())
     response = client.complete(prompt, model)
     return response.content
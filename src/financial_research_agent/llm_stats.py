@@ -0,0 +1,193 @@
+"""
+LLM Stats - Observed latency, token cost and downstream quality per model.
+Feeds adaptive routing (LLMRouter.auto_route) and persists across runs.
+"""
+
+import os
+import json
+import threading
+from collections import deque
+from typing import List, Dict, Any, Optional
+from src.financial_research_agent.config import Config
+
+
+class ModelStats:
+    """Rolling statistics for one model."""
+
+    def __init__(self, window: Optional[int] = None):
+        self.latencies = deque(maxlen=window or Config.ROUTER_LATENCY_WINDOW)
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+        # Task type -> exponential moving average of quality in [0, 1]
+        self.quality: Dict[str, float] = {}
+        self.quality_samples: Dict[str, int] = {}
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Latency percentile in seconds (p in 0-100), None without samples."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, int(round(p / 100.0 * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def avg_completion_tokens(self) -> Optional[float]:
+        return self.completion_tokens / self.calls if self.calls else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "latencies": list(self.latencies),
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost": self.cost,
+            "quality": self.quality,
+            "quality_samples": self.quality_samples,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ModelStats":
+        stats = cls()
+        stats.latencies.extend(data.get("latencies", []))
+        stats.calls = data.get("calls", 0)
+        stats.prompt_tokens = data.get("prompt_tokens", 0)
+        stats.completion_tokens = data.get("completion_tokens", 0)
+        stats.cost = data.get("cost", 0.0)
+        stats.quality = dict(data.get("quality", {}))
+        stats.quality_samples = dict(data.get("quality_samples", {}))
+        return stats
+
+
+def price_of(model: str, prompt_tokens: float, completion_tokens: float) -> float:
+    """USD cost of a call according to Config.MODEL_PRICING (per 1M tokens)."""
+    pricing = Config.MODEL_PRICING.get(model, Config.MODEL_PRICING["default"])
+    return (prompt_tokens * pricing["prompt"] + completion_tokens * pricing["completion"]) / 1e6
+
+
+class ModelStatsStore:
+    """Thread-safe collection of ModelStats, saved as JSON."""
+
+    def __init__(self, path: Optional[str] = None, autosave_every: int = 20):
+        self.path = path
+        self.autosave_every = autosave_every
+        self._lock = threading.Lock()
+        self._models: Dict[str, ModelStats] = {}
+        self._dirty = 0
+        if path and os.path.exists(path):
+            self.load()
+
+    def get(self, model: str) -> ModelStats:
+        with self._lock:
+            return self._get_locked(model)
+
+    def _get_locked(self, model: str) -> ModelStats:
+        stats = self._models.get(model)
+        if stats is None:
+            stats = ModelStats()
+            self._models[model] = stats
+        return stats
+
+    def record_call(self, model: str, latency: float, usage: Optional[Dict[str, int]] = None):
+        usage = usage or {}
+        prompt = usage.get("prompt_tokens", 0)
+        completion = usage.get("completion_tokens", 0)
+        with self._lock:
+            stats = self._get_locked(model)
+            stats.latencies.append(latency)
+            stats.calls += 1
+            stats.prompt_tokens += prompt
+            stats.completion_tokens += completion
+            stats.cost += price_of(model, prompt, completion)
+            self._mark_dirty()
+
+    def record_quality(self, model: str, score: float, task_type: str = "default"):
+        """Blend a downstream quality score in [0, 1] into the model's EMA."""
+        score = min(1.0, max(0.0, score))
+        alpha = Config.ROUTER_QUALITY_EMA
+        with self._lock:
+            stats = self._get_locked(model)
+            previous = stats.quality.get(task_type)
+            stats.quality[task_type] = score if previous is None else (1 - alpha) * previous + alpha * score
+            stats.quality_samples[task_type] = stats.quality_samples.get(task_type, 0) + 1
+            self._mark_dirty()
+
+    def percentile(self, model: str, p: float, min_samples: int = 1) -> Optional[float]:
+        """Latency percentile of a model, None with fewer than `min_samples` samples."""
+        with self._lock:
+            stats = self._models.get(model)
+            if stats is None or len(stats.latencies) < max(min_samples, 1):
+                return None
+            return stats.percentile(p)
+
+    def expected_cost(self, model: str, prompt_tokens: int) -> float:
+        """Expected USD cost of a call with the given prompt size."""
+        with self._lock:
+            stats = self._models.get(model)
+            completion = stats.avg_completion_tokens() if stats else None
+        if completion is None:
+            completion = Config.LLM_DEFAULT_COMPLETION_TOKENS
+        return price_of(model, prompt_tokens, completion)
+
+    def meets_target(self, model: str, task_type: str, target: Dict[str, float]) -> Optional[bool]:
+        """
+        Whether observed latency and quality satisfy the target.
+        Returns None while there are too few samples to judge.
+        """
+        with self._lock:
+            stats = self._models.get(model)
+            if stats is None or len(stats.latencies) < Config.ROUTER_MIN_SAMPLES:
+                return None
+            quality = stats.quality.get(task_type)
+            if stats.quality_samples.get(task_type, 0) < Config.ROUTER_MIN_SAMPLES:
+                quality = None
+            latency = stats.percentile(target.get("latency_percentile", 95))
+        if latency is not None and latency > target["max_latency"]:
+            return False
+        if quality is None:
+            return None
+        return quality >= target["min_quality"]
+
+    def _mark_dirty(self):
+        self._dirty += 1
+        if self.path and self._dirty >= self.autosave_every:
+            self._save_locked()
+
+    def save(self):
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        self._dirty = 0
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({m: s.to_dict() for m, s in self._models.items()}, f)
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        with self._lock:
+            self._models = {m: ModelStats.from_dict(d) for m, d in data.items()}
+
+    def models(self) -> List[str]:
+        with self._lock:
+            return list(self._models)
+
+
+_default_store: Optional[ModelStatsStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_stats_store() -> ModelStatsStore:
+    """Process-wide stats store persisted at Config.ROUTER_STATS_PATH."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ModelStatsStore(path=Config.ROUTER_STATS_PATH)
+        return _default_store
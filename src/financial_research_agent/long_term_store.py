@@ -0,0 +1,418 @@
+"""
+Long-Term Store - Persistent long-term memory shared across runs and processes.
+Items live in SQLite with an FTS5 index over their content; embeddings are
+appended to a float32 file that readers memory-map, so no process has to
+load the whole store into RAM; large stores are searched through an IVF
+index over that mapping. Queries rank candidates from both indexes by a
+blend of BM25 and cosine similarity.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import threading
+import numpy as np
+from datetime import datetime
+from typing import List, Dict, Tuple, Iterable, Iterator, Optional
+from src.financial_research_agent.models import MemoryItem
+from src.financial_research_agent.embeddings import EmbeddingService, get_default_embedding_service
+from src.financial_research_agent.vector_index import VectorIndex
+from src.financial_research_agent.config import Config
+
+_TERM_PATTERN = re.compile(r"[a-z0-9]+|[\u4e00-\u9fff]")
+
+
+class LongTermStore:
+    """
+    Drop-in replacement for the long-term MemoryTier, backed by
+    <directory>/memory.sqlite and an embedding file named in its meta
+    table (embeddings.f32 until the first compaction).
+    Writers serialize on the SQLite write lock, which also guards appends
+    to the embedding file; a row is only visible once its item commits.
+    Replaced or removed items leave their old embedding row unused until
+    compact() rewrites the file, which happens on open and after removals
+    once dead rows outnumber both live rows and
+    Config.LONG_TERM_COMPACT_MIN_ROWS.
+    """
+
+    persistent = True # Not included in checkpoint snapshots
+
+    def __init__(self, directory: Optional[str] = None, embedder: Optional[EmbeddingService] = None):
+        self.name = "long_term"
+        self.directory = directory or Config.LONG_TERM_MEMORY_DIR
+        self.embedder = embedder or get_default_embedding_service()
+        self.lock = threading.RLock()
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(os.path.join(self.directory, "memory.sqlite"),
+                                     timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS items (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT UNIQUE NOT NULL,
+                content TEXT NOT NULL,
+                timestamp TEXT,
+                access_count INTEGER DEFAULT 0,
+                vector_row INTEGER NOT NULL,
+                last_access REAL
+            );
+            CREATE INDEX IF NOT EXISTS items_vector_row ON items (vector_row);
+            CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(content, content='items', content_rowid='rowid');
+            CREATE VIRTUAL TABLE IF NOT EXISTS items_vocab USING fts5vocab(items_fts, 'row');
+            CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+                INSERT INTO items_fts (rowid, content) VALUES (new.rowid, new.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+                INSERT INTO items_fts (items_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE OF content ON items BEGIN
+                INSERT INTO items_fts (items_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+                INSERT INTO items_fts (rowid, content) VALUES (new.rowid, new.content);
+            END;
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(items)")}
+        if "last_access" not in columns: # Stores created before recency was persisted
+            self._conn.execute("ALTER TABLE items ADD COLUMN last_access REAL")
+        self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('dim', ?)", (str(self.embedder.dim),))
+        self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('model', ?)", (self.embedder.name,))
+        self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('vectors', 'embeddings.f32')")
+        self._conn.commit()
+        self.vectors_path = self._current_vectors_path()
+        if not os.path.exists(self.vectors_path):
+            open(self.vectors_path, "ab").close()
+        dim = int(self._conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()[0])
+        if dim != self.embedder.dim:
+            raise ValueError(f"{self.directory} holds {dim}-d embeddings, embedder produces {self.embedder.dim}-d")
+        model = self._conn.execute("SELECT value FROM meta WHERE key = 'model'").fetchone()[0]
+        if model != self.embedder.name:
+            raise ValueError(f"{self.directory} holds {model} embeddings, embedder is {self.embedder.name}")
+
+        # Read-side caches, invalidated when any connection commits
+        self._data_version = None
+        self._vectors: Optional[np.memmap] = None
+        self._live: Optional[np.ndarray] = None # Vector rows that belong to a current item
+        self._live_count = 0
+        self._mapped_path: Optional[str] = None
+        self._index: Optional[VectorIndex] = None # IVF view over _vectors, once past the exact-scan limit
+        self._doc_freq: Dict[str, int] = {}
+        self._maybe_compact()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self._conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def __contains__(self, item_id: str) -> bool:
+        with self.lock:
+            return self._conn.execute("SELECT 1 FROM items WHERE id = ?", (item_id,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[MemoryItem]:
+        return iter(self.items())
+
+    def get(self, item_id: str) -> Optional[MemoryItem]:
+        with self.lock:
+            row = self._conn.execute(
+                "SELECT id, content, timestamp, access_count, last_access FROM items WHERE id = ?", (item_id,)
+            ).fetchone()
+        return self._item(row) if row else None
+
+    def items(self) -> List[MemoryItem]:
+        with self.lock:
+            rows = self._conn.execute(
+                "SELECT id, content, timestamp, access_count, last_access FROM items ORDER BY rowid"
+            ).fetchall()
+        return [self._item(row) for row in rows]
+
+    def append(self, item: MemoryItem):
+        self.extend([item])
+
+    def extend(self, items: Iterable[MemoryItem]):
+        items = list(items)
+        if not items:
+            return
+        vectors = self._embed(items)
+        with self.lock:
+            # BEGIN IMMEDIATE takes the write lock before the next vector row is read
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Another process may have compacted into a new file
+                self.vectors_path = self._current_vectors_path()
+                start = self._conn.execute("SELECT COALESCE(MAX(vector_row) + 1, 0) FROM items").fetchone()[0]
+                with open(self.vectors_path, "r+b") as f:
+                    f.seek(start * self.embedder.dim * 4)
+                    f.write(vectors.tobytes())
+                self._conn.executemany(
+                    "INSERT INTO items (id, content, timestamp, access_count, last_access, vector_row) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET content = excluded.content, timestamp = excluded.timestamp, "
+                    "access_count = excluded.access_count, last_access = excluded.last_access, "
+                    "vector_row = excluded.vector_row",
+                    [
+                        (m.id, m.content, m.timestamp.isoformat(), m.access_count,
+                         m.last_access.timestamp() if m.last_access is not None else None, start + i)
+                        for i, m in enumerate(items)
+                    ]
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._data_version = None
+
+    def remove(self, item_ids: Iterable[str]) -> List[MemoryItem]:
+        """Removes the given ids (unknown ids are ignored); returns the removed items."""
+        removed = []
+        with self.lock:
+            for item_id in item_ids:
+                item = self.get(item_id)
+                if item is not None:
+                    self._conn.execute("DELETE FROM items WHERE id = ?", (item_id,))
+                    removed.append(item)
+            self._conn.commit()
+            self._data_version = None
+            self._maybe_compact()
+        return removed
+
+    def touch(self, item_ids: Iterable[str], now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Records a hit on each given item: bumps its access count and last
+        access time. Returns the new access counts.
+        """
+        item_ids = list(item_ids)
+        now = time.time() if now is None else now
+        with self.lock:
+            self._conn.executemany(
+                "UPDATE items SET access_count = access_count + 1, last_access = ? WHERE id = ?",
+                [(now, i) for i in item_ids]
+            )
+            self._conn.commit()
+            rows = self._conn.execute(
+                f"SELECT id, access_count FROM items WHERE id IN ({','.join('?' * len(item_ids))})", item_ids
+            ).fetchall() if item_ids else []
+        return dict(rows)
+
+    def clear(self):
+        with self.lock:
+            self._conn.execute("DELETE FROM items")
+            self._conn.commit()
+            self._data_version = None
+            self.compact()
+
+    def compact(self, chunk_size: int = 65536):
+        """
+        Rewrites the embeddings of current items, in vector-row order, to a
+        new file and renumbers their rows. The new name is committed with
+        the rows, so readers of other processes switch at their next
+        refresh; the superseded file is kept until the next compaction for
+        readers still mapping it, and older ones are deleted.
+        """
+        dim = self.embedder.dim
+        with self.lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            old_path = self._current_vectors_path()
+            name = f"embeddings.{time.time_ns()}.f32"
+            path = os.path.join(self.directory, name)
+            try:
+                rows = self._conn.execute("SELECT rowid, vector_row FROM items ORDER BY vector_row").fetchall()
+                file_rows = self._file_rows(old_path)
+                old = np.memmap(old_path, dtype=np.float32, mode="r", shape=(file_rows, dim)) if file_rows else None
+                with open(path, "wb") as f:
+                    for start in range(0, len(rows), chunk_size):
+                        batch = np.array([r for _, r in rows[start:start + chunk_size]], dtype=np.int64)
+                        f.write(np.ascontiguousarray(old[batch]).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                del old
+                self._conn.executemany(
+                    "UPDATE items SET vector_row = ? WHERE rowid = ?",
+                    [(i, rowid) for i, (rowid, _) in enumerate(rows)]
+                )
+                self._conn.execute("UPDATE meta SET value = ? WHERE key = 'vectors'", (name,))
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                if os.path.exists(path):
+                    os.remove(path)
+                raise
+            self.vectors_path = path
+            self._vectors = None
+            self._index = None
+            self._data_version = None
+        keep = {os.path.basename(path), os.path.basename(old_path)}
+        for entry in os.listdir(self.directory):
+            if entry.startswith("embeddings") and entry.endswith(".f32") and entry not in keep:
+                try:
+                    os.remove(os.path.join(self.directory, entry))
+                except OSError:
+                    pass
+
+    def refresh_index(self):
+        """Embeddings are written with their items; nothing to do."""
+
+    def search(self, vector: np.ndarray, k: int, text: Optional[str] = None) -> List[Tuple[MemoryItem, float]]:
+        """
+        The k best items for `vector` (and `text`, if given), best first.
+        Candidates are the top Config.LONG_TERM_SEARCH_CANDIDATES by cosine
+        (scanning the memory-mapped embeddings, or probing an IVF index over
+        them past Config.VECTOR_INDEX_EXACT_LIMIT items) and by BM25; each scores
+        (1 - w) * cosine + w * BM25 / best BM25, w = Config.LONG_TERM_TEXT_WEIGHT.
+        """
+        n_candidates = max(k, Config.LONG_TERM_SEARCH_CANDIDATES)
+        query = np.asarray(vector, dtype=np.float32)
+        with self.lock:
+            self._refresh_caches()
+            if self._vectors is None:
+                return []
+            candidates = set(self._vector_candidates(query, n_candidates))
+            text_scores = self._text_scores(text, n_candidates) if text else {}
+            # Rows committed by another process after the caches were refreshed are not mapped yet
+            text_scores = {row: score for row, score in text_scores.items() if row < len(self._vectors)}
+            candidates.update(text_scores)
+            if not candidates:
+                return []
+
+            rows = np.array(sorted(candidates), dtype=np.int64)
+            cosine = self._vectors[rows] @ query
+            best_text = max(text_scores.values(), default=0.0)
+            weight = Config.LONG_TERM_TEXT_WEIGHT if best_text > 0 else 0.0
+            scores = {
+                int(row): (1 - weight) * float(cos) + weight * text_scores.get(int(row), 0.0) / (best_text or 1.0)
+                for row, cos in zip(rows, cosine)
+            }
+            top = sorted(scores, key=lambda row: -scores[row])[:k]
+            placeholders = ",".join("?" * len(top))
+            found = {
+                row[5]: self._item(row[:5]) for row in self._conn.execute(
+                    "SELECT id, content, timestamp, access_count, last_access, vector_row "
+                    f"FROM items WHERE vector_row IN ({placeholders})",
+                    top
+                )
+            }
+        return [(found[row], scores[row]) for row in top if row in found]
+
+    def close(self):
+        with self.lock:
+            self._vectors = None
+            self._index = None
+            self._conn.close()
+
+    def _current_vectors_path(self) -> str:
+        name = self._conn.execute("SELECT value FROM meta WHERE key = 'vectors'").fetchone()[0]
+        return os.path.join(self.directory, name)
+
+    def _file_rows(self, path: str) -> int:
+        try:
+            return os.path.getsize(path) // (self.embedder.dim * 4)
+        except FileNotFoundError:
+            return 0
+
+    def _maybe_compact(self):
+        with self.lock:
+            live = self._conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+            dead = self._file_rows(self._current_vectors_path()) - live
+            if dead > max(live, Config.LONG_TERM_COMPACT_MIN_ROWS):
+                self.compact()
+
+    def _refresh_caches(self):
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        # One read transaction, so the file name and the rows agree
+        self._conn.execute("BEGIN")
+        try:
+            path = self._current_vectors_path()
+            rows = np.fromiter((r for (r,) in self._conn.execute("SELECT vector_row FROM items")), dtype=np.int64)
+        finally:
+            self._conn.commit()
+        if path != self._mapped_path:
+            self._index = None
+            self._mapped_path = path
+        n_rows = int(rows.max()) + 1 if len(rows) else 0
+        self._live = np.zeros(n_rows, dtype=bool)
+        self._live[rows] = True
+        self._live_count = len(rows)
+        self._vectors = np.memmap(path, dtype=np.float32, mode="r",
+                                  shape=(n_rows, self.embedder.dim)) if n_rows else None
+        if self._vectors is None:
+            self._index = None
+        elif self._index is not None:
+            self._index.remap(self._vectors, self._live)
+        self._doc_freq = {}
+        self._data_version = version
+
+    def _vector_candidates(self, query: np.ndarray, n: int, chunk_size: int = 65536) -> List[int]:
+        if self._live_count > Config.VECTOR_INDEX_EXACT_LIMIT:
+            if self._index is None:
+                self._index = VectorIndex.over(self._vectors, self._live)
+            return [row for row, _ in self._index.search(query, n)]
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+        for start in range(0, len(self._vectors), chunk_size):
+            scores = self._vectors[start:start + chunk_size] @ query
+            scores[~self._live[start:start + chunk_size]] = -np.inf
+            rows = np.concatenate([best_rows, np.arange(start, start + len(scores))])
+            scores = np.concatenate([best_scores, scores])
+            if len(scores) > n:
+                keep = np.argpartition(-scores, n)[:n]
+                rows, scores = rows[keep], scores[keep]
+            best_rows, best_scores = rows, scores
+        return best_rows[np.isfinite(best_scores)].tolist()
+
+    def _text_scores(self, text: str, n: int) -> Dict[int, float]:
+        # Terms in most documents add little to BM25 but make FTS rank every match; skip them
+        max_df = max(Config.LONG_TERM_TEXT_MAX_DF * self._live_count, n)
+        terms = [t for t in dict.fromkeys(_TERM_PATTERN.findall(text.lower())) if self._df(t) <= max_df]
+        if not terms:
+            return {}
+        match = " OR ".join(f'"{term}"' for term in terms)
+        # bm25() is lower-is-better; negate so higher is better
+        return {
+            row: -score for row, score in self._conn.execute(
+                "SELECT items.vector_row, bm25(items_fts) FROM items_fts JOIN items ON items.rowid = items_fts.rowid "
+                "WHERE items_fts MATCH ? ORDER BY bm25(items_fts) LIMIT ?", (match, n)
+            )
+        }
+
+    def _df(self, term: str) -> int:
+        if term not in self._doc_freq:
+            row = self._conn.execute("SELECT doc FROM items_vocab WHERE term = ?", (term,)).fetchone()
+            self._doc_freq[term] = row[0] if row else 0
+        return self._doc_freq[term]
+
+    def _embed(self, items: List[MemoryItem]) -> np.ndarray:
+        vectors = np.zeros((len(items), self.embedder.dim), dtype=np.float32)
+        missing = []
+        for i, m in enumerate(items):
+            if m.embedding is not None and len(m.embedding) == self.embedder.dim:
+                vectors[i] = m.embedding
+            else:
+                missing.append(i)
+        if missing:
+            vectors[missing] = self.embedder.embed_batch([items[i].content for i in missing])
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    @staticmethod
+    def _item(row) -> MemoryItem:
+        item_id, content, timestamp, access_count, last_access = row
+        return MemoryItem(
+            id=item_id, content=content, type="long_term",
+            timestamp=datetime.fromisoformat(timestamp) if timestamp else datetime.now(),
+            access_count=access_count or 0,
+            last_access=datetime.fromtimestamp(last_access) if last_access is not None else None
+        )
+
+
+_default_store: Optional[LongTermStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_long_term_store() -> LongTermStore:
+    """Process-wide store persisted at Config.LONG_TERM_MEMORY_DIR."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = LongTermStore()
+        return _default_store
@@ -1,58 +1,378 @@
 import uuid
-from src.financial_research_agent.agent.planner import PlannerAgent
+import math
+import argparse
+import threading
+import contextlib
+from typing import List, Dict, Callable, Optional
+from src.financial_research_agent.agent.planner import PlannerAgent, SubTask, ResearchPlan
 from src.financial_research_agent.agent.researcher import ResearcherAgent
 from src.financial_research_agent.agent.writer import WriterAgent
 from src.financial_research_agent.agent.reviewer import ReviewerAgent
 from src.financial_research_agent.agent.memory import MemoryManager
-from src.financial_research_agent.models import FinalReport
+from src.financial_research_agent.models import FinalReport, ReportSection, ResearchStep, MemoryItem
+from src.financial_research_agent.evaluation.rewards import RewardSystem
+from src.financial_research_agent.data_pipeline.retrieval import RetrievalSystem
+from src.financial_research_agent.llm_client import LLMRouter, get_llm_router
+from src.financial_research_agent.tracing import Tracer, use_tracer
+from src.financial_research_agent.dag_executor import DAGExecutor
+from src.financial_research_agent.checkpoint import CheckpointStore
+from src.financial_research_agent.report_cache import ReportCache, fingerprint, get_default_report_cache
+from src.financial_research_agent.long_term_store import get_default_long_term_store
+from src.financial_research_agent.config import Config
+
+class SectionStreams:
+    """
+    Merges the deltas of sections written concurrently into one stream
+    without interleaving: one section streams live, the others are
+    buffered and emitted whole, in finishing order, once it is done.
+    """
+
+    def __init__(self, on_delta: Callable[[str], None]):
+        self.on_delta = on_delta
+        self._lock = threading.Lock()
+        self._live: Optional[str] = None
+        self._buffers: Dict[str, List[str]] = {}
+        self._finished: List[str] = []
+
+    def emit(self, key: str, delta: str):
+        with self._lock:
+            if self._live is None:
+                self._live = key
+            if self._live == key:
+                self.on_delta(delta)
+            else:
+                self._buffers.setdefault(key, []).append(delta)
+
+    def close(self, key: str):
+        with self._lock:
+            if self._live != key:
+                self._finished.append(key)
+                return
+            self._live = None
+            for done in self._finished:
+                for delta in self._buffers.pop(done, []):
+                    self.on_delta(delta)
+            self._finished.clear()
+            if self._buffers:
+                # Hand the stream to a section still being written
+                self._live = next(iter(self._buffers))
+                for delta in self._buffers.pop(self._live):
+                    self.on_delta(delta)
+
+def run_report(
+    user_query: str,
+    tracer: Tracer,
+    planner: Optional[PlannerAgent] = None,
+    retrieval: Optional[RetrievalSystem] = None,
+    router: Optional[LLMRouter] = None,
+    memory: Optional[MemoryManager] = None,
+    verbose: bool = True,
+    max_concurrency: Optional[int] = None,
+    checkpoint: Optional[CheckpointStore] = None,
+    report_cache: Optional[ReportCache] = None,
+    research_budget: Optional[float] = None,
+    on_delta: Optional[Callable[[str], None]] = None
+) -> FinalReport:
+    """
+    Runs plan -> research/write -> review for one query.
+    Components default to the production ones; the benchmark suite passes
+    offline fakes and the batch runner passes components shared across
+    queries. Up to `max_concurrency` subtasks (default
+    Config.MAX_PARALLEL_SUBTASKS) are worked on at once.
+    With a `checkpoint`, state is saved after planning, after each subtask's
+    research and section, and after review; an existing checkpoint is
+    resumed, skipping the work it already records.
+    With a `report_cache`, each subtask's research, each section and the
+    review are reused when their fingerprints (query, models, description,
+    perspective, dependencies, evidence set) are unchanged, so editing one subtask only
+    recomputes what it affects.
+    Subtasks are researched highest expected gain per cost first; under a
+    `research_budget` (default Config.RESEARCH_BUDGET) low-value subtasks
+    are merged or dropped, and the planner may insert follow-ups mid-run.
+    With `on_delta`, each section's text is passed on as it is generated,
+    headed by "## <title>"; concurrent sections are not interleaved (see
+    SectionStreams). A `memory` passed in is left open for the caller
+    (e.g. to consolidate it); one created here is closed on return.
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+    streams = SectionStreams(on_delta) if on_delta is not None else None
+    # Quality feedback goes only to the models this run used, even when the router is shared
+    feedback = router.feedback_scope() if router is not None else contextlib.nullcontext()
+    owned_memory = contextlib.nullcontext()
+    if memory is None:
+        memory = MemoryManager(router=router)
+        owned_memory = contextlib.closing(memory)
+    with use_tracer(tracer), feedback, owned_memory, tracer.span("run", kind="run", query=user_query):
+        # 1. Initialize Agents
+        planner = planner or PlannerAgent(router=router)
+        researcher = ResearcherAgent(memory, retrieval=retrieval)
+        writer = WriterAgent(memory, router=router)
+        reviewer = ReviewerAgent()
+
+        state = checkpoint.load() if checkpoint is not None else None
+        if state is not None and state["query"] != user_query:
+            raise ValueError(f"Checkpoint {checkpoint.path} is for a different query: {state['query']!r}")
+        if state is not None and state.get("report"):
+            log(f"Run already completed (checkpoint {checkpoint.path})")
+            return FinalReport.model_validate(state["report"])
+
+        # Per-subtask results; guarded so checkpoints see a consistent state
+        progress_lock = threading.Lock()
+        research_steps: Dict[str, List[ResearchStep]] = {}
+        research_evidence: Dict[str, List[MemoryItem]] = {}
+        written: Dict[str, ReportSection] = {}
+
+        def save_checkpoint(phase: str, report: Optional[FinalReport] = None):
+            if checkpoint is None:
+                return
+            with progress_lock:
+                checkpoint.save(phase, {
+                    "query": user_query,
+                    "plan": [task.model_dump(mode="json") for task in plan],
+                    "budget": plan.budget,
+                    "memory": memory.snapshot(),
+                    "steps": {
+                        task_id: [step.model_dump(mode="json") for step in steps]
+                        for task_id, steps in research_steps.items()
+                    },
+                    "evidence": {
+                        task_id: [item.model_dump(mode="json") for item in items]
+                        for task_id, items in research_evidence.items()
+                    },
+                    "sections": {task_id: section.model_dump(mode="json") for task_id, section in written.items()},
+                    "report": report.model_dump(mode="json") if report is not None else None,
+                })
+
+        # 2. Plan
+        if state is not None:
+            log(f"--- Resuming from checkpoint ({state['phase']}) ---")
+            plan = ResearchPlan([SubTask.model_validate(task) for task in state["plan"]], state.get("budget"))
+            memory.restore(state["memory"])
+            for task_id, steps in state["steps"].items():
+                research_steps[task_id] = [ResearchStep.model_validate(step) for step in steps]
+            for task_id, items in state.get("evidence", {}).items():
+                research_evidence[task_id] = [MemoryItem.model_validate(item) for item in items]
+            for task_id, section in state["sections"].items():
+                written[task_id] = ReportSection.model_validate(section)
+        else:
+            log("--- Planning ---")
+            with tracer.span("plan", kind="phase"):
+                plan = planner.build_plan(user_query, research_budget)
+            save_checkpoint("planned")
+        for task in plan:
+            log(f"Subtask: {task.description} ({task.perspective}) [{task.status}, priority {plan.priority(task):.2f}]")
+
+        # 3. Research & Write
+        # Each subtask's research starts once the research it depends on is
+        # done, highest priority first, and its section is written as soon
+        # as its own research is done, so independent subtasks overlap.
+        log("\n--- Researching & Writing ---")
+
+        research_keys: Dict[str, str] = {}
+
+        # What research and sections depend on besides the subtask itself
+        research_context = (
+            user_query, Config.RESEARCHER_MODEL, researcher.retrieval.provider, Config.MAX_SEARCH_RESULTS
+        )
+        section_context = (user_query, Config.WRITER_MODEL, writer.router is not None)
+
+        def research_key(task: SubTask) -> str:
+            # Research builds on its dependencies, so their keys are part of its own;
+            # computed depth-first without recursion, dependencies before dependents
+            with progress_lock:
+                stack, expanded = [task.id], set()
+                while stack:
+                    task_id = stack[-1]
+                    if task_id in research_keys:
+                        stack.pop()
+                        continue
+                    current = plan.get(task_id)
+                    missing = [dep for dep in current.depends_on if dep not in research_keys]
+                    if missing:
+                        if task_id in expanded:
+                            raise ValueError(f"Subtask dependency cycle through {task_id}")
+                        expanded.add(task_id)
+                        stack.extend(missing)
+                        continue
+                    research_keys[task_id] = fingerprint(
+                        "research", research_context, current.description, current.perspective,
+                        [research_keys[dep] for dep in current.depends_on]
+                    )
+                    stack.pop()
+                return research_keys[task.id]
+
+        def research(task: SubTask):
+            if task.id in research_steps:
+                return research_steps[task.id]
+            if not plan.reserve(task.id):
+                log(f"Skipping {task.status} subtask: {task.description}")
+                return None
+            cached = report_cache.get("research", research_key(task)) if report_cache is not None else None
+            if cached is not None:
+                log(f"Research cached: {task.description}")
+                steps = [ResearchStep.model_validate(step) for step in cached["steps"]]
+                evidence = [MemoryItem.model_validate(item) for item in cached["evidence"]]
+                for item in evidence:
+                    memory.add_to_working(item)
+            else:
+                log(f"Researching: {task.description}...")
+                # In a real system, steps would populate memory automatically or we'd do it here explicitly
+                # (ResearcherAgent already adds to memory in our mock)
+                with tracer.span("research.subtask", kind="subtask", subtask_id=task.id):
+                    steps, evidence = researcher.execute_task_with_evidence(task.description)
+                if report_cache is not None:
+                    report_cache.put("research", research_key(task), {
+                        "steps": [step.model_dump(mode="json") for step in steps],
+                        "evidence": [item.model_dump(mode="json") for item in evidence],
+                    })
+            with progress_lock:
+                research_steps[task.id] = steps
+                research_evidence[task.id] = evidence
+                task.status = "researched"
+            for follow_up in planner.replan(plan, task, steps):
+                log(f"Inserting subtask: {follow_up.description} ({follow_up.perspective})")
+                plan.add(follow_up)
+                schedule(follow_up)
+            if plan.fit_budget():
+                log(f"Budget {plan.budget} reached; plan now: {[t.id for t in plan.active]}")
+            save_checkpoint("research")
+            return steps
+
+        def write(task: SubTask) -> Optional[ReportSection]:
+            if task.id in written:
+                return written[task.id]
+            if task.id not in research_steps:
+                return None # Dropped or merged into another subtask
+            # Recall the most relevant evidence for this section within the token budget,
+            # from this subtask's research, the research it builds on and findings
+            # earlier runs left in long-term memory
+            query = f"{task.description} {task.perspective}"
+            with progress_lock:
+                scoped = [tid for tid in [task.id] + task.depends_on if tid in research_evidence]
+                candidates = [item for tid in scoped for item in research_evidence[tid]] if scoped else None
+            recalled = memory.recall(query, tiers=("long_term",))
+            if recalled:
+                if candidates is None:
+                    candidates = memory.working_memory + memory.episodic_memory
+                candidates = candidates + recalled
+            relevant_mems = memory.select_evidence(query, candidates=candidates)
+            section_key = fingerprint(
+                "section", section_context, task.description, task.perspective,
+                [(m.id, m.content) for m in relevant_mems]
+            )
+            cached = report_cache.get("section", section_key) if report_cache is not None else None
+            if streams is not None:
+                streams.emit(task.id, f"\n## {task.description}\n")
+            try:
+                if cached is not None:
+                    section = ReportSection.model_validate(cached)
+                    if streams is not None:
+                        streams.emit(task.id, section.content)
+                else:
+                    with tracer.span("write.section", kind="subtask", subtask_id=task.id):
+                        section = writer.write_section(
+                            task.description, relevant_mems,
+                            on_delta=(lambda delta: streams.emit(task.id, delta)) if streams is not None else None
+                        )
+                    if report_cache is not None:
+                        report_cache.put("section", section_key, section.model_dump(mode="json"))
+            finally:
+                if streams is not None:
+                    streams.close(task.id)
+            with progress_lock:
+                written[task.id] = section
+                planner.update_plan(plan, task.id)
+            save_checkpoint("write")
+            if streams is None:
+                log(f"\n## {section.title}\n{section.content}", flush=True)
+            return section
+
+        dag = DAGExecutor(max_workers=max_concurrency)
+
+        def schedule(task: SubTask):
+            # The DAG edges are fixed from here on, so the plan must keep them
+            plan.freeze(task.id)
+            dag.add(("research", task.id), lambda: research(task),
+                    depends_on=[("research", dep) for dep in task.depends_on],
+                    priority=lambda: plan.priority_of(task.id))
+            # A ready section is never wasted work, so writing goes ahead of research
+            dag.add(("write", task.id), lambda: write(task), depends_on=[("research", task.id)],
+                    priority=math.inf)
+
+        for task in plan:
+            schedule(task)
+        with tracer.span("execute", kind="phase", subtasks=len(plan)):
+            results = dag.run()
+        sections = [
+            results[("write", task.id)] for task in plan
+            if results.get(("write", task.id)) is not None
+        ]
+
+        # 4. Review & Assemble
+        log("\n--- Reviewing ---")
+        review_key = fingerprint("review", user_query, [section.model_dump(mode="json") for section in sections])
+        cached = report_cache.get("review", review_key) if report_cache is not None else None
+        if cached is not None:
+            final_report = FinalReport.model_validate(cached)
+        else:
+            with tracer.span("review", kind="phase"):
+                final_report = FinalReport(
+                    title=f"Investment Analysis: {user_query}",
+                    sections=sections,
+                    executive_summary="This is a generated executive summary.",
+                    references={}
+                )
+
+                final_report = reviewer.review_report(final_report)
+            if report_cache is not None:
+                report_cache.put("review", review_key, final_report.model_dump(mode="json"))
+        save_checkpoint("completed", final_report)
+
+        # Feed report quality back into adaptive routing
+        if router is not None:
+            router.record_feedback(RewardSystem().calculate_normalized_reward(final_report, user_query))
+
+    return final_report
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Financial Research Agent")
+    parser.add_argument("--query", default="Analyze the investment opportunities in the humanoid robot industry in 2025")
+    parser.add_argument("--resume", nargs="?", const="latest", metavar="RUN_ID",
+                        help="Resume a run from its checkpoint (default: the most recent run)")
+    parser.add_argument("--budget", type=float, default=Config.RESEARCH_BUDGET,
+                        help="Research budget in subtask cost units (default: unlimited)")
+    parser.add_argument("--incremental", action="store_true", default=Config.REPORT_CACHE_ENABLED,
+                        help="Reuse research and sections of unchanged subtasks from earlier runs")
+    parser.add_argument("--persistent-memory", action="store_true", default=Config.LONG_TERM_MEMORY_PERSISTENT,
+                        help=f"Recall from and add findings to the long-term store in {Config.LONG_TERM_MEMORY_DIR}")
+    args = parser.parse_args(argv)
+
+    tracer = Tracer()
+    user_query = args.query
+    if args.resume:
+        checkpoint = CheckpointStore.latest() if args.resume == "latest" else CheckpointStore(args.resume)
+        state = checkpoint.load() if checkpoint is not None else None
+        if state is None:
+            parser.error(f"No checkpoint found for {args.resume}")
+        user_query = state["query"]
+    else:
+        checkpoint = CheckpointStore(tracer.run_id)
 
-def main():
-    user_query = "Analyze the investment opportunities in the humanoid robot industry in 2025"
     print(f"=== Starting Financial Research Agent ===")
-    print(f"Query: {user_query}\n")
-
-    # 1. Initialize Agents
-    memory = MemoryManager()
-    planner = PlannerAgent()
-    researcher = ResearcherAgent(memory)
-    writer = WriterAgent(memory)
-    reviewer = ReviewerAgent()
-
-    # 2. Plan
-    print("--- Planning ---")
-    subtasks = planner.create_plan(user_query)
-    for task in subtasks:
-        print(f"Subtask: {task.description} ({task.perspective})")
-
-    # 3. Execute & Research
-    print("\n--- Researching ---")
-    for task in subtasks:
-        print(f"Researching: {task.description}...")
-        steps = researcher.execute_task(task.description)
-        # In a real system, steps would populate memory automatically or we'd do it here explicitly
-        # (ResearcherAgent already adds to memory in our mock)
-
-    # 4. Write
-    print("\n--- Writing ---")
-    sections = []
-    for task in subtasks:
-        # Recall relevant info for this specific section
-        # In a real system, we'd filter memory by relevance to the task
-        relevant_mems = memory.working_memory + memory.episodic_memory 
-        section = writer.write_section(task.description, relevant_mems)
-        sections.append(section)
-        print(f"Generated section: {section.title}")
-
-    # 5. Review & Assemble
-    print("\n--- Reviewing ---")
-    final_report = FinalReport(
-        title=f"Investment Analysis: {user_query}",
-        sections=sections,
-        executive_summary="This is a generated executive summary.",
-        references={}
-    )
-    
-    final_report = reviewer.review_report(final_report)
+    print(f"Query: {user_query}")
+    print(f"Checkpoint: {checkpoint.path}\n")
+
+    # Sections are streamed from the LLM when credentials are configured
+    router = get_llm_router() if Config.OPENAI_API_KEY else None
+    report_cache = get_default_report_cache() if args.incremental else None
+    long_term_memory = get_default_long_term_store() if args.persistent_memory else None
+    memory = MemoryManager(long_term_memory=long_term_memory, router=router)
+    final_report = run_report(user_query, tracer, router=router, memory=memory, checkpoint=checkpoint,
+                              report_cache=report_cache, research_budget=args.budget,
+                              on_delta=lambda delta: print(delta, end="", flush=True))
+    if args.persistent_memory:
+        memory.consolidate()
+    memory.close()
 
     # Output
     print("\n=== Final Report ===")
@@ -62,5 +382,16 @@ def main():
         print(f"\n## {sec.title}")
         print(sec.content[:100] + "...") # Truncate for display
 
+    if tracer.enabled:
+        trace_path = tracer.export_jsonl()
+        summary = tracer.summary()
+        print(f"\n=== Trace ===")
+        print(f"Wall time: {summary['wall_time']:.2f}s, LLM tokens: "
+              f"{summary['llm']['prompt_tokens']} prompt / {summary['llm']['completion_tokens']} completion")
+        print("Critical path: " + " > ".join(
+            f"{s['name']} ({s['duration']:.2f}s)" for s in summary["critical_path"]
+        ))
+        print(f"Trace written to {trace_path}")
+
 if __name__ == "__main__":
     main()
@@ -70,3 +70,4 @@ class MemoryItem(BaseModel):
     embedding: Optional[List[float]] = None
     timestamp: datetime = Field(default_factory=datetime.now)
     access_count: int = 0
+    last_access: Optional[datetime] = None
@@ -0,0 +1,107 @@
+"""
+Report Cache - Subtask-level results keyed by content fingerprints.
+Research output, written sections and the review pass are stored under a
+hash of their inputs, so editing or adding one subtask only recomputes the
+work whose inputs actually changed.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Any, Optional
+from src.financial_research_agent.config import Config
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """
+    JSON values keyed by (kind, fingerprint); kinds used by run_report are
+    "research", "section" and "review". Without a path the cache lives in
+    memory only.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._memory: Dict[tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS report_cache ("
+                "kind TEXT, fingerprint TEXT, value TEXT, created_at REAL, "
+                "PRIMARY KEY (kind, fingerprint))"
+            )
+            self._conn.commit()
+
+    def get(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._memory.get((kind, key))
+            if value is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value FROM report_cache WHERE kind = ? AND fingerprint = ?", (kind, key)
+                ).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._memory[(kind, key)] = value
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def put(self, kind: str, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._memory[(kind, key)] = value
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO report_cache (kind, fingerprint, value, created_at) VALUES (?, ?, ?, ?)",
+                (kind, key, json.dumps(value, ensure_ascii=False, default=str), time.time())
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM report_cache")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_cache: Optional[ReportCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_report_cache() -> ReportCache:
+    """Process-wide cache persisted at Config.REPORT_CACHE_PATH."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ReportCache(path=Config.REPORT_CACHE_PATH)
+        return _default_cache
@@ -0,0 +1,374 @@
+"""
+Request Scheduler - Rate-limit-aware admission control for LLM calls.
+Sits between LLMRouter and the provider clients, enforcing per-model
+RPM/TPM budgets, priority ordering and retry with jittered backoff.
+"""
+
+import math
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Iterator, AsyncIterator
+from openai import APIConnectionError, APITimeoutError
+from src.financial_research_agent.config import Config
+from src.financial_research_agent.tracing import get_tracer
+from src.financial_research_agent.llm_client import (
+    LLMResponse,
+    StreamChunk,
+    BaseLLMClient,
+    AsyncBaseLLMClient,
+    estimate_message_tokens,
+)
+
+# Lower value = served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 5
+PRIORITY_BULK = 10
+
+_current_priority = contextvars.ContextVar("llm_request_priority", default=PRIORITY_DEFAULT)
+
+
+@contextmanager
+def request_priority(priority: int):
+    """Run the enclosed LLM calls at the given scheduling priority."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> int:
+    return _current_priority.get()
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to `per_minute` units."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)."""
+        self._refill(now)
+        # Requests larger than the bucket are admitted once it is full
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float):
+        self.level -= amount
+
+    def adjust(self, delta: float):
+        """Return (positive) or charge (negative) units after the fact."""
+        self.level = min(self.capacity, self.level + delta)
+
+
+class RateLimiter:
+    """
+    Per-model RPM/TPM buckets with a priority queue per model.
+    A caller is admitted only when it heads its model's queue and both
+    buckets can cover the estimated request.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, int]]] = None):
+        self.limits = limits or Config.MODEL_RATE_LIMITS
+        self._cond = threading.Condition()
+        self._buckets: Dict[str, Dict[str, TokenBucket]] = {}
+        self._queues: Dict[str, List[tuple]] = {}
+        self._counter = itertools.count()
+
+    def _buckets_for(self, model: str) -> Dict[str, TokenBucket]:
+        buckets = self._buckets.get(model)
+        if buckets is None:
+            limit = self.limits.get(model, self.limits["default"])
+            buckets = {"rpm": TokenBucket(limit["rpm"]), "tpm": TokenBucket(limit["tpm"])}
+            self._buckets[model] = buckets
+        return buckets
+
+    def acquire(self, model: str, tokens: int, priority: int = PRIORITY_DEFAULT) -> float:
+        """Block until the request may be sent. Returns seconds spent queued."""
+        start = time.monotonic()
+        entry = (priority, next(self._counter))
+        with self._cond:
+            heapq.heappush(self._queues.setdefault(model, []), entry)
+            while True:
+                wait = self._admit(model, entry, tokens)
+                if wait <= 0:
+                    return time.monotonic() - start
+                self._cond.wait(None if math.isinf(wait) else wait)
+
+    async def acquire_async(self, model: str, tokens: int, priority: int = PRIORITY_DEFAULT) -> float:
+        """
+        acquire() for coroutines: waits on the event loop instead of in a
+        thread, re-checking at least every Config.LLM_SCHEDULER_POLL_INTERVAL
+        seconds. A waiter cancelled while queued leaves the queue without
+        consuming budget.
+        """
+        start = time.monotonic()
+        entry = (priority, next(self._counter))
+        with self._cond:
+            heapq.heappush(self._queues.setdefault(model, []), entry)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._admit(model, entry, tokens)
+                if wait <= 0:
+                    return time.monotonic() - start
+                await asyncio.sleep(min(wait, Config.LLM_SCHEDULER_POLL_INTERVAL))
+        except BaseException:
+            with self._cond:
+                queue = self._queues[model]
+                if entry in queue:
+                    queue.remove(entry)
+                    heapq.heapify(queue)
+                    self._cond.notify_all()
+            raise
+
+    def _admit(self, model: str, entry: tuple, tokens: int) -> float:
+        """
+        Admits a queued entry if it heads the queue and the buckets cover
+        it (returns 0); otherwise returns seconds to wait (inf when
+        another entry is ahead). Called with the condition held.
+        """
+        queue = self._queues[model]
+        if queue[0] != entry:
+            return math.inf
+        buckets = self._buckets_for(model)
+        now = time.monotonic()
+        wait = max(buckets["rpm"].wait_time(1, now), buckets["tpm"].wait_time(tokens, now))
+        if wait > 0:
+            return wait
+        heapq.heappop(queue)
+        buckets["rpm"].consume(1)
+        buckets["tpm"].consume(tokens)
+        self._cond.notify_all()
+        return 0.0
+
+    def settle(self, model: str, estimated: int, actual: int):
+        """Correct the TPM bucket once real usage is known."""
+        with self._cond:
+            self._buckets_for(model)["tpm"].adjust(estimated - actual)
+            self._cond.notify_all()
+
+
+def is_retryable(exc: Exception) -> bool:
+    """429 and 5xx responses, timeouts and dropped connections."""
+    if isinstance(exc, (APIConnectionError, APITimeoutError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    return status is not None and (status == 429 or status >= 500)
+
+
+def backoff_delay(attempt: int, exc: Optional[Exception] = None) -> float:
+    """Full-jitter exponential backoff, honouring Retry-After when present."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return min(float(retry_after), Config.LLM_RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+    ceiling = min(Config.LLM_RETRY_MAX_DELAY, Config.LLM_RETRY_BASE_DELAY * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def _total_tokens(response: LLMResponse, fallback: int) -> int:
+    usage = response.usage or {}
+    return usage.get("total_tokens") or fallback
+
+
+class ScheduledLLMClient(BaseLLMClient):
+    """
+    Wraps a BaseLLMClient so every call passes through a RateLimiter.
+    Priority is taken from the surrounding request_priority() context.
+    Retries happen here, each one admitted by the limiter, so the wrapped
+    client's own SDK retries are turned off.
+    """
+
+    def __init__(
+        self,
+        client: BaseLLMClient,
+        limiter: Optional[RateLimiter] = None,
+        max_attempts: Optional[int] = None
+    ):
+        self.client = client.with_max_retries(0)
+        self.limiter = limiter or get_default_rate_limiter()
+        self.max_attempts = max_attempts or Config.LLM_RETRY_ATTEMPTS
+        self.default_model = getattr(client, "default_model", None)
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> LLMResponse:
+        """Send chat completion request once the model's budget allows it."""
+        model = model or self.default_model
+        estimate = estimate_message_tokens(messages, max_tokens)
+        for attempt in range(self.max_attempts):
+            queued = self.limiter.acquire(model, estimate, current_priority())
+            get_tracer().add_to_current("queue_time", queued)
+            try:
+                response = self.client.chat(messages, model, temperature, max_tokens, json_mode)
+            except Exception as exc:
+                # Failed calls are not billed; give the tokens back
+                self.limiter.settle(model, estimate, 0)
+                if not is_retryable(exc) or attempt == self.max_attempts - 1:
+                    raise
+                time.sleep(backoff_delay(attempt, exc))
+                continue
+            self.limiter.settle(model, estimate, _total_tokens(response, estimate))
+            return response
+
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> Iterator[StreamChunk]:
+        """
+        Stream once the model's budget allows it. Failures are retried only
+        before the first delta has been handed to the caller.
+        """
+        model = model or self.default_model
+        estimate = estimate_message_tokens(messages, max_tokens)
+        for attempt in range(self.max_attempts):
+            self.limiter.acquire(model, estimate, current_priority())
+            started = False
+            actual = 0
+            try:
+                for chunk in self.client.chat_stream(messages, model, temperature, max_tokens, json_mode):
+                    if chunk.usage is not None:
+                        actual = chunk.usage.get("total_tokens") or estimate
+                    started = True
+                    yield chunk
+            except Exception as exc:
+                self.limiter.settle(model, estimate, estimate if started else 0)
+                if started or not is_retryable(exc) or attempt == self.max_attempts - 1:
+                    raise
+                time.sleep(backoff_delay(attempt, exc))
+                continue
+            self.limiter.settle(model, estimate, actual or estimate)
+            return
+
+    def complete(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None
+    ) -> LLMResponse:
+        """Send completion request (wraps as chat)."""
+        messages = [{"role": "user", "content": prompt}]
+        return self.chat(messages, model, temperature, max_tokens)
+
+
+class AsyncScheduledLLMClient(AsyncBaseLLMClient):
+    """Async counterpart of ScheduledLLMClient sharing the same RateLimiter."""
+
+    def __init__(
+        self,
+        client: AsyncBaseLLMClient,
+        limiter: Optional[RateLimiter] = None,
+        max_attempts: Optional[int] = None
+    ):
+        self.client = client.with_max_retries(0)
+        self.limiter = limiter or get_default_rate_limiter()
+        self.max_attempts = max_attempts or Config.LLM_RETRY_ATTEMPTS
+        self.default_model = getattr(client, "default_model", None)
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> LLMResponse:
+        """Send chat completion request once the model's budget allows it."""
+        model = model or self.default_model
+        estimate = estimate_message_tokens(messages, max_tokens)
+        for attempt in range(self.max_attempts):
+            queued = await self.limiter.acquire_async(model, estimate, current_priority())
+            get_tracer().add_to_current("queue_time", queued)
+            try:
+                response = await self.client.chat(messages, model, temperature, max_tokens, json_mode)
+            except asyncio.CancelledError:
+                # Abandoned like a failed call; give the tokens back
+                self.limiter.settle(model, estimate, 0)
+                raise
+            except Exception as exc:
+                self.limiter.settle(model, estimate, 0)
+                if not is_retryable(exc) or attempt == self.max_attempts - 1:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt, exc))
+                continue
+            self.limiter.settle(model, estimate, _total_tokens(response, estimate))
+            return response
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        json_mode: bool = False
+    ) -> AsyncIterator[StreamChunk]:
+        """See ScheduledLLMClient.chat_stream."""
+        model = model or self.default_model
+        estimate = estimate_message_tokens(messages, max_tokens)
+        for attempt in range(self.max_attempts):
+            queued = await self.limiter.acquire_async(model, estimate, current_priority())
+            get_tracer().add_to_current("queue_time", queued)
+            started = False
+            actual = 0
+            try:
+                async for chunk in self.client.chat_stream(messages, model, temperature, max_tokens, json_mode):
+                    if chunk.usage is not None:
+                        actual = chunk.usage.get("total_tokens") or estimate
+                    started = True
+                    yield chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                # Abandoned; tokens are given back only if nothing was streamed
+                self.limiter.settle(model, estimate, estimate if started else 0)
+                raise
+            except Exception as exc:
+                self.limiter.settle(model, estimate, estimate if started else 0)
+                if started or not is_retryable(exc) or attempt == self.max_attempts - 1:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt, exc))
+                continue
+            self.limiter.settle(model, estimate, actual or estimate)
+            return
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_default_rate_limiter() -> RateLimiter:
+    """Process-wide limiter so all agents draw from the same budgets."""
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter()
+        return _default_limiter
@@ -0,0 +1,247 @@
+"""
+Search Cache - TTL cache of search result sets keyed by normalized query.
+Identical searches issued while one is in flight wait for it instead of
+calling the provider again. Results are deduplicated by canonical URL.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import List, Dict, Any, Callable, Optional, Tuple
+from src.financial_research_agent.config import Config
+
+
+def normalize_query(query: str) -> str:
+    """Case-, width- and whitespace-insensitive form of a query."""
+    query = unicodedata.normalize("NFKC", query).casefold()
+    return " ".join(query.split()).strip("?!.,;: ")
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    URL with the variations that do not change the document removed:
+    scheme (http/https), "www.", default ports, fragments, tracking
+    parameters, parameter order and a trailing slash.
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.netloc:
+        return url
+    scheme = parts.scheme.lower()
+    if scheme in ("http", "https"):
+        scheme = "https"
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if port is not None and port not in (80, 443):
+        host = f"{host}:{port}"
+    path = parts.path.rstrip("/") or "/"
+    params = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in Config.SEARCH_TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(params), ""))
+
+
+def dedupe_results(results: List[Dict]) -> List[Dict]:
+    """Keeps the first result per canonical URL, recorded as "canonical_url"."""
+    seen = set()
+    deduped = []
+    for result in results:
+        url = result.get("url")
+        canonical = canonicalize_url(url) if url else None
+        if canonical is not None:
+            if canonical in seen:
+                continue
+            seen.add(canonical)
+        deduped.append({**result, "canonical_url": canonical})
+    return deduped
+
+
+class SearchCache:
+    """
+    Result sets keyed by (provider, normalized query, result limit), served
+    for `ttl` seconds. In-memory LRU, backed by SQLite when a path is given
+    so repeated searches across runs skip the provider too. Callers get
+    copies of the cached result dicts.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_size: Optional[int] = None,
+        ttl: Optional[float] = None,
+        prune_interval: int = 100
+    ):
+        self.path = path
+        self.memory_size = memory_size if memory_size is not None else Config.SEARCH_CACHE_MEMORY_SIZE
+        self.ttl = ttl if ttl is not None else Config.SEARCH_CACHE_TTL
+        self.prune_interval = prune_interval
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict() # key -> (results, created_at)
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache (key TEXT PRIMARY KEY, results TEXT, created_at REAL)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(provider: str, query: str, max_results: int) -> str:
+        payload = json.dumps([provider, normalize_query(query), max_results], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        with self._lock:
+            results = self._get_locked(key, time.time())
+            if results is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return [dict(r) for r in results]
+
+    def put(self, key: str, results: List[Dict]):
+        if self.ttl <= 0:
+            return
+        now = time.time()
+        results = [dict(r) for r in results]
+        with self._lock:
+            self._remember(key, (results, now))
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, results, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(results, ensure_ascii=False, default=str), now)
+            )
+            self._conn.commit()
+            self._puts_since_prune += 1
+            if self._puts_since_prune >= self.prune_interval:
+                self._puts_since_prune = 0
+                self._conn.execute("DELETE FROM search_cache WHERE created_at < ?", (now - self.ttl,))
+                self._conn.commit()
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], List[Dict]]) -> Tuple[List[Dict], str]:
+        """
+        Cached results for `key`, or the results of `fetch()`, which is
+        called at most once at a time per key: concurrent callers wait for
+        the call in flight. Returns the results and "hit", "coalesced" or
+        "miss". A failed fetch is raised to every waiting caller and not
+        cached.
+        """
+        with self._lock:
+            results = self._get_locked(key, time.time())
+            if results is not None:
+                self.hits += 1
+                return [dict(r) for r in results], "hit"
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return [dict(r) for r in future.result()], "coalesced"
+
+        try:
+            results = fetch()
+            self.put(key, results)
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(results)
+        return results, "miss"
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM search_cache")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.coalesced + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.coalesced) / total if total else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _get_locked(self, key: str, now: float) -> Optional[List[Dict]]:
+        entry = self._memory.get(key)
+        if entry is not None and now - entry[1] <= self.ttl:
+            self._memory.move_to_end(key)
+            return entry[0]
+        if entry is not None:
+            del self._memory[key]
+
+        if self._conn is not None:
+            row = self._conn.execute(
+                "SELECT results, created_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] <= self.ttl:
+                entry = (json.loads(row[0]), row[1])
+                self._remember(key, entry)
+                self.disk_hits += 1
+                return entry[0]
+        return None
+
+    def _remember(self, key: str, entry: tuple):
+        if self.memory_size <= 0:
+            return
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+
+_default_cache: Optional[SearchCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_search_cache() -> SearchCache:
+    """Process-wide cache configured from Config."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SearchCache(path=Config.SEARCH_CACHE_PATH if Config.SEARCH_CACHE_PERSISTENT else None)
+        return _default_cache
@@ -0,0 +1,219 @@
+"""
+Tracing - Lightweight spans for LLM calls, searches and agent phases.
+Records wall time, queue time, model, token usage and cache status,
+exports JSONL and summarizes a run including its critical path.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import List, Dict, Any, Optional, Iterator
+from src.financial_research_agent.config import Config
+
+
+@dataclass
+class Span:
+    """One timed unit of work."""
+    span_id: str
+    name: str
+    kind: str
+    parent_id: Optional[str] = None
+    start: float = 0.0
+    end: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        end = self.end if self.end is not None else time.time()
+        return end - self.start
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def record_usage(self, usage: Optional[Dict[str, int]], model: Optional[str] = None, cached: bool = False):
+        """Attach token accounting from an LLMResponse or final StreamChunk."""
+        usage = usage or {}
+        if model:
+            self.attributes["model"] = model
+        self.attributes["prompt_tokens"] = usage.get("prompt_tokens", 0)
+        self.attributes["completion_tokens"] = usage.get("completion_tokens", 0)
+        self.attributes["cached"] = cached
+
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("trace_current_span", default=None)
+_current_tracer: contextvars.ContextVar = contextvars.ContextVar("trace_current_tracer", default=None)
+
+
+class Tracer:
+    """
+    Collects spans for one run. Parent/child links follow the contextvars
+    context, so work submitted to other threads should run in a copied
+    context (contextvars.copy_context().run) to stay attached to its parent.
+    """
+
+    def __init__(self, run_id: Optional[str] = None, enabled: Optional[bool] = None):
+        self.run_id = run_id or str(uuid.uuid4())
+        self.enabled = Config.TRACING_ENABLED if enabled is None else enabled
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes) -> Iterator[Span]:
+        """Time the enclosed block as a child of the current span."""
+        span = self.open_span(name, kind, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.attributes["error"] = repr(exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.close_span(span)
+
+    def open_span(self, name: str, kind: str = "internal", **attributes) -> Span:
+        """
+        Start a span without making it current; finish with close_span().
+        Used for generators, whose body runs in the consumer's context.
+        """
+        parent = _current_span.get()
+        return Span(
+            span_id=uuid.uuid4().hex[:16],
+            name=name,
+            kind=kind,
+            parent_id=parent.span_id if parent is not None else None,
+            start=time.time(),
+            attributes=dict(attributes)
+        )
+
+    def close_span(self, span: Span):
+        span.end = time.time()
+        if self.enabled:
+            with self._lock:
+                self.spans.append(span)
+
+    def annotate(self, **attributes):
+        """Set attributes on the innermost open span, if any."""
+        span = _current_span.get()
+        if span is not None:
+            span.set(**attributes)
+
+    def add_to_current(self, key: str, amount: float):
+        """Accumulate a numeric attribute (e.g. queue_time across retries)."""
+        span = _current_span.get()
+        if span is not None:
+            span.attributes[key] = span.attributes.get(key, 0) + amount
+
+    def export_jsonl(self, path: Optional[str] = None) -> str:
+        """Write one line per span followed by a summary line. Returns the path."""
+        path = path or os.path.join(Config.TRACE_DIR, f"{self.run_id}.jsonl")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        with open(path, "w", encoding="utf-8") as f:
+            for span in spans:
+                record = asdict(span)
+                record["type"] = "span"
+                record["run_id"] = self.run_id
+                record["duration"] = span.duration
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            summary = self.summary()
+            summary["type"] = "summary"
+            f.write(json.dumps(summary, ensure_ascii=False, default=str) + "\n")
+        return path
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-kind/per-name timings, LLM token totals and the critical path."""
+        with self._lock:
+            spans = list(self.spans)
+
+        by_name: Dict[str, Dict[str, float]] = {}
+        llm = {"calls": 0, "cached": 0, "prompt_tokens": 0, "completion_tokens": 0, "queue_time": 0.0}
+        search = {"calls": 0, "cached": 0}
+        for span in spans:
+            entry = by_name.setdefault(span.name, {"count": 0, "total_time": 0.0})
+            entry["count"] += 1
+            entry["total_time"] += span.duration
+            if span.kind == "llm":
+                llm["calls"] += 1
+                llm["cached"] += int(bool(span.attributes.get("cached")))
+                llm["prompt_tokens"] += span.attributes.get("prompt_tokens", 0)
+                llm["completion_tokens"] += span.attributes.get("completion_tokens", 0)
+                llm["queue_time"] += span.attributes.get("queue_time", 0.0)
+            elif span.kind == "search":
+                search["calls"] += 1
+                search["cached"] += int(bool(span.attributes.get("cached")))
+
+        roots = [s for s in spans if s.parent_id is None]
+        root = max(roots, key=lambda s: s.duration) if roots else None
+        return {
+            "run_id": self.run_id,
+            "wall_time": root.duration if root else 0.0,
+            "span_count": len(spans),
+            "by_name": by_name,
+            "llm": llm,
+            "search": search,
+            "critical_path": [
+                {"name": s.name, "kind": s.kind, "duration": s.duration}
+                for s in self.critical_path(root, spans)
+            ] if root else [],
+        }
+
+    def critical_path(self, root: Span, spans: Optional[List[Span]] = None) -> List[Span]:
+        """
+        Chain of spans that determined the root's wall time: walking back
+        from the root's end, repeatedly take the child that finished last
+        before the current cursor, then recurse into it.
+        """
+        if spans is None:
+            with self._lock:
+                spans = list(self.spans)
+        children: Dict[str, List[Span]] = {}
+        for span in spans:
+            if span.parent_id is not None:
+                children.setdefault(span.parent_id, []).append(span)
+
+        def expand(span: Span) -> List[Span]:
+            chain = []
+            cursor = span.end if span.end is not None else time.time()
+            for child in sorted(children.get(span.span_id, []), key=lambda c: c.end or 0, reverse=True):
+                if child.end is not None and child.end <= cursor + 1e-6:
+                    chain.append(child)
+                    cursor = child.start
+            path = [span]
+            for child in reversed(chain):
+                path.extend(expand(child))
+            return path
+
+        return expand(root)
+
+
+# Spans outside use_tracer are timed but not kept: a process-wide list would
+# grow for the life of long-running or batch processes
+_default_tracer = Tracer(run_id="default", enabled=False)
+
+
+def get_tracer() -> Tracer:
+    """
+    Tracer for the current context (see use_tracer), else the process
+    default, which records nothing.
+    """
+    return _current_tracer.get() or _default_tracer
+
+
+@contextmanager
+def use_tracer(tracer: Tracer) -> Iterator[Tracer]:
+    """Route spans in the enclosed context to `tracer` (e.g. one per query)."""
+    token = _current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current_tracer.reset(token)
+
@@ -0,0 +1,230 @@
+"""
+Vector Index - Cosine top-k search over a contiguous float32 matrix.
+Small indexes are scanned exactly; past Config.VECTOR_INDEX_EXACT_LIMIT
+vectors an inverted-file (IVF) layer clusters them with k-means and only
+the Config.VECTOR_INDEX_NPROBE closest clusters are scanned per query.
+"""
+
+import math
+import numpy as np
+from typing import List, Dict, Tuple, Hashable, Iterable, Optional
+from src.financial_research_agent.config import Config
+
+
+class VectorIndex:
+    """
+    Vectors keyed by arbitrary hashable keys, stored L2-normalized in one
+    growable matrix. Adding an existing key replaces its vector; removal
+    moves the last row into the freed slot, so rows stay contiguous.
+    VectorIndex.over() instead builds a search-only view of an existing
+    matrix. Not thread-safe: callers serialize access.
+    """
+
+    def __init__(
+        self,
+        dim: Optional[int] = None,
+        exact_limit: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        seed: int = 0
+    ):
+        self.dim = dim or Config.EMBEDDING_DIM
+        self.exact_limit = exact_limit if exact_limit is not None else Config.VECTOR_INDEX_EXACT_LIMIT
+        self.nprobe = nprobe or Config.VECTOR_INDEX_NPROBE
+        self.seed = seed
+
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._keys: List[Hashable] = []
+        self._rows: Dict[Hashable, int] = {}
+
+        # IVF layer, built once the index outgrows exact search
+        self._centroids: Optional[np.ndarray] = None
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._lists: List[List[int]] = []
+        self._list_arrays: Dict[int, np.ndarray] = {}
+        self._trained_size = 0
+        self._live: Optional[np.ndarray] = None # Views only: rows that may be returned
+
+    @classmethod
+    def over(cls, vectors: np.ndarray, live: np.ndarray, **kwargs) -> "VectorIndex":
+        """
+        Search-only index over a matrix of L2-normalized rows (e.g. a
+        read-only memory map), which is not copied. Keys are row numbers;
+        rows where `live` is False are never returned.
+        """
+        index = cls(vectors.shape[1], **kwargs)
+        index.remap(vectors, live)
+        return index
+
+    def remap(self, vectors: np.ndarray, live: np.ndarray):
+        """
+        Points a view at the current matrix and live mask. Rows may be
+        appended or marked dead; appended live rows join the IVF lists.
+        A shorter matrix drops the IVF layer, to be retrained on demand.
+        """
+        used = len(self._keys)
+        self._vectors = vectors
+        self._live = live
+        self._keys = range(len(vectors))
+        if len(vectors) < used:
+            self._centroids = None
+            self._trained_size = 0
+        elif self._centroids is not None and len(vectors) > used:
+            assign = np.zeros(len(vectors), dtype=np.int32)
+            assign[:used] = self._assign[:used]
+            self._assign = assign
+            rows = np.arange(used, len(vectors))
+            self._assign_rows(rows[live[used:]])
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    def add(self, keys: Iterable[Hashable], vectors: np.ndarray):
+        keys = list(keys)
+        vectors = self._normalize(np.asarray(vectors, dtype=np.float32).reshape(len(keys), self.dim))
+        used = len(self._keys)
+        rows = []
+        for key in keys:
+            row = self._rows.get(key)
+            if row is None:
+                row = len(self._keys)
+                self._keys.append(key)
+                self._rows[key] = row
+            rows.append(row)
+        self._reserve(len(self._keys), used)
+        rows = np.array(rows, dtype=np.int64)
+        self._vectors[rows] = vectors
+        if self._centroids is not None and len(rows):
+            rows = np.unique(rows)
+            for row in rows[rows < used].tolist():
+                self._unassign(row)
+            self._assign_rows(rows)
+
+    def reserve(self, size: int):
+        """Pre-allocates room for `size` vectors (avoids regrowth on bulk loads)."""
+        self._reserve(size, len(self._keys))
+
+    def remove(self, keys: Iterable[Hashable]):
+        for key in keys:
+            row = self._rows.pop(key, None)
+            if row is None:
+                continue
+            last = len(self._keys) - 1
+            if self._centroids is not None:
+                self._unassign(row)
+            if row != last:
+                moved = self._keys[last]
+                self._keys[row] = moved
+                self._rows[moved] = row
+                self._vectors[row] = self._vectors[last]
+                if self._centroids is not None:
+                    cluster = int(self._assign[last])
+                    members = self._lists[cluster]
+                    members[members.index(last)] = row
+                    self._assign[row] = cluster
+                    self._list_arrays.pop(cluster, None)
+            self._keys.pop()
+
+    def clear(self):
+        self.__init__(self.dim, self.exact_limit, self.nprobe, self.seed)
+
+    def search(self, vector: np.ndarray, k: int) -> List[Tuple[Hashable, float]]:
+        """The k keys most similar to `vector`, best first, with cosine scores."""
+        size = len(self._keys)
+        if size == 0 or k <= 0:
+            return []
+        query = self._normalize(np.asarray(vector, dtype=np.float32).reshape(1, self.dim))[0]
+
+        if size > self.exact_limit and (self._centroids is None or size > 2 * self._trained_size):
+            self._train()
+
+        rows = None
+        if self._centroids is not None and size > self.exact_limit:
+            probes = self._top(self._centroids @ query, self.nprobe)
+            rows = np.concatenate([self._list_array(int(c)) for c in probes])
+            if self._live is not None:
+                rows = rows[self._live[rows]]
+            if len(rows) < k:
+                rows = None
+        if rows is None:
+            scores = self._vectors[:size] @ query
+            if self._live is not None:
+                scores[~self._live[:size]] = -np.inf
+            best = self._top(scores, k)
+            return [(self._keys[i], float(scores[i])) for i in best if np.isfinite(scores[i])]
+        scores = self._vectors[rows] @ query
+        best = self._top(scores, k)
+        return [(self._keys[rows[i]], float(scores[i])) for i in best]
+
+    def _reserve(self, size: int, used: int):
+        capacity = len(self._vectors)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, 1024)
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:used] = self._vectors[:used]
+        self._vectors = vectors
+        if self._centroids is not None:
+            assign = np.zeros(capacity, dtype=np.int32)
+            assign[:used] = self._assign[:used]
+            self._assign = assign
+
+    def _train(self):
+        """Spherical k-means over a sample, then assigns every row to a list."""
+        size = len(self._keys)
+        rows = np.arange(size) if self._live is None else np.flatnonzero(self._live[:size])
+        nlist = min(Config.VECTOR_INDEX_MAX_LISTS, max(1, int(math.sqrt(len(rows)))))
+        rng = np.random.default_rng(self.seed)
+        sample = self._vectors[rng.choice(rows, min(len(rows), nlist * 64), replace=False)]
+        centroids = sample[:nlist].copy()
+        for _ in range(Config.VECTOR_INDEX_KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=nlist)
+            nonempty = counts > 0
+            centroids[nonempty] = self._normalize(sums[nonempty])
+
+        self._centroids = centroids
+        self._assign = np.zeros(len(self._vectors), dtype=np.int32)
+        self._lists = [[] for _ in range(nlist)]
+        self._list_arrays = {}
+        self._trained_size = size
+        self._assign_rows(rows)
+
+    def _assign_rows(self, rows: np.ndarray, chunk: int = 8192):
+        for start in range(0, len(rows), chunk):
+            batch = rows[start:start + chunk]
+            labels = np.argmax(self._vectors[batch] @ self._centroids.T, axis=1)
+            self._assign[batch] = labels
+            for row, cluster in zip(batch.tolist(), labels.tolist()):
+                self._lists[cluster].append(row)
+            for cluster in np.unique(labels).tolist():
+                self._list_arrays.pop(cluster, None)
+
+    def _unassign(self, row: int):
+        cluster = int(self._assign[row])
+        self._lists[cluster].remove(row)
+        self._list_arrays.pop(cluster, None)
+
+    def _list_array(self, cluster: int) -> np.ndarray:
+        array = self._list_arrays.get(cluster)
+        if array is None:
+            array = np.array(self._lists[cluster], dtype=np.int64)
+            self._list_arrays[cluster] = array
+        return array
+
+    @staticmethod
+    def _top(scores: np.ndarray, k: int) -> np.ndarray:
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
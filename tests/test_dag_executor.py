@@ -0,0 +1,88 @@
+import threading
+import pytest
+from src.financial_research_agent.dag_executor import DAGExecutor
+
+
+def test_nodes_run_after_their_dependencies():
+    order = []
+    lock = threading.Lock()
+    dag = DAGExecutor(max_workers=4)
+
+    def node(key):
+        def run():
+            with lock:
+                order.append(key)
+            return key
+        return run
+
+    dag.add("c", node("c"), depends_on=["a", "b"])
+    dag.add("a", node("a"))
+    dag.add("b", node("b"), depends_on=["a"])
+    results = dag.run()
+
+    assert results == {"a": "a", "b": "b", "c": "c"}
+    assert order == ["a", "b", "c"]
+
+
+def test_ready_nodes_start_by_priority_then_insertion():
+    order = []
+    dag = DAGExecutor(max_workers=1)
+    dag.add("root", lambda: order.append("root"))
+    dag.add("low", lambda: order.append("low"), depends_on=["root"], priority=1)
+    dag.add("high", lambda: order.append("high"), depends_on=["root"], priority=lambda: 5)
+    dag.add("low2", lambda: order.append("low2"), depends_on=["root"], priority=1)
+    dag.run()
+    assert order == ["root", "high", "low", "low2"]
+
+
+def test_nodes_added_while_running_respect_dependencies():
+    order = []
+    lock = threading.Lock()
+    dag = DAGExecutor(max_workers=4)
+
+    def record(key):
+        with lock:
+            order.append(key)
+
+    def parent():
+        record("parent")
+        dag.add("child", lambda: record("child"), depends_on=["parent", "slow"])
+        dag.add("orphan", lambda: record("orphan"))
+
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        record("slow")
+
+    dag.add("slow", slow)
+    dag.add("parent", parent)
+    dag.add("release", release.set, depends_on=["parent"])
+    results = dag.run()
+
+    assert set(results) == {"slow", "parent", "release", "child", "orphan"}
+    assert order.index("child") > order.index("slow")
+    assert order.index("child") > order.index("parent")
+
+
+def test_unknown_dependency_while_running_is_rejected():
+    dag = DAGExecutor(max_workers=1)
+    errors = []
+
+    def parent():
+        try:
+            dag.add("child", lambda: None, depends_on=["missing"])
+        except ValueError as exc:
+            errors.append(exc)
+
+    dag.add("parent", parent)
+    dag.run()
+    assert len(errors) == 1
+
+
+def test_cycles_are_rejected():
+    dag = DAGExecutor()
+    dag.add("a", lambda: None, depends_on=["b"])
+    dag.add("b", lambda: None, depends_on=["a"])
+    with pytest.raises(ValueError):
+        dag.run()
@@ -0,0 +1,38 @@
+from src.financial_research_agent.llm_client import LLMResponse
+from src.financial_research_agent.llm_cache import LLMCache
+
+MESSAGES = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "营收增长?"}]
+
+
+def test_key_ignores_dict_ordering():
+    reordered = [{"content": m["content"], "role": m["role"]} for m in MESSAGES]
+    assert LLMCache.make_key("gpt-4o", MESSAGES, 0.0, 100, False) == \
+        LLMCache.make_key("gpt-4o", reordered, 0.0, 100, False)
+
+
+def test_key_is_a_stable_digest():
+    key = LLMCache.make_key("gpt-4o", MESSAGES, 0.0, 100, False)
+    assert key == LLMCache.make_key("gpt-4o", [dict(m) for m in MESSAGES], 0.0, 100, False)
+    assert len(key) == 64 and int(key, 16) >= 0
+
+
+def test_key_covers_every_request_parameter():
+    base = ("gpt-4o", MESSAGES, 0.0, 100, False)
+    variants = [
+        ("gpt-4o-mini", MESSAGES, 0.0, 100, False),
+        ("gpt-4o", MESSAGES[1:], 0.0, 100, False),
+        ("gpt-4o", MESSAGES, 0.7, 100, False),
+        ("gpt-4o", MESSAGES, 0.0, None, False),
+        ("gpt-4o", MESSAGES, 0.0, 100, True),
+    ]
+    keys = {LLMCache.make_key(*args) for args in [base] + variants}
+    assert len(keys) == len(variants) + 1
+
+
+def test_entries_survive_a_new_cache_instance(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    key = LLMCache.make_key("gpt-4o", MESSAGES, 0.0, 100, False)
+    LLMCache(path=path).put(key, LLMResponse(content="Up 12%", model="gpt-4o", usage={"total_tokens": 9}))
+    cached = LLMCache(path=path).get(key)
+    assert cached is not None and cached.cached
+    assert (cached.content, cached.usage) == ("Up 12%", {"total_tokens": 9})
@@ -0,0 +1,59 @@
+import pytest
+from src.financial_research_agent.agent.planner import ResearchPlan, SubTask
+
+
+def task(task_id, perspective="X", depends_on=(), gain=1.0, cost=1.0):
+    return SubTask(id=task_id, description=f"task {task_id}", perspective=perspective,
+                   depends_on=list(depends_on), expected_gain=gain, cost=cost)
+
+
+def has_cycle(plan: ResearchPlan) -> bool:
+    return any(plan._reaches(t.id, t.id) for t in plan)
+
+
+def test_merge_rejects_transitive_cycles():
+    # A depends on C, C depends on B: folding A into B would make B depend on itself
+    plan = ResearchPlan([task("B"), task("C", "Y", ["B"]), task("A", depends_on=["C"])])
+    assert not plan.can_merge("A", "B")
+    assert not plan.can_merge("B", "A")
+    with pytest.raises(ValueError):
+        plan.merge("A", "B")
+
+
+def test_fit_budget_drops_instead_of_creating_a_cycle():
+    plan = ResearchPlan(
+        [task("B"), task("C", "Y", ["B"]), task("A", depends_on=["C"], gain=0.1)],
+        budget=2
+    )
+    assert plan.fit_budget() == ["A"]
+    assert plan.get("A").status == "dropped"
+    assert not has_cycle(plan)
+
+
+def test_fit_budget_merges_independent_subtasks():
+    plan = ResearchPlan([task("1"), task("2", gain=0.1), task("3", "Y", ["2"])], budget=2)
+    assert plan.fit_budget() == ["2"]
+    assert plan.get("2").status == "merged"
+    assert plan.get("3").depends_on == ["1"]
+    assert not has_cycle(plan)
+
+
+def test_frozen_dependencies_are_left_unchanged():
+    plan = ResearchPlan([task("1"), task("2", gain=0.1), task("3", "Y", ["2"])], budget=2)
+    plan.freeze("3")
+    assert not plan.can_merge("2", "1")
+    assert plan.fit_budget() == ["2"]
+    assert plan.get("2").status == "dropped"
+    assert plan.get("3").depends_on == ["2"]
+
+
+def test_fit_budget_never_leaves_a_cycle():
+    # A chain and a diamond sharing one perspective, budgeted down to two subtasks
+    tasks = [
+        task("a"), task("b", depends_on=["a"], gain=0.9), task("c", depends_on=["b"], gain=0.8),
+        task("d", depends_on=["a"], gain=0.7), task("e", depends_on=["c", "d"], gain=0.2),
+    ]
+    plan = ResearchPlan(tasks, budget=2)
+    plan.fit_budget()
+    assert len(plan.pending()) <= 2
+    assert not has_cycle(plan)
@@ -0,0 +1,89 @@
+import time
+import asyncio
+import pytest
+from src.financial_research_agent.llm_client import AsyncBaseLLMClient, LLMResponse
+from src.financial_research_agent.scheduler import (
+    RateLimiter,
+    AsyncScheduledLLMClient,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+)
+
+LIMITS = {"default": {"rpm": 600, "tpm": 1000}}
+
+
+def tpm_level(limiter: RateLimiter, model: str) -> float:
+    bucket = limiter._buckets_for(model)["tpm"]
+    bucket._refill(time.monotonic())
+    return bucket.level
+
+
+def test_acquire_admits_within_budget_and_consumes_it():
+    limiter = RateLimiter(LIMITS)
+    queued = limiter.acquire("m", 400)
+    assert queued < 0.1
+    assert tpm_level(limiter, "m") == pytest.approx(600, abs=5)
+
+
+def test_admit_waits_for_budget_and_respects_queue_order():
+    limiter = RateLimiter(LIMITS)
+    limiter.acquire("m", 1000)
+    first, second = (PRIORITY_INTERACTIVE, 0), (PRIORITY_BULK, 1)
+    queue = limiter._queues.setdefault("m", [])
+    queue.extend([first, second])
+    with limiter._cond:
+        # The bucket is empty, so the head waits for a refill; the entry behind it waits indefinitely
+        assert 0 < limiter._admit("m", first, 500) < 60
+        assert limiter._admit("m", second, 1) == float("inf")
+
+
+def test_settle_refunds_unused_tokens():
+    limiter = RateLimiter(LIMITS)
+    limiter.acquire("m", 800)
+    limiter.settle("m", 800, 100)
+    assert tpm_level(limiter, "m") == pytest.approx(900, abs=5)
+
+
+def test_cancelled_async_waiter_leaves_queue_without_consuming():
+    limiter = RateLimiter(LIMITS)
+    limiter.acquire("m", 1000)
+
+    async def scenario():
+        waiter = asyncio.create_task(limiter.acquire_async("m", 1000))
+        await asyncio.sleep(0.05)
+        assert limiter._queues["m"]
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(scenario())
+    assert limiter._queues["m"] == []
+    assert tpm_level(limiter, "m") < 50
+
+
+class HangingClient(AsyncBaseLLMClient):
+    default_model = "m"
+
+    def __init__(self):
+        self.started = asyncio.Event()
+
+    async def chat(self, messages, model=None, temperature=0.7, max_tokens=None, json_mode=False) -> LLMResponse:
+        self.started.set()
+        await asyncio.sleep(3600)
+
+
+def test_cancelled_scheduled_call_refunds_its_estimate():
+    limiter = RateLimiter(LIMITS)
+
+    async def scenario():
+        inner = HangingClient()
+        client = AsyncScheduledLLMClient(inner, limiter=limiter)
+        call = asyncio.create_task(client.chat([{"role": "user", "content": "hi"}], max_tokens=500))
+        await inner.started.wait()
+        assert tpm_level(limiter, "m") < 500
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+    asyncio.run(scenario())
+    assert tpm_level(limiter, "m") == pytest.approx(1000, abs=5)
@@ -0,0 +1,59 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.financial_research_agent.search_cache import SearchCache
+
+RESULTS = [{"title": "A", "url": "https://example.com/a"}]
+
+
+def test_concurrent_identical_searches_share_one_fetch():
+    cache = SearchCache(ttl=60)
+    calls = 0
+    release = threading.Event()
+
+    def fetch():
+        nonlocal calls
+        calls += 1
+        release.wait(5)
+        return RESULTS
+
+    key = SearchCache.make_key("p", "Humanoid robots", 5)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(cache.get_or_fetch, key, fetch) for _ in range(4)]
+        while cache.coalesced < 3:
+            time.sleep(0.01)
+        release.set()
+        outcomes = [future.result() for future in futures]
+
+    assert calls == 1
+    assert sorted(status for _, status in outcomes) == ["coalesced", "coalesced", "coalesced", "miss"]
+    assert all(results == RESULTS for results, _ in outcomes)
+
+
+def test_failed_fetch_is_raised_to_waiters_and_not_cached():
+    cache = SearchCache(ttl=60)
+    key = SearchCache.make_key("p", "q", 5)
+
+    def fail():
+        raise RuntimeError("provider down")
+
+    try:
+        cache.get_or_fetch(key, fail)
+    except RuntimeError:
+        pass
+    assert cache.get_or_fetch(key, lambda: RESULTS) == (RESULTS, "miss")
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = SearchCache(path=str(tmp_path / "search.sqlite"), ttl=0.2)
+    key = SearchCache.make_key("p", "q", 5)
+    cache.put(key, RESULTS)
+    assert cache.get(key) == RESULTS
+    time.sleep(0.3)
+    assert cache.get(key) is None
+    assert cache.get_or_fetch(key, lambda: RESULTS)[1] == "miss"
+
+
+def test_keys_ignore_case_and_whitespace():
+    assert SearchCache.make_key("p", "  Humanoid   Robots? ", 5) == SearchCache.make_key("p", "humanoid robots", 5)
+    assert SearchCache.make_key("p", "humanoid robots", 5) != SearchCache.make_key("p", "humanoid robots", 10)